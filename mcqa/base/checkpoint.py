@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Dict
+
+from pydantic import ValidationError
+
+from mcqa.commons import logger
+from mcqa.commons.hashing import file_sha256
+from mcqa.commons.result_writer import (ResultWriter, read_results,
+                                        repair_results)
+from mcqa.domain.response_generator import (QuestionResponse,
+                                            RequestResponseLog,
+                                            ResponsesFromSources, ResultRecord)
+
+logger = logger.setup_logger()
+
+MANIFEST_NAME = "checkpoint.json"
+RESULTS_NAME = "results.jsonl"
+RESPONSE_LOG_PATTERN = re.compile(r"^request_responseLog_.*_(\d+)\.json$")
+
+
+class BatchCheckpoint:
+    """Checkpoint of a batch run, kept in its output directory.
+
+    Row results are appended to a single JSONL file (`results.jsonl`, or
+    `results.jsonl.gz` when compressed) through a ResultWriter, and the
+    manifest keys that file to the source file content and question format.
+    A restarted run reuses the rows whose latest record succeeded, along with
+    per-row `request_responseLog_*` files left by older runs, and only retries
+    the remaining rows. A record left half written by a killed run is dropped
+    before new records are appended.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        file_path: str,
+        question_format: str,
+        compress: bool = False,
+        flush_every: int = 1,
+        flush_interval: float = 1.0,
+    ):
+        """Initializes the BatchCheckpoint, loading the manifest of an earlier run.
+
+        Results written for a different source file or question format are
+        discarded, so the run starts over.
+
+        Args:
+            output_path (str): The directory where the run writes its results.
+            file_path (str): The path to the file containing the queries.
+            question_format (str): The format of the questions.
+            compress (bool): Whether new results are gzip-compressed.
+            flush_every (int): The number of buffered records that triggers a flush;
+                1, the default, writes every row outcome as soon as it is known.
+            flush_interval (float): The seconds a row outcome stays buffered at most.
+        """
+        self.output_path = output_path
+        self.manifest_path = os.path.join(output_path, MANIFEST_NAME)
+        self.run_key = {
+            "file_sha256": file_sha256(file_path),
+            "question_format": question_format,
+        }
+
+        results_name = f"{RESULTS_NAME}.gz" if compress else RESULTS_NAME
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get("run") == self.run_key:
+                results_name = manifest.get("results", results_name)
+            else:
+                logger.warning(
+                    f"Checkpoint in {output_path} belongs to another run, starting over"
+                )
+                self._clear_results()
+
+        self.results_path = os.path.join(output_path, results_name)
+        repair_results(self.results_path)
+        self.writer = ResultWriter(
+            self.results_path, flush_every=flush_every, flush_interval=flush_interval
+        )
+        self._save(results_name)
+
+    def _legacy_result_paths(self) -> Dict[int, str]:
+        """Returns the per-row result files of older runs by row number."""
+        result_paths = {}
+        for name in os.listdir(self.output_path):
+            match = RESPONSE_LOG_PATTERN.match(name)
+            if match:
+                result_paths[int(match.group(1))] = os.path.join(self.output_path, name)
+        return result_paths
+
+    def _clear_results(self):
+        """Removes the results left by a different run."""
+        for path in self._legacy_result_paths().values():
+            os.remove(path)
+        for name in (RESULTS_NAME, f"{RESULTS_NAME}.gz"):
+            path = os.path.join(self.output_path, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _save(self, results_name: str):
+        """Persists the manifest atomically."""
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"run": self.run_key, "results": results_name}, f, indent=4)
+        os.replace(temp_path, self.manifest_path)
+
+    def stored_responses(self) -> Dict[int, QuestionResponse | ResponsesFromSources]:
+        """Loads the results of the rows that already succeeded.
+
+        Returns:
+            Dict[int, QuestionResponse | ResponsesFromSources]: The stored responses
+                by row number.
+        """
+        stored = {}
+        for _n, path in self._legacy_result_paths().items():
+            try:
+                with open(path) as f:
+                    stored[_n] = RequestResponseLog.model_validate_json(
+                        f.read()
+                    ).response
+            except ValueError as e:
+                logger.warning(f"Ignoring unreadable result {path}: {e}")
+
+        for record in read_results(self.results_path):
+            try:
+                result = ResultRecord.model_validate(record)
+            except ValidationError as e:
+                logger.warning(
+                    f"Ignoring unreadable record in {self.results_path}: {e}"
+                )
+                continue
+            if result.status == "succeeded":
+                stored[result.row] = result.response
+            else:
+                stored.pop(result.row, None)
+
+        logger.info(
+            f"Resuming with {len(stored)} stored results from {self.output_path}"
+        )
+        return stored
+
+    def record(self, result: ResultRecord):
+        """Appends the outcome of a row to the results file.
+
+        Args:
+            result (ResultRecord): The row result.
+        """
+        self.writer.write(result.model_dump(mode="json"))
@@ -0,0 +1,194 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import List
+
+from mcqa.commons.hashing import text_sha256
+from mcqa.commons.logger import setup_logger
+from mcqa.commons.lru_cache import LRUCache
+from mcqa.commons.tokens import estimate_tokens
+from mcqa.config import McqaConfig
+
+logger = setup_logger()
+
+INDEX_VERSION = "bm25-1"
+TERM_PATTERN = re.compile(r"\w+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this "
+    "to was were which with what".split()
+)
+CHUNK_SEPARATOR = "\n[...]\n"
+
+_indexes = LRUCache(McqaConfig().pdf_cache_max_items)
+
+
+def terms(text: str) -> List[str]:
+    """Returns the lowercased words of a text, without stop words."""
+    return [
+        term for term in TERM_PATTERN.findall(text.lower()) if term not in STOP_WORDS
+    ]
+
+
+class Bm25Index:
+    """Okapi BM25 index over the overlapping word windows of a document."""
+
+    def __init__(self, chunks: List[str], k1: float = 1.5, b: float = 0.75):
+        """Initializes the Bm25Index.
+
+        Args:
+            chunks (List[str]): The chunks of the document, in document order.
+            k1 (float): The term frequency saturation.
+            b (float): The chunk length normalization.
+        """
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(terms(chunk)) for chunk in chunks]
+        self.lengths = [sum(term_freq.values()) for term_freq in self.term_freqs]
+        self.average_length = sum(self.lengths) / len(chunks) if chunks else 0.0
+        doc_freqs = Counter(term for tf in self.term_freqs for term in tf)
+        self.idf = {
+            term: math.log(1 + (len(chunks) - freq + 0.5) / (freq + 0.5))
+            for term, freq in doc_freqs.items()
+        }
+
+    @classmethod
+    def from_text(cls, text: str, chunk_words: int, overlap: int) -> "Bm25Index":
+        """Builds the index of a document split into `chunk_words` word windows.
+
+        Args:
+            text (str): The text of the document.
+            chunk_words (int): The number of words per chunk.
+            overlap (int): The number of words shared by consecutive chunks.
+
+        Returns:
+            Bm25Index: The index.
+        """
+        words = text.split()
+        step = max(1, chunk_words - overlap)
+        return cls(
+            [
+                " ".join(words[start : start + chunk_words])
+                for start in range(0, max(1, len(words) - overlap), step)
+            ]
+        )
+
+    def scores(self, query: str) -> List[float]:
+        """Returns the BM25 score of every chunk for a query."""
+        query_terms = set(terms(query))
+        scores = []
+        for term_freq, length in zip(self.term_freqs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+            score = 0.0
+            for term in query_terms & term_freq.keys():
+                frequency = term_freq[term]
+                score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+            scores.append(score)
+        return scores
+
+    def ranking(self, query: str) -> List[int]:
+        """Returns the positions of the chunks, from the most relevant to a query."""
+        scores = self.scores(query)
+        return sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+
+    def top_k(self, query: str, k: int) -> List[int]:
+        """Returns the positions of the `k` chunks most relevant to a query, in order."""
+        return sorted(self.ranking(query)[:k])
+
+
+class ContextSelector:
+    """Selects the chunks of a long document relevant to a question.
+
+    Documents are split into overlapping word windows indexed with BM25. The
+    index is built once per document content and chunking, then cached in
+    memory and on disk under `McqaConfig.cache_dir`. Documents of at most `k`
+    chunks are returned whole.
+    """
+
+    def __init__(self):
+        """Initializes the ContextSelector."""
+        self.mcqa_config = McqaConfig()
+
+    def _cache_path(self, text_hash: str) -> str:
+        """Returns the on-disk location of the index of a document."""
+        return os.path.join(
+            self.mcqa_config.cache_dir,
+            "context_index",
+            text_hash[:2],
+            f"{text_hash}-{self.mcqa_config.context_chunk_words}-"
+            f"{self.mcqa_config.context_chunk_overlap}-{INDEX_VERSION}.json",
+        )
+
+    def index(self, text: str) -> Bm25Index:
+        """Returns the index of a document, building and persisting it if needed.
+
+        Args:
+            text (str): The text of the document.
+
+        Returns:
+            Bm25Index: The index of the document.
+        """
+        cache_path = self._cache_path(text_sha256(text))
+        index = _indexes.get(cache_path)
+        if index is not None:
+            return index
+
+        if os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as file:
+                index = Bm25Index(json.load(file)["chunks"])
+        else:
+            index = Bm25Index.from_text(
+                text,
+                self.mcqa_config.context_chunk_words,
+                self.mcqa_config.context_chunk_overlap,
+            )
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump({"chunks": index.chunks}, file)
+            os.replace(temp_path, cache_path)
+            logger.debug(f"Indexed {len(index.chunks)} chunks of {cache_path}")
+
+        _indexes.put(cache_path, index)
+        return index
+
+    def select(self, text: str, query: str, k: int) -> str:
+        """Returns the `k` chunks of a document most relevant to a query.
+
+        Args:
+            text (str): The text of the document.
+            query (str): The question, options and short context of the request.
+            k (int): The number of chunks to keep.
+
+        Returns:
+            str: The selected chunks in document order, separated by `[...]`.
+        """
+        index = self.index(text)
+        if len(index.chunks) <= k:
+            return text
+        return CHUNK_SEPARATOR.join(index.chunks[i] for i in index.top_k(query, k))
+
+    def fit(self, text: str, query: str, max_tokens: int) -> str:
+        """Returns the chunks of a document most relevant to a query that fit a budget.
+
+        Args:
+            text (str): The text of the document.
+            query (str): The question, options and short context of the request.
+            max_tokens (int): The estimated tokens the selected chunks may use.
+
+        Returns:
+            str: The selected chunks in document order, separated by `[...]`.
+        """
+        index = self.index(text)
+        separator_tokens = estimate_tokens(CHUNK_SEPARATOR)
+        selected, tokens = [], 0
+        for i in index.ranking(query):
+            chunk_tokens = estimate_tokens(index.chunks[i]) + separator_tokens
+            if tokens + chunk_tokens > max_tokens:
+                continue
+            selected.append(i)
+            tokens += chunk_tokens
+        return CHUNK_SEPARATOR.join(index.chunks[i] for i in sorted(selected))
@@ -1,8 +1,18 @@
+from __future__ import annotations
+
 import re
+from typing import TYPE_CHECKING, List, Sequence, Tuple
+
+import numpy as np
 
-from mcqa.commons import logger
+from mcqa.commons import logger, metrics
 from mcqa.domain.evaluation import Evaluation
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from mcqa.domain.response_generator import QuestionResponse
+
 logger = logger.setup_logger()
 
 
@@ -20,6 +30,7 @@ class QAEvaluation(Evaluation):
         """
         return re.sub(r"[^\x20-\x7E]", "", text).strip()
 
+    @metrics.timed("evaluate")
     def evaluate(self, generated_answer: str, actual_answer: str) -> float:
         """Evaluates the generated answer against the actual answer.
 
@@ -48,3 +59,172 @@ class QAEvaluation(Evaluation):
         if treated_generated_answer.lower() == treated_answer.lower():
             return 100.0
         return 0.0
+
+    def evaluate_batch(
+        self, generated_answers: Sequence[str], actual_answers: Sequence[str]
+    ) -> np.ndarray:
+        """Evaluates pairs of generated and actual answers at once.
+
+        Applies the rules of `evaluate` with vectorized string operations: the
+        actual answer is reduced to its first capital letter, and a generated
+        answer holding a letter followed by more text to its first character.
+
+        Args:
+            generated_answers (Sequence[str]): The answers generated by the model.
+            actual_answers (Sequence[str]): The correct answers, in the same order.
+
+        Returns:
+            np.ndarray: The evaluation score of each pair, 100.0 if the answers
+                match, otherwise 0.0.
+        """
+        import pandas as pd
+
+        actual = (
+            pd.Series(actual_answers, dtype=object)
+            .astype(str)
+            .str.replace(r"[^\x20-\x7E]", "", regex=True)
+            .str.strip()
+        )
+        treated_answers = actual.str.extract(r"([A-Z])", expand=False).fillna(actual)
+
+        generated = (
+            pd.Series(generated_answers, dtype=object)
+            .astype(str)
+            .str.replace(r"[^\x20-\x7E]", "", regex=True)
+            .str.strip()
+        )
+        treated_generated_answers = generated.where(
+            ~generated.str.contains(r"[A-Za-z].", regex=True), generated.str[:1]
+        )
+
+        matches = (
+            treated_generated_answers.str.lower().to_numpy()
+            == treated_answers.str.lower().to_numpy()
+        )
+        return np.where(matches, 100.0, 0.0)
+
+    def score_responses(self, responses: Sequence[QuestionResponse]) -> np.ndarray:
+        """Scores question responses at once, updating their evaluation.
+
+        Args:
+            responses (Sequence[QuestionResponse]): The responses to score.
+
+        Returns:
+            np.ndarray: The evaluation score of each response.
+        """
+        scores = self.evaluate_batch(
+            [response.generated_answer for response in responses],
+            [response.actual_answer for response in responses],
+        )
+        for response, score in zip(responses, scores):
+            response.evaluation = float(score)
+        return scores
+
+    @staticmethod
+    def accuracy(scores: Sequence[float]) -> float:
+        """Returns the mean score, 0.0 for an empty run."""
+        scores = np.asarray(scores, dtype=float)
+        return float(scores.mean()) if scores.size else 0.0
+
+    def bootstrap_interval(
+        self,
+        scores: Sequence[float],
+        n_resamples: int = 1000,
+        confidence: float = 0.95,
+        rng: np.random.Generator = None,
+    ) -> Tuple[float, float]:
+        """Returns a percentile bootstrap confidence interval of the mean score.
+
+        Scores taking at most two values, such as the 0/100 scores of
+        `evaluate`, are resampled through a binomial draw of how many take the
+        higher value, which is equivalent and does not depend on the run size.
+
+        Args:
+            scores (Sequence[float]): The scores of the questions.
+            n_resamples (int): The number of bootstrap resamples.
+            confidence (float): The confidence level of the interval.
+            rng (np.random.Generator, optional): The random generator to draw from.
+
+        Returns:
+            Tuple[float, float]: The lower and upper bounds, (0.0, 0.0) if empty.
+        """
+        scores = np.asarray(scores, dtype=float)
+        if not scores.size:
+            return 0.0, 0.0
+        rng = rng if rng is not None else np.random.default_rng(0)
+
+        values, counts = np.unique(scores, return_counts=True)
+        if len(values) <= 2:
+            high_counts = rng.binomial(
+                scores.size, counts[-1] / scores.size, n_resamples
+            )
+            means = values[0] + (values[-1] - values[0]) * high_counts / scores.size
+        else:
+            chunk = max(1, 1_000_000 // scores.size)
+            means = np.concatenate(
+                [
+                    scores[
+                        rng.integers(
+                            0,
+                            scores.size,
+                            (min(chunk, n_resamples - start), scores.size),
+                        )
+                    ].mean(axis=1)
+                    for start in range(0, n_resamples, chunk)
+                ]
+            )
+
+        alpha = (1 - confidence) / 2
+        low, high = np.quantile(means, [alpha, 1 - alpha])
+        return float(low), float(high)
+
+    def grouped_accuracy(
+        self,
+        frame: pd.DataFrame,
+        by: List[str],
+        score_column: str = "evaluation",
+        n_resamples: int = 1000,
+        confidence: float = 0.95,
+        seed: int = 0,
+    ) -> pd.DataFrame:
+        """Returns the accuracy of each group of questions with bootstrap intervals.
+
+        Args:
+            frame (pd.DataFrame): The scored questions, one per row.
+            by (List[str]): The columns to group by, e.g. model, question_format
+                or source_path.
+            score_column (str): The column holding the scores.
+            n_resamples (int): The number of bootstrap resamples per group.
+            confidence (float): The confidence level of the intervals.
+            seed (int): The seed of the bootstrap draws.
+
+        Returns:
+            pd.DataFrame: One row per group with the number of questions, the
+                accuracy and the bounds of its confidence interval.
+        """
+        import pandas as pd
+
+        rng = np.random.default_rng(seed)
+        rows = []
+        for keys, group in frame.groupby(by, dropna=False, sort=True):
+            scores = group[score_column].to_numpy(dtype=float)
+            low, high = self.bootstrap_interval(scores, n_resamples, confidence, rng)
+            rows.append(
+                [
+                    *(keys if isinstance(keys, tuple) else (keys,)),
+                    scores.size,
+                    self.accuracy(scores),
+                    low,
+                    high,
+                ]
+            )
+        return pd.DataFrame(
+            rows,
+            columns=[
+                *by,
+                "questions",
+                "accuracy",
+                "accuracy_ci_low",
+                "accuracy_ci_high",
+            ],
+        )
@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from mcqa.commons.hashing import file_sha256
+from mcqa.commons.logger import setup_logger
+
+logger = setup_logger()
+
+GEMINI_FILE_LIFETIME = 48 * 60 * 60
+
+
+class GeminiUploadRegistry:
+    """Registry of Gemini File API uploads keyed by file content sha256.
+
+    A file is uploaded once and its handle reused until it comes within
+    `expiry_margin` seconds of its expiration, after which it is transparently
+    uploaded again. Handles are persisted to `registry_path`, so uploads
+    survive process restarts.
+    """
+
+    def __init__(self, registry_path: str, expiry_margin: float):
+        """Initializes the GeminiUploadRegistry, loading persisted uploads.
+
+        Args:
+            registry_path (str): The path to the JSON file holding the uploads.
+            expiry_margin (float): The seconds before expiration at which a handle
+                is no longer reused.
+        """
+        self.registry_path = registry_path
+        self.expiry_margin = expiry_margin
+        self._handles: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(registry_path):
+            with open(registry_path) as file:
+                self._entries = json.load(file)
+
+    def _file_lock(self, file_hash: str) -> threading.Lock:
+        """Returns the lock serializing uploads of one file."""
+        with self._lock:
+            return self._locks.setdefault(file_hash, threading.Lock())
+
+    def _save(self):
+        """Persists the registry atomically."""
+        os.makedirs(os.path.dirname(self.registry_path) or ".", exist_ok=True)
+        temp_path = f"{self.registry_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self._entries, file, indent=4)
+        os.replace(temp_path, self.registry_path)
+
+    def _valid_handle(self, file_hash: str) -> Any:
+        """Returns the reusable handle of an upload, or None if it must be re-uploaded."""
+        entry = self._entries.get(file_hash)
+        if entry is None or entry["expiration_time"] - self.expiry_margin < time.time():
+            return None
+
+        handle = self._handles.get(file_hash)
+        if handle is None:
+            import google.generativeai as genai
+
+            try:
+                handle = genai.get_file(entry["name"])
+            except Exception as e:
+                logger.debug(f"Gemini file {entry['name']} is no longer available: {e}")
+                return None
+        if getattr(handle.state, "name", "ACTIVE") == "FAILED":
+            return None
+        return handle
+
+    def upload(self, file_path: str) -> Any:
+        """Returns a Gemini file handle for the file, uploading it only when needed.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Returns:
+            Any: The Gemini file handle.
+        """
+        file_hash = file_sha256(file_path)
+        with self._file_lock(file_hash):
+            handle = self._valid_handle(file_hash)
+            if handle is not None:
+                self._handles[file_hash] = handle
+                return handle
+
+            import google.generativeai as genai
+
+            handle = genai.upload_file(file_path)
+            expiration_time = getattr(handle, "expiration_time", None)
+            with self._lock:
+                self._handles[file_hash] = handle
+                self._entries[file_hash] = {
+                    "name": handle.name,
+                    "uri": handle.uri,
+                    "expiration_time": (
+                        expiration_time.timestamp()
+                        if expiration_time
+                        else time.time() + GEMINI_FILE_LIFETIME
+                    ),
+                }
+                self._save()
+            logger.debug(f"Uploaded {file_path} to Gemini as {handle.name}")
+            return handle
+
+
+_upload_registries: Dict[str, GeminiUploadRegistry] = {}
+_upload_registries_lock = threading.Lock()
+
+
+def get_upload_registry(
+    registry_path: str, expiry_margin: float
+) -> GeminiUploadRegistry:
+    """Returns the process-wide upload registry persisted at `registry_path`."""
+    with _upload_registries_lock:
+        if registry_path not in _upload_registries:
+            _upload_registries[registry_path] = GeminiUploadRegistry(
+                registry_path, expiry_margin
+            )
+        return _upload_registries[registry_path]
@@ -1,14 +1,29 @@
 import base64
+import functools
+import os
+import threading
 from io import BytesIO
 
-import google.generativeai as genai
-import PyPDF2
-
+from mcqa.base.input_parser.gemini_upload_registry import get_upload_registry
+from mcqa.commons import metrics
+from mcqa.commons.hashing import file_sha256
 from mcqa.commons.logger import setup_logger
+from mcqa.commons.lru_cache import LRUCache
+from mcqa.config import McqaConfig
 from mcqa.domain.input_parser import InputParser
 
 logger = setup_logger()
 
+_extracted_texts = LRUCache(McqaConfig().pdf_cache_max_items)
+
+
+@functools.lru_cache(maxsize=None)
+def parser_version() -> str:
+    """Returns the version tag of the extracted texts, importing PyPDF2 on first use."""
+    import PyPDF2
+
+    return f"pypdf2-{PyPDF2.__version__}-1"
+
 
 class PdfParser(InputParser):
     """A class used to parse PDF files.
@@ -17,34 +32,90 @@ class PdfParser(InputParser):
 
     """
 
+    def __init__(self):
+        """Initializes the PdfParser."""
+        self.mcqa_config = McqaConfig()
+
+    def _cache_path(self, file_hash: str) -> str:
+        """Returns the on-disk location of the extracted text of a PDF."""
+        return os.path.join(
+            self.mcqa_config.cache_dir,
+            "pdf_text",
+            file_hash[:2],
+            f"{file_hash}-{parser_version()}.txt",
+        )
+
+    def _extract_text(self, file_path: str) -> str:
+        """Extracts the text of every page of a PDF file with PyPDF2."""
+        import PyPDF2
+
+        texts = []
+        with open(file_path, "rb") as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+
+            num_pages = len(pdf_reader.pages)
+            pdf_text = []
+            for page_num in range(num_pages):
+                page = pdf_reader.pages[page_num]
+                pdf_text.append(page.extract_text())
+                pdf_text.append("\n\n\n")
+            texts.append(pdf_text)
+
+        return " ".join(texts[0])
+
+    @metrics.timed("pdf_parse")
     def parse(self, file_path: str) -> str:
         """Parses a PDF file and extracts the text.
 
+        Extracted text is cached by file content hash and parser version, in
+        memory and on disk under `McqaConfig.cache_dir`, so each PDF is only
+        extracted once per machine.
+
         Args:
             file_path (str): The path to the PDF file.
 
         Returns:
             str: The extracted text from the PDF file.
         """
-        texts = []
-        pdf_reader = PyPDF2.PdfReader(open(file_path, "rb"))
+        file_hash = file_sha256(file_path)
+        text = _extracted_texts.get((file_hash, parser_version()))
+        if text is not None:
+            return text
 
-        num_pages = len(pdf_reader.pages)
-        pdf_text = []
-        for page_num in range(num_pages):
-            page = pdf_reader.pages[page_num]
-            pdf_text.append(page.extract_text())
-            pdf_text.append("\n\n\n")
-        texts.append(pdf_text)
+        cache_path = self._cache_path(file_hash)
+        if os.path.exists(cache_path):
+            with open(cache_path, encoding="utf-8") as file:
+                text = file.read()
+        else:
+            text = self._extract_text(file_path)
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                file.write(text)
+            os.replace(temp_path, cache_path)
+            logger.debug(f"Cached extracted text of {file_path}")
 
-        return " ".join(texts[0])
+        _extracted_texts.put((file_hash, parser_version()), text)
+        return text
 
     def _handle_pdf(self, file_path: str):
         bytes_ = BytesIO(file_path).getvalue()
         return base64.b64encode(bytes_).decode("utf-8")
 
+    @metrics.timed("pdf_upload")
     def upload_pdf(self, file_path: str):
-        return genai.upload_file(file_path)
+        """Uploads a PDF file to the Gemini File API, reusing earlier uploads.
+
+        Args:
+            file_path (str): The path to the PDF file.
+
+        Returns:
+            Any: The Gemini file handle.
+        """
+        return get_upload_registry(
+            os.path.join(self.mcqa_config.cache_dir, "gemini_uploads.json"),
+            self.mcqa_config.gemini_upload_expiry_margin,
+        ).upload(file_path)
 
     def byte_reader(self, file_path: str):
         with open(file_path, "rb") as file:
@@ -1,16 +1,26 @@
 import re
+from typing import Dict, List, Optional, Tuple
 
 from mcqa.base.evaluation import QAEvaluation
-from mcqa.commons import logger
-from mcqa.domain.patterns import Patterns
+from mcqa.commons import logger, metrics
+from mcqa.commons.regex import TagExtractor
 from mcqa.domain.postprocessor import PostProcessorInterface
 from mcqa.domain.response_generator import QuestionResponse, ResponseMetadata
 
 logger = logger.setup_logger()
 
+RESPONSE_TAGS = TagExtractor(
+    ("Answer", "RelevantExcerpts", "Thinking", "FoundationalKnowledge")
+)
+QUESTION_TAGS = TagExtractor(("Question", "Options", "Answer"), strip=True)
+PACKED_RESPONSE_PATTERN = re.compile(
+    r"<MCQResponse\s+id=\"?([^\">\s]+)\"?\s*>(.*?)(?=</MCQResponse>|<MCQResponse\s|\Z)",
+    re.DOTALL,
+)
+
 
 class PostProcessor(PostProcessorInterface):
-    """Post-processor for extracting information from responses using regex patterns."""
+    """Post-processor for extracting the tagged fields of responses in a single pass."""
 
     def __init__(self):
         """Initializes the PostProcessor with the specified model.
@@ -20,32 +30,74 @@ class PostProcessor(PostProcessorInterface):
         """
         self.evaluation = QAEvaluation()
 
-    def _extract_regex(self, pattern: str, text: str, default_value: str = "") -> str:
-        """Extracts text matching a regex pattern.
+    def _extract_questions(self, generated_response: str) -> list:
+        """Extracts the questions, options and answers of a response in one sweep.
 
         Args:
-            pattern (str): The regex pattern to search for.
-            text (str): The text to search within.
-            default_value (str, optional): The value to return if no match is found. Defaults to "".
+            generated_response (str): The response text to be processed.
 
         Returns:
-            str: The extracted text or the default value if no match is found.
+            list: A list of tuples containing questions, options, and answers.
         """
-        match = re.search(pattern, text, re.DOTALL)
-        return match.group(1) if match else default_value
+        fields = QUESTION_TAGS.extract(generated_response)
+        return list(zip(fields["Question"], fields["Options"], fields["Answer"]))
+
+    def split_packed_response(self, generated_response: str) -> Dict[str, str]:
+        """Splits the response to packed questions into the response of each case.
 
-    def _find_regex(self, pattern, text: str) -> list:
-        """Finds all occurrences of a regex pattern in the text.
+        A case whose closing tag is missing ends where the next case starts, so
+        the cases before a truncation are kept. Cases answered more than once
+        keep their first response.
 
         Args:
-            pattern (Pattern): The regex pattern to search for.
-            text (str): The text to search within.
+            generated_response (str): The response text to be processed.
 
         Returns:
-            list: A list of all matches found.
+            Dict[str, str]: The response of each answered case, keyed by case ID.
         """
-        return pattern.findall(text)
+        responses = {}
+        for case_id, response in PACKED_RESPONSE_PATTERN.findall(generated_response):
+            responses.setdefault(case_id, response)
+        return responses
+
+    def postprocess_packed(
+        self,
+        generated_response: str,
+        cases: List[Tuple[str, str, str, str]],
+        model: str,
+    ) -> List[Optional[QuestionResponse]]:
+        """Post-processes the response to packed questions into one response per case.
 
+        Args:
+            generated_response (str): The response text to be processed.
+            cases (List[Tuple[str, str, str, str]]): The ID, question, options text
+                and actual answer of each case.
+            model (str): The model used for response generation.
+
+        Returns:
+            List[Optional[QuestionResponse]]: The post-processed response of each
+                case, in order, or None for the cases left unanswered or answered
+                without an `<Answer>` tag.
+        """
+        case_responses = self.split_packed_response(generated_response)
+        responses = []
+        for case_id, question, options, actual_answer in cases:
+            case_response = case_responses.get(case_id, "")
+            if not RESPONSE_TAGS.extract(case_response)["Answer"]:
+                responses.append(None)
+                continue
+            responses.append(
+                self.postprocess(
+                    generated_response=case_response,
+                    actual_answer=actual_answer,
+                    question=question,
+                    options=options,
+                    model=model,
+                )
+            )
+        return responses
+
+    @metrics.timed("postprocess")
     def naive_postprocess(
         self,
         generated_response: str,
@@ -54,9 +106,9 @@ class PostProcessor(PostProcessorInterface):
         options: str,
         model: str,
     ):
-        generated_answer = self._extract_regex(
-            Patterns.answer, generated_response, generated_response
-        )
+        generated_answer = RESPONSE_TAGS.extract_first(
+            generated_response, {"Answer": generated_response}
+        )["Answer"]
         evaluation = self.evaluation.evaluate(generated_answer, actual_answer)
         return QuestionResponse(
             generated_answer=generated_answer,
@@ -70,6 +122,7 @@ class PostProcessor(PostProcessorInterface):
             metadata=ResponseMetadata(model=model),
         )
 
+    @metrics.timed("postprocess")
     def postprocess(
         self,
         generated_response: str,
@@ -87,18 +140,13 @@ class PostProcessor(PostProcessorInterface):
         Returns:
             QuestionResponse: The post-processed response containing extracted fields.
         """
-        generated_answer = self._extract_regex(
-            Patterns.answer, generated_response, "Answer"
-        )
-        excerpts = self._extract_regex(
-            Patterns.excerpts, generated_response, "RelevantExcerpts"
-        )
-        thinking = self._extract_regex(
-            Patterns.thinking, generated_response, "Thinking"
-        )
-        foundational_knowledge = self._extract_regex(
-            Patterns.foundational_knowledge, generated_response, "FoundationalKnowledge"
+        fields = RESPONSE_TAGS.extract_first(
+            generated_response, {tag: tag for tag in RESPONSE_TAGS.tags}
         )
+        generated_answer = fields["Answer"]
+        excerpts = fields["RelevantExcerpts"]
+        thinking = fields["Thinking"]
+        foundational_knowledge = fields["FoundationalKnowledge"]
         evaluation = self.evaluation.evaluate(generated_answer, actual_answer)
 
         return QuestionResponse(
@@ -123,17 +171,7 @@ class PostProcessor(PostProcessorInterface):
             list: A list of tuples containing questions, options, and answers.
         """
         logger.debug("Response: %s", generated_response)
-        generated_questions = self._find_regex(
-            Patterns.question_pattern, generated_response
-        )
-        generated_options = self._find_regex(
-            Patterns.options_pattern, generated_response
-        )
-        generated_answers = self._find_regex(
-            Patterns.answer_pattern, generated_response
-        )
-
-        return list(zip(generated_questions, generated_options, generated_answers))
+        return self._extract_questions(generated_response)
 
     def postprocess_synthetic(self, generated_response: str) -> list:
         """Post-processes the response to extract synthetic questions, options, and answers.
@@ -145,14 +183,4 @@ class PostProcessor(PostProcessorInterface):
             list: A list of tuples containing questions, options, and answers.
         """
         logger.debug("Response: %s", generated_response)
-        generated_questions = self._find_regex(
-            Patterns.question_pattern, generated_response
-        )
-        generated_options = self._find_regex(
-            Patterns.options_pattern, generated_response
-        )
-        generated_answers = self._find_regex(
-            Patterns.answer_pattern, generated_response
-        )
-
-        return list(zip(generated_questions, generated_options, generated_answers))
+        return self._extract_questions(generated_response)
@@ -1,29 +1,136 @@
+import os
 import re
-from typing import Any
+from typing import Any, List, Optional, Tuple
 
+from mcqa.base.context_selector import ContextSelector
 from mcqa.base.input_parser.image_parser import ImageParser
 from mcqa.base.input_parser.pdf_parser import PdfParser
 from mcqa.base.prompts import (BASE_MULTIMODAL_USER_PROMPT, BASE_SYSTEM_PROMPT,
                                MULTIMODAL_SYNTHETIC_SYSTEM_PROMPT,
                                MULTIMODAL_SYNTHETIC_USER_PROMPT,
                                MULTIMODAL_SYSTEM_PROMPT,
-                               MULTIMODAL_USER_PROMPT, REPHRASE_SYSTEM_PROMPT,
-                               REPHRASE_USER_PROMPT, SYNTHETIC_SYSTEM_PROMPT,
-                               SYNTHETIC_USER_PROMPT, SYSTEM_PROMPT,
-                               TEXT_USER_PROMPT, AnswerTemplate,
+                               MULTIMODAL_USER_PROMPT, PACKED_CASE_PROMPT,
+                               PACKED_MULTIMODAL_SYSTEM_PROMPT,
+                               PACKED_SYSTEM_PROMPT, PACKED_TEXT_USER_PROMPT,
+                               REPHRASE_SYSTEM_PROMPT, REPHRASE_USER_PROMPT,
+                               SYNTHETIC_SYSTEM_PROMPT, SYNTHETIC_USER_PROMPT,
+                               SYSTEM_PROMPT, TEXT_USER_PROMPT, AnswerTemplate,
                                ContextTemplate, NumberOfQuestionsTemplate,
                                OptionsTemplate, QuestionTemplate,
                                ShortContextTemplate)
+from mcqa.commons import logger, metrics
+from mcqa.commons.tokens import estimate_tokens, truncate_to_tokens
+from mcqa.config import McqaConfig
+from mcqa.domain.response_generator import PromptSize
+
+logger = logger.setup_logger()
+
+CONTEXT_PATTERN = re.compile(r"<Context>(.*?)</Context>", re.DOTALL)
+MULTIMODAL_EXTENSIONS = (".pdf", ".png", ".jpeg", ".jpg")
+
+
+def context_extension(full_context_path: str) -> str:
+    """Returns the lowercase file extension of a context path, "" if it has none."""
+    return os.path.splitext(full_context_path)[1].lower()
 
 
 class PromptCrafter:
-    """Class responsible for crafting prompts based on the given context, query, and options."""
+    """Class responsible for crafting prompts based on the given context, query, and options.
 
-    def __init__(self):
-        """Initializes the PromptCrafter instance."""
+    The estimated token counts of the last prompt are kept in `last_prompt_size`.
+    When a text context does not fit the input token budget, it is cut to fit
+    according to `McqaConfig.prompt_overflow_policy`: `select` keeps its chunks
+    most relevant to the question, `truncate` keeps its beginning and `error`
+    raises a ValueError. `select` falls back to `truncate` when no chunk fits.
+    """
+
+    def __init__(self, input_token_budget: int = 0):
+        """Initializes the PromptCrafter instance.
+
+        Args:
+            input_token_budget (int): The estimated tokens a prompt may use, 0 for
+                no budget. Defaults to 0.
+        """
         self.image_parser = ImageParser()
         self.pdf_parser = PdfParser()
+        self.context_selector = ContextSelector()
+        self.mcqa_config = McqaConfig()
+        self.input_token_budget = input_token_budget
+        self.last_prompt_size: Optional[PromptSize] = None
+        self._fitted = False
+
+    def _record_size(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        questions: List[Optional[str]],
+        options: List[str],
+    ):
+        """Records the estimated token counts of a prompt in `last_prompt_size`."""
+        context = CONTEXT_PATTERN.search(user_prompt)
+        self.last_prompt_size = PromptSize(
+            system_tokens=estimate_tokens(system_prompt),
+            context_tokens=estimate_tokens(context.group(1)) if context else 0,
+            question_tokens=sum(estimate_tokens(text or "") for text in questions),
+            options_tokens=sum(map(estimate_tokens, options)),
+            total_tokens=estimate_tokens(system_prompt) + estimate_tokens(user_prompt),
+            input_token_budget=self.input_token_budget or None,
+            fitted=self._fitted,
+        )
+
+    def _fit_context(
+        self, context_text: str, system_prompt: str, *query_parts: Optional[str]
+    ) -> str:
+        """Cuts a context to the input token budget left by the rest of the prompt.
+
+        Args:
+            context_text (str): The context text.
+            system_prompt (str): The system prompt sent with the context.
+            *query_parts (Optional[str]): The questions, options and short contexts
+                sent with the context.
+
+        Returns:
+            str: The context, cut to fit the budget if needed.
+
+        Raises:
+            ValueError: If the context does not fit and the policy is `error`.
+        """
+        if not self.input_token_budget:
+            return context_text
+        query = " ".join(part for part in query_parts if part)
+        available = (
+            self.input_token_budget
+            - estimate_tokens(system_prompt)
+            - estimate_tokens(query)
+        )
+        context_tokens = estimate_tokens(context_text)
+        if context_tokens <= available:
+            return context_text
 
+        policy = self.mcqa_config.prompt_overflow_policy
+        if policy == "error":
+            raise ValueError(
+                f"Context of {context_tokens} tokens exceeds the {available} tokens "
+                f"left by the input budget of {self.input_token_budget} tokens"
+            )
+        self._fitted = True
+        if policy != "truncate":
+            selected = self.context_selector.fit(context_text, query, max(0, available))
+            if selected:
+                return selected
+            logger.warning(
+                f"No chunk of the context fits the {available} tokens left by the "
+                "input budget, truncating it instead"
+            )
+        context_text = truncate_to_tokens(context_text, max(0, available))
+        if not context_text:
+            logger.warning(
+                f"The input budget of {self.input_token_budget} tokens leaves no room "
+                "for the context, sending the prompt without it"
+            )
+        return context_text
+
+    @metrics.timed("prompt_craft")
     def craft_prompt(
         self,
         query: str,
@@ -33,8 +140,32 @@ class PromptCrafter:
         question_format: str,
         short_context: str,
     ):
-        """Crafts the appropriate prompt based on the context type and question format."""
-        if re.search("|".join([".pdf", ".png", ".jpeg", ".jpg"]), full_context_path):
+        """Crafts the appropriate prompt based on the context type and question format.
+
+        The estimated token counts of the prompt are kept in `last_prompt_size`.
+        """
+        self._fitted = False
+        prompt = self._craft_prompt(
+            query, options, full_context_path, answer, question_format, short_context
+        )
+        if prompt is not None:
+            user_prompt, system_prompt = prompt
+            self._record_size(
+                system_prompt, user_prompt, [query, short_context], [options]
+            )
+        return prompt
+
+    def _craft_prompt(
+        self,
+        query: str,
+        options: str,
+        full_context_path: str,
+        answer: str,
+        question_format: str,
+        short_context: str,
+    ):
+        """Crafts the prompt for the context type and question format."""
+        if context_extension(full_context_path) in MULTIMODAL_EXTENSIONS:
             if question_format == "naive":
                 return self._craft_naive_prompt(
                     query, options, answer, full_context_path, short_context
@@ -56,7 +187,10 @@ class PromptCrafter:
                 full_context_path, query, options, short_context
             )
 
-        if "text" in full_context_path:
+        if (
+            "text" in full_context_path
+            or context_extension(full_context_path) == ".txt"
+        ):
             if question_format == "rephrase":
                 return self._craft_rephrase_prompt(
                     query, options, answer, full_context_path
@@ -69,6 +203,52 @@ class PromptCrafter:
                 full_context_path, query, options, short_context
             )
 
+    @metrics.timed("prompt_craft")
+    def craft_packed_prompt(
+        self, cases: List[Tuple[str, str, str, str]], full_context_path: str
+    ):
+        """Crafts one prompt asking several raw questions about the same context.
+
+        The context is sent once, followed by one `<Case id="...">` per question.
+        Multimodal contexts are attached to the request instead of the prompt.
+
+        Args:
+            cases (List[Tuple[str, str, str, str]]): The ID, question, options text
+                and short context of each case.
+            full_context_path (str): The path to the shared context.
+
+        Returns:
+            Tuple[str, str]: The user prompt and the system prompt.
+        """
+        cases_prompt = "".join(
+            PACKED_CASE_PROMPT.format(
+                case_id=case_id,
+                question=QuestionTemplate.format(question_text=query),
+                option=OptionsTemplate.format(option_text=options),
+                short_context=ShortContextTemplate.format(short_context=short_context),
+            )
+            for case_id, query, options, short_context in cases
+        )
+        questions = [query for _, query, _, _ in cases]
+        questions += [short_context for _, _, _, short_context in cases]
+        options = [options for _, _, options, _ in cases]
+        self._fitted = False
+        if context_extension(full_context_path) in MULTIMODAL_EXTENSIONS:
+            user_prompt, system_prompt = cases_prompt, PACKED_MULTIMODAL_SYSTEM_PROMPT
+        else:
+            context_text = self._read_context(full_context_path)
+            context_text = self._fit_context(
+                context_text, PACKED_SYSTEM_PROMPT, *questions, *options
+            )
+            user_prompt = PACKED_TEXT_USER_PROMPT.format(
+                context=ContextTemplate.format(relevant_context=context_text),
+                cases=cases_prompt,
+            )
+            system_prompt = PACKED_SYSTEM_PROMPT
+
+        self._record_size(system_prompt, user_prompt, questions, options)
+        return user_prompt, system_prompt
+
     def _craft_naive_prompt(
         self,
         query: str,
@@ -95,14 +275,45 @@ class PromptCrafter:
         )
         return user_prompt, REPHRASE_SYSTEM_PROMPT
 
+    def _read_context(self, full_context_path: str) -> str:
+        """Returns the text of a PDF or text file context.
+
+        Any other string, such as a context passed inline, is the context itself.
+        """
+        if context_extension(full_context_path) == ".pdf":
+            return self.pdf_parser.parse(full_context_path)
+        if context_extension(full_context_path) == ".txt" and os.path.isfile(
+            full_context_path
+        ):
+            with open(full_context_path, encoding="utf-8") as file:
+                return file.read()
+        return full_context_path
+
+    def _select_context(self, context_text: str, *query_parts: str) -> str:
+        """Keeps the `McqaConfig.context_top_k` chunks of a context relevant to a query.
+
+        The whole context is kept when context selection is off.
+        """
+        top_k = self.mcqa_config.context_top_k
+        if top_k <= 0:
+            return context_text
+        return self.context_selector.select(
+            context_text, " ".join(part for part in query_parts if part), top_k
+        )
+
     def _craft_text_based_prompt(
         self, full_context_path: str, query: str, options: str, short_context: str
     ):
-        """Crafts a text-based prompt for PDF or text context."""
-        if ".pdf" in full_context_path:
-            context_text = self.pdf_parser.parse(full_context_path)
-        else:
-            context_text = full_context_path
+        """Crafts a text-based prompt for PDF or text context.
+
+        With context selection on, only the chunks of the context relevant to the
+        question, options and short context are sent.
+        """
+        context_text = self._read_context(full_context_path)
+        context_text = self._select_context(context_text, query, options, short_context)
+        context_text = self._fit_context(
+            context_text, SYSTEM_PROMPT, query, options, short_context
+        )
 
         question = QuestionTemplate.format(question_text=query)
         full_context_path = ContextTemplate.format(relevant_context=context_text)
@@ -139,10 +350,15 @@ class PromptCrafter:
         full_context_path: Any,
         short_context: str,
     ):
-        if not re.search(
-            "|".join([".png", ".jpeg", ".jpg", ".pdf"]), full_context_path
-        ):
-            context_text = full_context_path
+        if context_extension(full_context_path) not in MULTIMODAL_EXTENSIONS:
+            context_text = self._fit_context(
+                self._read_context(full_context_path),
+                SYNTHETIC_SYSTEM_PROMPT,
+                query,
+                options,
+                answer,
+                short_context,
+            )
 
             """Crafts a synthetic prompt for generating multiple questions."""
             question = QuestionTemplate.format(question_text=query)
@@ -161,7 +377,7 @@ class PromptCrafter:
             )
             return user_prompt, SYNTHETIC_SYSTEM_PROMPT
 
-        if re.search("|".join([".png", ".jpeg", ".jpg", ".pdf"]), full_context_path):
+        if context_extension(full_context_path) in MULTIMODAL_EXTENSIONS:
             """Crafts a synthetic prompt for generating multiple questions."""
             question = QuestionTemplate.format(question_text=query)
             option = OptionsTemplate.format(option_text=options)
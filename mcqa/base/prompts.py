@@ -165,6 +165,28 @@ Provide your final answer as per the format shown between <MCQRephrase></MCQReph
 </MCQRephrase>
 """
 
+PACKED_CASES_PROMPT = """
+
+Packed cases:
+You may receive several cases at once, each wrapped in <Case id="[ID]"></Case> and sharing the same <Context></Context>.
+Answer every case independently and in order, with one <MCQResponse id="[ID]"></MCQResponse> per case carrying the ID of its case.
+
+<MCQResponse id="[ID]">
+    <Answer>[Option]</Answer>
+    <RelevantExcerpts>
+        [Add the excerpts in bulleted list marked by `-`]
+    </RelevantExcerpts>
+    <Thinking>
+       [Think step by step and add your thoughts based on the question and context which would help us arrive at the answer in bulleted list with `-` in the front]
+    </Thinking>
+    <FoundationalKnowledge>
+        [Yes/No]
+    </FoundationalKnowledge>
+</MCQResponse>
+"""
+PACKED_SYSTEM_PROMPT = SYSTEM_PROMPT + PACKED_CASES_PROMPT
+PACKED_MULTIMODAL_SYSTEM_PROMPT = MULTIMODAL_SYSTEM_PROMPT + PACKED_CASES_PROMPT
+
 MULTIMODAL_SYNTHETIC_SYSTEM_PROMPT = """You will act as Medical AI chatbot, which analyzes context in text, question and answer to generate synthetic questions based on the context with multiple answer choices and correct answer that is canonical in the format.
 You will receive context as an image/pdf, question, list of options and actual answer as input in the XML string format. The XMl contains the following:
 
@@ -290,6 +312,10 @@ SYNTHETIC_USER_PROMPT = (
 )
 TEXT_USER_PROMPT = """<Case>{question}{option}{context}{short_context}</Case>"""
 MULTIMODAL_USER_PROMPT = """<Case>{question}{option}{short_context}</Case>"""
+PACKED_CASE_PROMPT = (
+    """<Case id="{case_id}">{question}{option}{short_context}</Case>\n"""
+)
+PACKED_TEXT_USER_PROMPT = """{context}{cases}"""
 MULTIMODAL_SYNTHETIC_USER_PROMPT = (
     """<Case>{n_questions}{query}{option}{answer}{short_context}</Case>"""
 )
@@ -1,7 +1,7 @@
 import random
 import re
 import string
-from typing import List
+from typing import List, Tuple
 
 from mcqa.base.prompt_crafter import PromptCrafter
 from mcqa.commons import logger
@@ -13,9 +13,14 @@ logger = logger.setup_logger()
 class QuestionFormation(QuestionFormationInterface):
     """Class for forming questions based on the given request."""
 
-    def __init__(self):
-        """Initializes the QuestionFormation."""
-        self.prompt_crafter = PromptCrafter()
+    def __init__(self, prompt_crafter: PromptCrafter = None):
+        """Initializes the QuestionFormation.
+
+        Args:
+            prompt_crafter (PromptCrafter, optional): The prompt crafter to use.
+                Defaults to a new PromptCrafter.
+        """
+        self.prompt_crafter = prompt_crafter or PromptCrafter()
 
     def options_randomizer(self, options: List[str]):
         """Randomizes the order of options."""
@@ -41,6 +46,20 @@ class QuestionFormation(QuestionFormationInterface):
             )
         )
 
+    def format_options(
+        self, options: List[str], answer: str, options_randomizer: bool = False
+    ) -> Tuple[str, str]:
+        """Formats the options of a raw question, shuffling them if requested.
+
+        Returns:
+            Tuple[str, str]: The options text and the (possibly re-lettered) answer.
+        """
+        if not options_randomizer:
+            return "\n ".join(options), answer
+
+        options_dt = self.options_randomizer(options)
+        return "\n ".join(options_dt.values()), options_dt[answer]
+
     def use_raw_question(
         self,
         query: str,
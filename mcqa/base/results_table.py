@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import os
+from typing import Dict, List
+
+import pandas as pd
+
+from mcqa.base.evaluation import QAEvaluation
+from mcqa.commons import logger
+from mcqa.commons.result_writer import read_results
+from mcqa.domain.response_generator import (QuestionResponse,
+                                            ResponsesFromSources, ResultRecord)
+
+logger = logger.setup_logger()
+
+SUMMARY_GROUPS = {
+    "model": ["model", "model_name"],
+    "format": ["question_format"],
+    "document": ["source_type", "source_path"],
+}
+
+
+class ResultsTable:
+    """Columnar table of the question responses of a batch run.
+
+    The table has one row per QuestionResponse. Synthetic and rephrase rows
+    are expanded into their sub-questions, numbered by `sub_question`.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        """Initializes the ResultsTable.
+
+        Args:
+            frame (pd.DataFrame): The results, one row per question response.
+        """
+        self.frame = frame
+
+    @classmethod
+    def from_rows(
+        cls,
+        question_format: str,
+        source_paths: List[str],
+        row_responses: Dict[int, QuestionResponse | ResponsesFromSources | None],
+    ) -> ResultsTable:
+        """Builds the table from the responses of a batch run.
+
+        Args:
+            question_format (str): The question format of the run.
+            source_paths (List[str]): The source document of each row, in row order.
+            row_responses (Dict[int, QuestionResponse | ResponsesFromSources | None]):
+                The responses by row number, None for the rows that failed.
+
+        Returns:
+            ResultsTable: The results table.
+        """
+        records = []
+        for _n, source_path in enumerate(source_paths):
+            response = row_responses.get(_n)
+            if response is None:
+                continue
+            responses = (
+                response.list_of_responses
+                if isinstance(response, ResponsesFromSources)
+                else [response]
+            )
+            for sub_question, question_response in enumerate(responses):
+                metadata = question_response.metadata
+                prompt_size = metadata.prompt_size
+                records.append(
+                    {
+                        "row": _n,
+                        "sub_question": sub_question,
+                        "model": metadata.model,
+                        "model_name": metadata.model_name,
+                        "question_format": question_format,
+                        "source_type": os.path.splitext(source_path)[1]
+                        .lstrip(".")
+                        .lower(),
+                        "source_path": source_path,
+                        "question": question_response.question,
+                        "generated_answer": question_response.generated_answer,
+                        "actual_answer": question_response.actual_answer,
+                        "evaluation": question_response.evaluation,
+                        "latency": metadata.latency,
+                        "input_tokens": metadata.input_tokens,
+                        "output_tokens": metadata.output_tokens,
+                        "cached": metadata.cached,
+                        "prompt_tokens": (
+                            prompt_size.total_tokens if prompt_size else None
+                        ),
+                        "prompt_context_tokens": (
+                            prompt_size.context_tokens if prompt_size else None
+                        ),
+                    }
+                )
+        frame = pd.DataFrame.from_records(
+            records,
+            columns=[
+                "row",
+                "sub_question",
+                "model",
+                "model_name",
+                "question_format",
+                "source_type",
+                "source_path",
+                "question",
+                "generated_answer",
+                "actual_answer",
+                "evaluation",
+                "latency",
+                "input_tokens",
+                "output_tokens",
+                "cached",
+                "prompt_tokens",
+                "prompt_context_tokens",
+            ],
+        )
+        for column in [
+            "latency",
+            "input_tokens",
+            "output_tokens",
+            "prompt_tokens",
+            "prompt_context_tokens",
+        ]:
+            frame[column] = pd.to_numeric(frame[column])
+        frame["cached"] = frame["cached"].astype("boolean")
+        return cls(frame)
+
+    @classmethod
+    def from_results(cls, results_path: str) -> ResultsTable:
+        """Builds the table of a batch run from its `results.jsonl` checkpoint.
+
+        The latest record of each row wins, like when the run is resumed.
+
+        Args:
+            results_path (str): The results file of the run, compressed if it
+                ends with `.gz`.
+
+        Returns:
+            ResultsTable: The results table, with the scores stored in the file.
+        """
+        question_format, source_paths, row_responses = None, {}, {}
+        for record in read_results(results_path):
+            result = ResultRecord.model_validate(record)
+            question_format = result.request.question_format
+            source_paths[result.row] = result.request.full_context_path
+            row_responses[result.row] = (
+                result.response if result.status == "succeeded" else None
+            )
+        return cls.from_rows(
+            question_format,
+            [source_paths.get(_n) for _n in range(max(source_paths, default=-1) + 1)],
+            row_responses,
+        )
+
+    def rescore(self) -> ResultsTable:
+        """Scores the generated answers of the table again, with the current scorer.
+
+        Returns:
+            ResultsTable: The table, with its `evaluation` column updated.
+        """
+        self.frame["evaluation"] = QAEvaluation().evaluate_batch(
+            self.frame["generated_answer"].tolist(),
+            self.frame["actual_answer"].tolist(),
+        )
+        return self
+
+    def summary(self, by: List[str]) -> pd.DataFrame:
+        """Aggregates accuracy, latency and token usage by the given columns.
+
+        Args:
+            by (List[str]): The columns to group by.
+
+        Returns:
+            pd.DataFrame: One row per group with the number of questions, the
+                accuracy and its bootstrap confidence interval, the mean and 95th
+                percentile latency, the token totals and the share of cached
+                responses.
+        """
+        usage = (
+            self.frame.groupby(by, dropna=False, sort=True)
+            .agg(
+                latency_mean=("latency", "mean"),
+                latency_p95=("latency", lambda latency: latency.quantile(0.95)),
+                input_tokens=("input_tokens", "sum"),
+                output_tokens=("output_tokens", "sum"),
+                cached_share=("cached", "mean"),
+            )
+            .reset_index()
+        )
+        accuracy = QAEvaluation().grouped_accuracy(self.frame, by)
+        return pd.concat([accuracy, usage.drop(columns=by)], axis=1)
+
+    def _write_frame(self, frame: pd.DataFrame, path: str) -> str:
+        """Writes a frame as Parquet, or as CSV when no Parquet engine is installed."""
+        try:
+            frame.to_parquet(f"{path}.parquet", index=False)
+            return f"{path}.parquet"
+        except ImportError as e:
+            logger.warning(f"Writing {path}.csv, Parquet is unavailable: {e}")
+            frame.to_csv(f"{path}.csv", index=False)
+            return f"{path}.csv"
+
+    def write(self, output_path: str) -> Dict[str, str]:
+        """Writes the results table and its summary tables to `output_path`.
+
+        Args:
+            output_path (str): The directory of the run.
+
+        Returns:
+            Dict[str, str]: The written paths, keyed by `results` and
+                `summary_by_<model|format|document>`.
+        """
+        paths = {
+            "results": self._write_frame(
+                self.frame, os.path.join(output_path, "results")
+            )
+        }
+        for name, by in SUMMARY_GROUPS.items():
+            paths[f"summary_by_{name}"] = self._write_frame(
+                self.summary(by), os.path.join(output_path, f"summary_by_{name}")
+            )
+        return paths
@@ -0,0 +1,127 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from mcqa.commons import logger, tracing
+from mcqa.domain.response_generator import Question
+
+logger = logger.setup_logger()
+
+
+class LazyResources:
+    """Resources of a document built once, on first use, and shared by its rows.
+
+    Rows answered from the response cache or a replayed recording never call
+    it, so their document is not parsed or uploaded.
+    """
+
+    def __init__(self, build: Callable[[], Any]):
+        """Initializes the LazyResources.
+
+        Args:
+            build (Callable[[], Any]): Builds the resources of the document.
+        """
+        self._build = build
+        self._built = False
+        self._resources = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> Any:
+        """Returns the resources, building them if no row has yet.
+
+        Rows asking while they are built wait for them. A failed build raises
+        and is tried again by the next row.
+        """
+        with self._lock:
+            if not self._built:
+                self._resources = self._build()
+                self._built = True
+            return self._resources
+
+
+@dataclass
+class DocumentBatch:
+    """The rows of a batch run that share a source document and attachment set."""
+
+    source_path: str
+    attachments: Tuple[str, ...]
+    rows: List[Tuple[int, Question]] = field(default_factory=list)
+    resources: Any = None
+    pending: int = 0
+
+
+class DocumentScheduler:
+    """Buckets the rows of a batch run by source document.
+
+    Rows sharing a document are run back to back: the resources of the
+    document (such as its parsed or uploaded attachments) are prepared once
+    before its rows fan out, possibly as LazyResources built by the first row
+    that needs them, shared by every row, and released once the last row
+    finishes. Batches keep the order in which their documents first
+    appear, rows keep their original row numbers, and at most
+    `max_prepared` documents hold resources at a time.
+    """
+
+    def __init__(self, prepare: Callable[[Question], Any], max_prepared: int = 8):
+        """Initializes the DocumentScheduler.
+
+        Args:
+            prepare (Callable[[Question], Any]): Builds the shared resources of a
+                document from the first request of its batch.
+            max_prepared (int): The number of documents whose resources may be
+                held at once. Preparing another document waits for a slot.
+        """
+        self._prepare = prepare
+        self._slots = threading.BoundedSemaphore(max(1, max_prepared))
+        self._lock = threading.Lock()
+
+    def schedule(self, rows: Iterable[Tuple[int, Question]]) -> List[DocumentBatch]:
+        """Groups rows by source document and attachment set.
+
+        Args:
+            rows (Iterable[Tuple[int, Question]]): The row numbers and requests.
+
+        Returns:
+            List[DocumentBatch]: The batches, in order of first appearance.
+        """
+        batches: Dict[Tuple[str, Tuple[str, ...]], DocumentBatch] = {}
+        for _n, request in rows:
+            key = (request.full_context_path, tuple(request.attachments or []))
+            if key not in batches:
+                batches[key] = DocumentBatch(source_path=key[0], attachments=key[1])
+            batches[key].rows.append((_n, request))
+
+        for batch in batches.values():
+            batch.pending = len(batch.rows)
+        return list(batches.values())
+
+    def prepare(self, batch: DocumentBatch):
+        """Prepares the shared resources of a batch, waiting for a free slot.
+
+        Rows of a batch whose preparation fails run without shared resources.
+
+        Args:
+            batch (DocumentBatch): The batch about to run.
+        """
+        with tracing.span("document_slot_wait", document=batch.source_path):
+            self._slots.acquire()
+        try:
+            with tracing.span("prepare_document", document=batch.source_path):
+                batch.resources = self._prepare(batch.rows[0][1])
+        except Exception as e:
+            logger.warning(f"Could not prepare {batch.source_path}: {e}")
+            batch.resources = None
+
+    def row_done(self, batch: DocumentBatch, rows: int = 1):
+        """Records finished rows, releasing the batch resources after the last one.
+
+        Args:
+            batch (DocumentBatch): The batch of the rows.
+            rows (int): The number of rows that finished. Defaults to 1.
+        """
+        with self._lock:
+            batch.pending -= rows
+            if batch.pending:
+                return
+            batch.resources = None
+        self._slots.release()
@@ -0,0 +1,124 @@
+"""Accuracy-vs-tokens report of context selection.
+
+For each k, measures the context tokens sent per question when only the top-k
+chunks of its document are kept (k=0 keeping the whole document), and the
+share of the question's short context recalled by the selected chunks. Batch
+runs made with CONTEXT_TOP_K=k can be added with --run k=OUTPUT_PATH to
+report their accuracy and input tokens next to the estimates.
+
+    python -m mcqa.benchmarks.context_selection_report processed_dataset.csv \
+        --k 0 2 4 8 16 --run 0=runs/full --run 4=runs/top4
+"""
+
+import argparse
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from mcqa.base.context_selector import ContextSelector, terms
+from mcqa.base.input_parser.pdf_parser import PdfParser
+from mcqa.commons.tokens import estimate_tokens
+from mcqa.dataloaders.csv_loader import CsvLoader
+
+
+def read_context(full_context_path: str) -> Optional[str]:
+    """Returns the text of a context file, or None if it cannot be read."""
+    if not os.path.exists(full_context_path):
+        return None
+    if full_context_path.endswith(".pdf"):
+        return PdfParser().parse(full_context_path)
+    with open(full_context_path, encoding="utf-8", errors="ignore") as file:
+        return file.read()
+
+
+def recall(selected: str, short_context: Optional[str]) -> Optional[float]:
+    """Returns the share of the short context words found in the selected context."""
+    expected = set(terms(short_context or ""))
+    if not expected:
+        return None
+    return len(expected & set(terms(selected))) / len(expected)
+
+
+def estimate(file_path: str, ks: List[int]) -> pd.DataFrame:
+    """Measures the selected context of every question of a CSV file for each k."""
+    selector = ContextSelector()
+    records = []
+    for question, options, _, full_context_path, short_context, _ in CsvLoader(
+        options_randomizer=False
+    ).handle_csv(file_path):
+        context_text = read_context(full_context_path)
+        if context_text is None:
+            continue
+        query = " ".join([question, *options, short_context or ""])
+        for k in ks:
+            selected = (
+                selector.select(context_text, query, k) if k > 0 else context_text
+            )
+            records.append(
+                {
+                    "k": k,
+                    "context_tokens": estimate_tokens(selected),
+                    "short_context_recall": recall(selected, short_context),
+                }
+            )
+    return (
+        pd.DataFrame.from_records(
+            records, columns=["k", "context_tokens", "short_context_recall"]
+        )
+        .groupby("k")
+        .agg(
+            questions=("context_tokens", "size"),
+            context_tokens_mean=("context_tokens", "mean"),
+            short_context_recall=("short_context_recall", "mean"),
+        )
+    )
+
+
+def run_results(runs: Dict[int, str]) -> pd.DataFrame:
+    """Reads the accuracy and input tokens of batch runs made with each k."""
+    records = []
+    for k, output_path in runs.items():
+        results_path = os.path.join(output_path, "results")
+        if os.path.exists(f"{results_path}.parquet"):
+            frame = pd.read_parquet(f"{results_path}.parquet")
+        else:
+            frame = pd.read_csv(f"{results_path}.csv")
+        records.append(
+            {
+                "k": k,
+                "accuracy": frame["evaluation"].mean(),
+                "input_tokens_mean": frame["input_tokens"].mean(),
+                "latency_mean": frame["latency"].mean(),
+            }
+        )
+    return pd.DataFrame.from_records(
+        records, columns=["k", "accuracy", "input_tokens_mean", "latency_mean"]
+    ).set_index("k")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file_path")
+    parser.add_argument("--k", type=int, nargs="+", default=[0, 2, 4, 8, 16])
+    parser.add_argument(
+        "--run",
+        action="append",
+        default=[],
+        metavar="K=OUTPUT_PATH",
+        help="The output path of a batch run made with CONTEXT_TOP_K=K.",
+    )
+    args = parser.parse_args()
+
+    runs = {int(k): path for k, path in (run.split("=", 1) for run in args.run)}
+    report = estimate(args.file_path, sorted(set(args.k) | set(runs)))
+    if runs:
+        report = report.join(run_results(runs), how="left")
+    full_tokens = report["context_tokens_mean"].get(0)
+    if full_tokens:
+        report["token_share"] = report["context_tokens_mean"] / full_tokens
+    print(report.to_string(float_format=lambda value: f"{value:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
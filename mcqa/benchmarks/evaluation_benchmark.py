@@ -0,0 +1,86 @@
+"""Benchmark of batch scoring against the per-question scorer.
+
+Scores generated answers of the shapes the post-processor extracts (bare
+letters, letters with their option text, lowercase letters, free text, empty
+or non-ASCII answers) with QAEvaluation.evaluate one at a time and with
+QAEvaluation.evaluate_batch at once, checks that every score matches, and
+reports the time of each.
+
+    python -m mcqa.benchmarks.evaluation_benchmark --questions 100000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from mcqa.base.evaluation import QAEvaluation
+
+LETTERS = "ABCDEFGH"
+GENERATED_SHAPES = [
+    lambda letter: letter,
+    lambda letter: f"{letter}. 99mTc-labeled human serum albumin",
+    lambda letter: f" {letter.lower()} ",
+    lambda letter: f" {letter} ",
+    lambda letter: "None of the options",
+    lambda letter: "",
+]
+ACTUAL_SHAPES = [
+    lambda letter: letter,
+    lambda letter: f"{letter}. 99mTc-labeled human serum albumin",
+    lambda letter: f" {letter}) Thallium-201 (201Tl)",
+    lambda letter: "none",
+]
+
+
+def answer_pairs(questions: int, seed: int):
+    """Returns generated and actual answers of every shape, drawn at random."""
+    rng = random.Random(seed)
+    generated_answers, actual_answers = [], []
+    for _ in range(questions):
+        generated_answers.append(rng.choice(GENERATED_SHAPES)(rng.choice(LETTERS)))
+        actual_answers.append(rng.choice(ACTUAL_SHAPES)(rng.choice(LETTERS)))
+    return generated_answers, actual_answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    evaluation = QAEvaluation()
+    generated_answers, actual_answers = answer_pairs(args.questions, args.seed)
+
+    started = time.perf_counter()
+    scores = np.array(
+        [
+            evaluation.evaluate(generated_answer, actual_answer)
+            for generated_answer, actual_answer in zip(
+                generated_answers, actual_answers
+            )
+        ]
+    )
+    per_question = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch_scores = evaluation.evaluate_batch(generated_answers, actual_answers)
+    batch = time.perf_counter() - started
+
+    mismatches = np.flatnonzero(scores != batch_scores)
+    for k in mismatches[:10]:
+        print(
+            f"Mismatch: {generated_answers[k]!r} vs {actual_answers[k]!r}: "
+            f"{scores[k]} != {batch_scores[k]}"
+        )
+    print(f"{'scorer':<14}{'seconds':>10}{'questions/s':>14}")
+    for name, seconds in [("per-question", per_question), ("batch", batch)]:
+        print(f"{name:<14}{seconds:>10.3f}{args.questions / seconds:>14.0f}")
+    print(f"{len(mismatches)} mismatches, accuracy {QAEvaluation.accuracy(scores):.2f}")
+    if len(mismatches):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
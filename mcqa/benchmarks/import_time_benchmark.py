@@ -0,0 +1,89 @@
+"""Import-time benchmark of the API, the pipeline and the provider registry.
+
+Times, in fresh interpreters, the imports a uvicorn worker or CLI invocation
+pays before answering its first request, and lists the heavy third-party
+modules each one loads. The `eager` scenario imports every provider module
+and the batch dependencies up front, as mcqa.mcqa and mcqa.llm_router used
+to, for comparison with the lazy imports of the provider registry.
+
+    python -m mcqa.benchmarks.import_time_benchmark --repeat 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = [
+    "google.generativeai",
+    "openai",
+    "ollama",
+    "httpx",
+    "pandas",
+    "PyPDF2",
+]
+EAGER_IMPORTS = [
+    "mcqa.models.text.gemini_text_response_generator",
+    "mcqa.models.text.openai_text_response_generator",
+    "mcqa.models.multimodal.gemini_multimodal_response_generator",
+    "mcqa.models.multimodal.openai_multimodal_response_generator",
+    "mcqa.models.multimodal.llama_multimodal_response_generator",
+    "mcqa.models.fake.fake_response_generator",
+    "mcqa.dataloaders.csv_loader",
+    "mcqa.base.results_table",
+    "PyPDF2",
+    "google.generativeai",
+]
+SCENARIOS = {
+    "api": "import mcqa.llm_api",
+    "pipeline": "import mcqa.mcqa",
+    "fake provider": (
+        "from mcqa.llm_router import LLMRouter; LLMRouter(text_model='fake')"
+    ),
+    "eager": "import mcqa.llm_api\n"
+    + "\n".join(f"import {module}" for module in EAGER_IMPORTS),
+}
+WORKER = """
+import json, sys, time
+started = time.perf_counter()
+exec(sys.argv[1])
+elapsed = time.perf_counter() - started
+heavy_modules = json.loads(sys.argv[2])
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [module for module in heavy_modules if module in sys.modules],
+}))
+"""
+
+
+def time_import(statement: str) -> dict:
+    """Runs a statement in a fresh interpreter and measures its imports."""
+    worker = subprocess.run(
+        [sys.executable, "-c", WORKER, statement, json.dumps(HEAVY_MODULES)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        check=True,
+    )
+    return json.loads(worker.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS))
+    args = parser.parse_args()
+
+    print(f"{'scenario':<16}{'median s':>10}{'min s':>10}  heavy modules loaded")
+    for name in args.scenarios:
+        runs = [time_import(SCENARIOS[name]) for _ in range(args.repeat)]
+        seconds = [run["seconds"] for run in runs]
+        print(
+            f"{name:<16}{statistics.median(seconds):>10.3f}{min(seconds):>10.3f}"
+            f"  {', '.join(runs[-1]['loaded']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
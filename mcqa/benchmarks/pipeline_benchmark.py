@@ -0,0 +1,237 @@
+"""End-to-end throughput benchmark of batch runs on the fake provider.
+
+Runs generate_response_from_files over a question bank in each question
+format, with the text and multimodal models set to the offline fake provider,
+so the figures measure the pipeline itself on top of the simulated provider
+latency, without API calls. Each format runs in a fresh process so that its
+peak memory is its own, with the response cache disabled. The documents of the
+question bank are replaced by generated text contexts of --context-words
+words, since the evaluation corpus is not shipped with the repository, and
+the benchmark fails if the prompts do not carry those contexts.
+
+Reports the rows and answered questions per second, the p50 and p99 latency
+of a row (from the run trace), the mean context tokens of a prompt and the
+peak resident memory of each format.
+
+    python -m mcqa.benchmarks.pipeline_benchmark processed_dataset.csv \
+        --formats raw naive rephrase synthetic --max-concurrency 8 \
+        --latency-distribution lognormal --latency-mean 0.05 --latency-spread 0.5
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+import pandas as pd
+
+from mcqa.commons.tokens import estimate_tokens
+from mcqa.dataloaders.CsvColumns import CsvColumns
+from mcqa.domain.response_generator import QuestionsFromSourcesRequest
+from mcqa.mcqa import Mcqa
+
+
+def prepare_dataset(
+    file_path: str, work_dir: str, context_words: int, rows: int = None
+) -> Tuple[str, float]:
+    """Writes a copy of a question bank whose documents are generated text files.
+
+    The context of a document repeats the questions and options of its rows
+    until it reaches `context_words` words.
+
+    Returns:
+        Tuple[str, float]: The path of the question bank copy and the mean
+            estimated tokens of its contexts.
+    """
+    frame = pd.read_csv(file_path)
+    frame = frame[frame[CsvColumns.SOURCE_PATH].notna()]
+    if rows:
+        frame = frame.head(rows)
+
+    options_column = (
+        CsvColumns.OPTIONS
+        if CsvColumns.OPTIONS in frame.columns
+        else CsvColumns.ALL_ANSWERS
+    )
+    context_dir = os.path.join(work_dir, "contexts")
+    os.makedirs(context_dir, exist_ok=True)
+    context_paths, context_tokens = {}, []
+    for k, (source_path, group) in enumerate(frame.groupby(CsvColumns.SOURCE_PATH)):
+        words = " ".join(
+            group[CsvColumns.QUERY].astype(str)
+            + " "
+            + group[options_column].astype(str)
+        ).split()
+        words = (words * (context_words // max(1, len(words)) + 1))[:context_words]
+        context_paths[source_path] = os.path.join(context_dir, f"{k}.txt")
+        with open(context_paths[source_path], "w") as file:
+            file.write(" ".join(words))
+        context_tokens.append(estimate_tokens(" ".join(words)))
+
+    frame[CsvColumns.SOURCE_PATH] = frame[CsvColumns.SOURCE_PATH].map(context_paths)
+    dataset_path = os.path.join(work_dir, "questions.csv")
+    frame.to_csv(dataset_path, index=False)
+    return dataset_path, sum(context_tokens) / max(1, len(context_tokens))
+
+
+def row_latencies(trace_path: str) -> List[float]:
+    """Returns the seconds each row took, from the row tracks of a run trace."""
+    with open(trace_path) as file:
+        events = json.load(file)["traceEvents"]
+    return [
+        event["dur"] / 1e6
+        for event in events
+        if event["ph"] == "X"
+        and event["name"].startswith("row")
+        and "/" not in event["name"]
+        and "rows" in event["args"]
+    ]
+
+
+def run_format(
+    dataset_path: str, question_format: str, output_path: str, max_concurrency: int
+) -> dict:
+    """Runs a question bank in one format and measures the run."""
+    request = QuestionsFromSourcesRequest(
+        file_type="csv",
+        file_path=dataset_path,
+        output_path=output_path,
+        question_format=question_format,
+        max_concurrency=max_concurrency,
+        resume=False,
+    )
+    started = time.perf_counter()
+    response = Mcqa(request=request).generate_response_from_files(
+        file_path=dataset_path,
+        file_type="csv",
+        question_format=question_format,
+        output_path=output_path,
+        max_concurrency=max_concurrency,
+        resume=False,
+        trace=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    latencies = pd.Series(row_latencies(os.path.join(output_path, "trace.json")))
+    context_tokens = pd.Series(
+        [
+            question_response.metadata.prompt_size.context_tokens
+            for question_response in response.list_of_responses
+            if question_response.metadata.prompt_size
+        ],
+        dtype=float,
+    )
+    return {
+        "format": question_format,
+        "rows": len(latencies),
+        "questions": len(response.list_of_responses),
+        "seconds": elapsed,
+        "rows_per_sec": len(latencies) / elapsed,
+        "questions_per_sec": len(response.list_of_responses) / elapsed,
+        "p50_latency": latencies.quantile(0.5),
+        "p99_latency": latencies.quantile(0.99),
+        "context_tokens": context_tokens.mean(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file_path")
+    parser.add_argument(
+        "--formats", nargs="+", default=["raw", "naive", "rephrase", "synthetic"]
+    )
+    parser.add_argument("--rows", type=int, default=None)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--context-words", type=int, default=2000)
+    parser.add_argument(
+        "--latency-distribution",
+        choices=["constant", "uniform", "exponential", "lognormal"],
+        default="constant",
+    )
+    parser.add_argument("--latency-mean", type=float, default=0.0)
+    parser.add_argument("--latency-spread", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--sub-questions", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default=None)
+    parser.add_argument("--worker", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        dataset_path, question_format, output_path = args.worker
+        print(
+            json.dumps(
+                run_format(
+                    dataset_path, question_format, output_path, args.max_concurrency
+                )
+            )
+        )
+        return
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="mcqa_benchmark_")
+    dataset_path, context_tokens = prepare_dataset(
+        args.file_path, work_dir, args.context_words, args.rows
+    )
+    env = {
+        **os.environ,
+        "TEXT_MODEL": "fake",
+        "MULTIMODAL_MODEL": "fake",
+        "RESPONSE_CACHE_ENABLED": "false",
+        "CONTEXT_TOP_K": "0",
+        "MCQA_CACHE_DIR": os.path.join(work_dir, "cache"),
+        "FAKE_LATENCY_DISTRIBUTION": args.latency_distribution,
+        "FAKE_LATENCY_MEAN": str(args.latency_mean),
+        "FAKE_LATENCY_SPREAD": str(args.latency_spread),
+        "FAKE_ERROR_RATE": str(args.error_rate),
+        "FAKE_RATE_LIMIT_RATE": str(args.rate_limit_rate),
+        "FAKE_SUB_QUESTIONS": str(args.sub_questions),
+        "FAKE_SEED": str(args.seed),
+    }
+
+    records = []
+    for question_format in args.formats:
+        worker = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "mcqa.benchmarks.pipeline_benchmark",
+                args.file_path,
+                "--max-concurrency",
+                str(args.max_concurrency),
+                "--worker",
+                dataset_path,
+                question_format,
+                os.path.join(work_dir, "runs", question_format),
+            ],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            check=True,
+        )
+        records.append(json.loads(worker.stdout.strip().splitlines()[-1]))
+
+    report = pd.DataFrame.from_records(records).set_index("format")
+    print(report.to_string(float_format=lambda value: f"{value:.3f}"))
+    print(f"Runs written to {work_dir}")
+
+    # The whole context fits every budget, so prompts must carry most of it.
+    short = report[~(report["context_tokens"] >= context_tokens / 2)]
+    for question_format, record in short.iterrows():
+        print(
+            f"{question_format} prompts carry {record['context_tokens']:.0f} context "
+            f"tokens, expected about {context_tokens:.0f}"
+        )
+    if len(short):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Micro-benchmark of response post-processing.
+
+Compares the single-pass TagExtractor used by PostProcessor with the previous
+per-field regex scans, on a well-formed answer, a truncated answer and a
+synthetic-questions response.
+
+    python -m mcqa.benchmarks.postprocessor_benchmark --repeat 20000
+"""
+
+import argparse
+import re
+import timeit
+
+from mcqa.base.postprocessor import QUESTION_TAGS, RESPONSE_TAGS
+
+# The per-field patterns PostProcessor used before TagExtractor
+LEGACY_RESPONSE_PATTERNS = {
+    "Answer": r"<Answer>(.*?)</Answer>",
+    "RelevantExcerpts": r"<RelevantExcerpts>(.*?)</RelevantExcerpts>",
+    "Thinking": r"<Thinking>(.*?)</Thinking>",
+    "FoundationalKnowledge": r"<FoundationalKnowledge>(.*?)</FoundationalKnowledge>",
+}
+LEGACY_QUESTION_PATTERNS = [
+    re.compile(rf"<{tag}>\s*(.*?)\s*</{tag}>", re.DOTALL)
+    for tag in ("Question", "Options", "Answer")
+]
+
+ANSWER_RESPONSE = (
+    "<MCQResponse><Answer>D</Answer>"
+    "<RelevantExcerpts>"
+    + "Gated blood pool imaging with labeled albumin. " * 20
+    + "</RelevantExcerpts>"
+    "<Thinking>"
+    + "The excerpt describes the first noninvasive method. " * 30
+    + "</Thinking>"
+    "<FoundationalKnowledge>No</FoundationalKnowledge></MCQResponse>"
+)
+TRUNCATED_RESPONSE = ANSWER_RESPONSE[: ANSWER_RESPONSE.index("</Thinking>")]
+QUESTIONS_RESPONSE = "".join(
+    f"<Question>Sub question {k}?</Question>"
+    "<Options>A. alpha B. beta C. gamma D. delta</Options>"
+    "<Answer>B. beta</Answer>"
+    for k in range(10)
+)
+
+
+def legacy_postprocess(generated_response: str) -> dict:
+    """The previous PostProcessor.postprocess extraction, one scan per field."""
+
+    def search(pattern: str, default_value: str) -> str:
+        match = re.search(pattern, generated_response, re.DOTALL)
+        return match.group(1) if match else default_value
+
+    return {
+        tag: search(pattern, tag) for tag, pattern in LEGACY_RESPONSE_PATTERNS.items()
+    }
+
+
+def single_pass_postprocess(generated_response: str) -> dict:
+    """The PostProcessor.postprocess extraction, one sweep for every field."""
+    return RESPONSE_TAGS.extract_first(
+        generated_response, {tag: tag for tag in RESPONSE_TAGS.tags}
+    )
+
+
+def legacy_questions(generated_response: str) -> list:
+    """The previous postprocess_synthetic extraction, one findall per field."""
+    return list(
+        zip(
+            *(
+                pattern.findall(generated_response)
+                for pattern in LEGACY_QUESTION_PATTERNS
+            )
+        )
+    )
+
+
+def single_pass_questions(generated_response: str) -> list:
+    """The postprocess_synthetic extraction, one sweep for every field."""
+    fields = QUESTION_TAGS.extract(generated_response)
+    return list(zip(fields["Question"], fields["Options"], fields["Answer"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    assert legacy_postprocess(ANSWER_RESPONSE) == single_pass_postprocess(
+        ANSWER_RESPONSE
+    )
+    assert legacy_questions(QUESTIONS_RESPONSE) == single_pass_questions(
+        QUESTIONS_RESPONSE
+    )
+
+    cases = [
+        ("answer", legacy_postprocess, single_pass_postprocess, ANSWER_RESPONSE),
+        ("truncated", legacy_postprocess, single_pass_postprocess, TRUNCATED_RESPONSE),
+        ("questions", legacy_questions, single_pass_questions, QUESTIONS_RESPONSE),
+    ]
+    print(f"{'case':<12}{'legacy us':>12}{'single us':>12}{'speedup':>10}")
+    for name, legacy, single_pass, response in cases:
+        legacy_time = timeit.timeit(lambda: legacy(response), number=args.repeat)
+        single_time = timeit.timeit(lambda: single_pass(response), number=args.repeat)
+        print(
+            f"{name:<12}{legacy_time / args.repeat * 1e6:>12.2f}"
+            f"{single_time / args.repeat * 1e6:>12.2f}"
+            f"{legacy_time / single_time:>9.2f}x"
+        )
+    print("truncated legacy:", legacy_postprocess(TRUNCATED_RESPONSE)["Thinking"][:40])
+    print(
+        "truncated single:",
+        single_pass_postprocess(TRUNCATED_RESPONSE)["Thinking"][:40],
+    )
+
+
+if __name__ == "__main__":
+    main()
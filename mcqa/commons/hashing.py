@@ -0,0 +1,44 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Tuple, Union
+
+CHUNK_SIZE = 1 << 20
+
+_file_hashes: Dict[Tuple[str, int, int], str] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def text_sha256(text: Union[str, bytes]) -> str:
+    """Returns the hex sha256 digest of a text or bytes object."""
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return hashlib.sha256(text).hexdigest()
+
+
+def file_sha256(file_path: str) -> str:
+    """Returns the hex sha256 digest of a file's content.
+
+    Digests are memoized by path, size and modification time, so a file is
+    read at most once per process unless it changes.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        str: The hex sha256 digest.
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        if key in _file_hashes:
+            return _file_hashes[key]
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    with _file_hashes_lock:
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
@@ -0,0 +1,38 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe in-memory cache holding the `max_items` most recently used entries."""
+
+    def __init__(self, max_items: int):
+        """Initializes the LRUCache.
+
+        Args:
+            max_items (int): The maximum number of entries kept in memory.
+        """
+        self.max_items = max_items
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value for the key, or None on a miss."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any):
+        """Stores a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Removes the entry for the key and returns its value, if any."""
+        with self._lock:
+            return self._entries.pop(key, None)
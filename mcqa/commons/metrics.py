@@ -0,0 +1,90 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Tuple
+
+from prometheus_client import (CONTENT_TYPE_LATEST, Counter, Histogram,
+                               generate_latest)
+
+LABELS = ("provider", "model", "question_format")
+STAGE_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+STAGE_SECONDS = Histogram(
+    "mcqa_stage_duration_seconds",
+    "Time spent in each stage of answering a question.",
+    ("stage", *LABELS),
+    buckets=STAGE_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "mcqa_stage_errors_total",
+    "Stage calls that raised an exception.",
+    ("stage", *LABELS),
+)
+LLM_TOKENS = Counter(
+    "mcqa_llm_tokens_total",
+    "Input and output tokens of the LLM requests.",
+    ("kind", *LABELS),
+)
+LLM_CACHE_HITS = Counter(
+    "mcqa_llm_cache_hits_total",
+    "LLM requests served from the response cache.",
+    LABELS,
+)
+
+_labels: ContextVar[Dict[str, str]] = ContextVar(
+    "mcqa_metric_labels", default=dict.fromkeys(LABELS, "")
+)
+
+
+def set_labels(provider: str, model: str, question_format: str):
+    """Labels the metrics recorded by the current thread or task from now on.
+
+    Args:
+        provider (str): The provider answering the question, such as gemini.
+        model (str): The name of the provider model.
+        question_format (str): The format of the question.
+    """
+    _labels.set(
+        {"provider": provider, "model": model, "question_format": question_format}
+    )
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Records the duration of a stage, and whether it raised, in its histogram.
+
+    Works as a context manager and as a decorator of synchronous functions.
+
+    Args:
+        stage (str): The name of the stage, such as llm_call.
+    """
+    labels = _labels.get()
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage=stage, **labels).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage=stage, **labels).observe(
+            time.perf_counter() - started
+        )
+
+
+def record_llm_call(last_call: dict):
+    """Counts the tokens of an LLM request, or the cache hit that answered it.
+
+    Args:
+        last_call (dict): The latency, token counts and cache status of the request.
+    """
+    labels = _labels.get()
+    if last_call.get("cached"):
+        LLM_CACHE_HITS.labels(**labels).inc()
+        return
+    for kind in ["input", "output"]:
+        LLM_TOKENS.labels(kind=kind, **labels).inc(last_call.get(f"{kind}_tokens") or 0)
+
+
+def render() -> Tuple[bytes, str]:
+    """Returns the metrics in the Prometheus text format and their content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
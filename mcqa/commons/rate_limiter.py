@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from mcqa.commons import logger
+
+logger = logger.setup_logger()
+
+RATE_LIMIT_STATUS = 429
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously over a one-minute window.
+
+    A capacity of 0 disables the bucket. Reservations may drive the level below
+    zero; later callers then wait for the debt to be repaid, which queues them
+    in arrival order.
+    """
+
+    def __init__(self, capacity_per_minute: int):
+        """Initializes a full bucket.
+
+        Args:
+            capacity_per_minute (int): The number of units granted per minute.
+        """
+        self.capacity = capacity_per_minute
+        self.refill_rate = capacity_per_minute / 60.0
+        self.level = float(capacity_per_minute)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Adds the units accrued since the last update."""
+        self.level = min(
+            self.capacity, self.level + (now - self.updated_at) * self.refill_rate
+        )
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """Takes units from the bucket.
+
+        Args:
+            amount (float): The number of units to take.
+
+        Returns:
+            float: The seconds to wait before the reserved units are available.
+        """
+        if not self.capacity:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self.level -= min(amount, self.capacity)
+            if self.level >= 0:
+                return 0.0
+            return -self.level / self.refill_rate
+
+    def adjust(self, amount: float):
+        """Debits (or credits, if negative) units without waiting.
+
+        Args:
+            amount (float): The number of units to debit.
+        """
+        if not self.capacity:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.level = min(self.capacity, self.level - amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets for one provider model."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        """Initializes the RateLimiter.
+
+        Args:
+            requests_per_minute (int): The request budget, 0 for unlimited.
+            tokens_per_minute (int): The token budget, 0 for unlimited.
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.blocked_until = 0.0
+
+    def reserve(self, tokens: int) -> float:
+        """Reserves one request and `tokens` tokens.
+
+        Returns:
+            float: The seconds to wait before sending the request.
+        """
+        return max(
+            self.requests.reserve(1),
+            self.tokens.reserve(tokens),
+            self.blocked_until - time.monotonic(),
+            0.0,
+        )
+
+    def acquire(self, tokens: int):
+        """Blocks until one request and `tokens` tokens fit in the budget."""
+        wait = self.reserve(tokens)
+        if wait:
+            logger.debug(f"Rate limiter waiting {wait:.2f}s")
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int):
+        """Waits without blocking the event loop until the request fits in the budget."""
+        wait = self.reserve(tokens)
+        if wait:
+            logger.debug(f"Rate limiter waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated_tokens: int, used_tokens: int):
+        """Corrects the token budget once the actual usage of a request is known."""
+        self.tokens.adjust(used_tokens - estimated_tokens)
+
+    def block(self, seconds: float):
+        """Holds back every request for `seconds`, e.g. after a provider 429."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+_rate_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    provider: str, model: str, requests_per_minute: int, tokens_per_minute: int
+) -> RateLimiter:
+    """Returns the process-wide rate limiter of a provider model.
+
+    Args:
+        provider (str): The provider name, e.g. gemini, openai or llama.
+        model (str): The model name of the provider.
+        requests_per_minute (int): The request budget used on first creation.
+        tokens_per_minute (int): The token budget used on first creation.
+
+    Returns:
+        RateLimiter: The rate limiter shared by every router of the model.
+    """
+    with _rate_limiters_lock:
+        key = (provider, model)
+        if key not in _rate_limiters:
+            _rate_limiters[key] = RateLimiter(requests_per_minute, tokens_per_minute)
+        return _rate_limiters[key]
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    """Parses a Retry-After header given either in seconds or as an HTTP date."""
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(exception: Exception, default: float) -> Optional[float]:
+    """Returns how long to back off if the exception is a provider rate-limit error.
+
+    Handles OpenAI's RateLimitError, Gemini's ResourceExhausted and Ollama's
+    ResponseError, honoring the Retry-After header when the provider sends one.
+
+    Args:
+        exception (Exception): The exception raised by the provider SDK.
+        default (float): The back-off to use when no Retry-After header is sent.
+
+    Returns:
+        Optional[float]: The seconds to wait, or None if it is not a rate-limit error.
+    """
+    response = getattr(exception, "response", None)
+    status = getattr(exception, "status_code", None) or getattr(exception, "code", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    if status != RATE_LIMIT_STATUS and type(exception).__name__ not in (
+        "RateLimitError",
+        "ResourceExhausted",
+    ):
+        return None
+
+    headers = getattr(response, "headers", None) or {}
+    if headers.get("retry-after-ms"):
+        return float(headers["retry-after-ms"]) / 1000
+    if headers.get("retry-after"):
+        seconds = _parse_retry_after(headers["retry-after"])
+        if seconds is not None:
+            return seconds
+    return default
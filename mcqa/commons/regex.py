@@ -1,6 +1,81 @@
 import re
+from typing import Dict, Iterable, List
 
 
 def extract_regex(text: str, pattern: str):
     """Extracts text using a given regex pattern."""
     return re.findall(pattern, text)
+
+
+class TagExtractor:
+    """Single-pass extractor of the `<Tag>...</Tag>` fields of a model response.
+
+    One precompiled pattern splits the text on the opening and closing tags of
+    every field, and a single sweep over the pieces collects the text between
+    them. A field whose closing tag is missing ends where the next known tag
+    opens, or at the end of the text, so truncated responses still yield
+    their fields. Unknown tags are left inside the field text.
+    """
+
+    def __init__(self, tags: Iterable[str], strip: bool = False):
+        """Initializes the TagExtractor.
+
+        Args:
+            tags (Iterable[str]): The names of the tags to extract.
+            strip (bool): Whether to strip whitespace around the extracted text.
+        """
+        self.tags = tuple(tags)
+        self.strip = strip
+        self._tag_pattern = re.compile(
+            "<(/?)(" + "|".join(re.escape(tag) for tag in self.tags) + ")>"
+        )
+
+    def _add(self, fields: Dict[str, List[str]], tag: str, content: List[str]):
+        """Appends the joined content of a field to the values of its tag."""
+        value = "".join(content)
+        fields[tag].append(value.strip() if self.strip else value)
+
+    def extract(self, text: str) -> Dict[str, List[str]]:
+        """Extracts every occurrence of every tag in one sweep over the text.
+
+        Args:
+            text (str): The response text.
+
+        Returns:
+            Dict[str, List[str]]: The values of each tag, in order of appearance.
+        """
+        fields = {tag: [] for tag in self.tags}
+        # Splitting on the tags yields [text, "/" or "", tag, text, "/" or "", tag, ...]
+        parts = self._tag_pattern.split(text)
+        open_tag, content = None, []
+        for i in range(1, len(parts), 3):
+            closing, tag = parts[i], parts[i + 1]
+            if closing:
+                if tag == open_tag:
+                    self._add(fields, open_tag, content)
+                    open_tag = None
+                elif open_tag is not None:
+                    content += [f"</{tag}>", parts[i + 2]]
+                continue
+            if open_tag is not None:
+                self._add(fields, open_tag, content)
+            open_tag, content = tag, [parts[i + 2]]
+
+        if open_tag is not None:
+            self._add(fields, open_tag, content)
+        return fields
+
+    def extract_first(self, text: str, defaults: Dict[str, str]) -> Dict[str, str]:
+        """Extracts the first occurrence of each tag.
+
+        Args:
+            text (str): The response text.
+            defaults (Dict[str, str]): The value of each tag when it is absent.
+
+        Returns:
+            Dict[str, str]: The first value of each tag, or its default.
+        """
+        return {
+            tag: values[0] if values else defaults.get(tag, "")
+            for tag, values in self.extract(text).items()
+        }
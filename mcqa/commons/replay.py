@@ -0,0 +1,174 @@
+import json
+import os
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from mcqa.commons import logger
+from mcqa.commons.hashing import text_sha256
+from mcqa.commons.result_writer import ResultWriter, read_results
+
+logger = logger.setup_logger()
+
+RECORDING_NAME = "llm_responses.jsonl"
+
+_recorder: ContextVar[Optional["ResponseRecorder"]] = ContextVar(
+    "mcqa_response_recorder", default=None
+)
+_replay_index: ContextVar[Optional["ReplayIndex"]] = ContextVar(
+    "mcqa_replay_index", default=None
+)
+
+
+class ReplayMissError(LookupError):
+    """Raised in strict replay when a request has no recorded response."""
+
+
+def prompt_fingerprint(
+    system_prompt: str, user_prompt: str, attachment_hashes: List[str]
+) -> str:
+    """Returns the fingerprint of a request, independent of the provider answering it."""
+    return text_sha256(json.dumps([system_prompt, user_prompt, attachment_hashes]))
+
+
+class ResponseRecorder:
+    """Append-only log of the raw provider responses of a run.
+
+    Each record holds the prompt fingerprint of a request, the provider and
+    model that answered it and the raw response text, so that the run can be
+    replayed and re-scored without calling the provider.
+    """
+
+    def __init__(
+        self, output_path: str, compress: bool = False, flush_every: int = 100
+    ):
+        """Initializes the ResponseRecorder.
+
+        Args:
+            output_path (str): The directory where the recording is written.
+            compress (bool): Whether the recording is gzip-compressed.
+            flush_every (int): The number of buffered records that triggers a flush.
+        """
+        recording_name = f"{RECORDING_NAME}.gz" if compress else RECORDING_NAME
+        self.writer = ResultWriter(
+            os.path.join(output_path, recording_name), flush_every=flush_every
+        )
+
+    def record(self, fingerprint: str, provider: str, model: str, response: str):
+        """Appends a raw response to the recording."""
+        self.writer.write(
+            {
+                "fingerprint": fingerprint,
+                "provider": provider,
+                "model": model,
+                "response": response,
+            }
+        )
+
+
+class ReplayIndex:
+    """The recorded responses of earlier runs, by prompt fingerprint."""
+
+    def __init__(self, responses: Dict[str, str], strict: bool = False):
+        """Initializes the ReplayIndex.
+
+        Args:
+            responses (Dict[str, str]): The raw responses by prompt fingerprint.
+            strict (bool): Whether a request without a recorded response raises
+                ReplayMissError instead of going to the provider.
+        """
+        self.responses = responses
+        self.strict = strict
+
+    @classmethod
+    def from_path(cls, path: str, strict: bool = False) -> "ReplayIndex":
+        """Indexes a recording, or the recording in the output directory of a run.
+
+        A response recorded more than once keeps its latest recording.
+
+        Args:
+            path (str): The recording file, or the output directory of a run.
+            strict (bool): Whether misses raise ReplayMissError.
+
+        Returns:
+            ReplayIndex: The index of the recorded responses.
+        """
+        paths = [path]
+        if os.path.isdir(path):
+            paths = [
+                os.path.join(path, name)
+                for name in (RECORDING_NAME, f"{RECORDING_NAME}.gz")
+            ]
+        responses = {
+            record["fingerprint"]: record["response"]
+            for recording_path in paths
+            for record in read_results(recording_path)
+        }
+        if not responses:
+            logger.warning(f"No recorded responses found in {path}")
+        logger.info(f"Replaying {len(responses)} recorded responses from {path}")
+        return cls(responses, strict=strict)
+
+    def get(self, fingerprint: str) -> Optional[str]:
+        """Returns the recorded response of a request, or None on a miss.
+
+        Raises:
+            ReplayMissError: If the index is strict and the request was not recorded.
+        """
+        response = self.responses.get(fingerprint)
+        if response is None and self.strict:
+            raise ReplayMissError(f"No recorded response for request {fingerprint}")
+        return response
+
+
+def active() -> bool:
+    """Returns whether the current run records or replays responses."""
+    return _recorder.get() is not None or _replay_index.get() is not None
+
+
+def replayed(fingerprint: Optional[str]) -> Optional[str]:
+    """Returns the recorded response of a request when replaying, None otherwise."""
+    replay_index = _replay_index.get()
+    if replay_index is None or fingerprint is None:
+        return None
+    return replay_index.get(fingerprint)
+
+
+def record(fingerprint: Optional[str], provider: str, model: str, response: str):
+    """Records the raw response of a request when recording."""
+    recorder = _recorder.get()
+    if recorder is not None and fingerprint is not None and isinstance(response, str):
+        recorder.record(fingerprint, provider, model, response)
+
+
+@contextmanager
+def start_run(
+    output_path: str,
+    record: bool = False,
+    replay_from: str = None,
+    strict: bool = False,
+    compress: bool = False,
+) -> Iterator[None]:
+    """Records or replays the provider responses of the run in the current task.
+
+    Like the tracer, the recorder and replay index are carried by context
+    variables to the threads and tasks the run starts.
+
+    Args:
+        output_path (str): The directory where the recording is written.
+        record (bool): Whether to record the raw provider responses.
+        replay_from (str, optional): The recording, or run output directory, whose
+            responses are served instead of calling the provider. Defaults to None.
+        strict (bool): Whether requests missing from the recording fail.
+        compress (bool): Whether the recording is gzip-compressed.
+    """
+    with ExitStack() as stack:
+        if replay_from:
+            token = _replay_index.set(ReplayIndex.from_path(replay_from, strict=strict))
+            stack.callback(_replay_index.reset, token)
+        if record:
+            recorder = ResponseRecorder(output_path, compress=compress)
+            stack.enter_context(recorder.writer)
+            token = _recorder.set(recorder)
+            stack.callback(_recorder.reset, token)
+        yield
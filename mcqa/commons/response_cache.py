@@ -0,0 +1,140 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from mcqa.commons import logger
+from mcqa.commons.hashing import text_sha256
+
+logger = logger.setup_logger()
+
+
+class ResponseCache:
+    """Persistent, content-addressed cache of LLM responses backed by SQLite.
+
+    Entries expire `ttl_seconds` after they are written, and the least recently
+    used entries are evicted once the stored responses exceed `max_bytes`.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int, ttl_seconds: float):
+        """Initializes the ResponseCache, creating the database if needed.
+
+        Args:
+            db_path (str): The path to the SQLite database file.
+            max_bytes (int): The maximum total size of the stored responses.
+            ttl_seconds (float): The lifetime of an entry, 0 for no expiry.
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at "
+                "ON responses (accessed_at)"
+            )
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        temperature: Optional[float],
+        system_prompt: str,
+        user_prompt: str,
+        attachment_hashes: List[str],
+    ) -> str:
+        """Builds the cache key of a request from everything that shapes its response."""
+        return text_sha256(
+            json.dumps(
+                [
+                    provider,
+                    model,
+                    temperature,
+                    system_prompt,
+                    user_prompt,
+                    attachment_hashes,
+                ]
+            )
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response for the key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                with self._connection:
+                    self._connection.execute(
+                        "DELETE FROM responses WHERE key = ?", (key,)
+                    )
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str):
+        """Stores a response, then evicts least recently used entries over the size bound."""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, response, size, now, now),
+            )
+            (total_size,) = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            if total_size <= self.max_bytes:
+                return
+
+            evicted = 0
+            for evict_key, evict_size in self._connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at"
+            ).fetchall():
+                if total_size <= self.max_bytes:
+                    break
+                self._connection.execute(
+                    "DELETE FROM responses WHERE key = ?", (evict_key,)
+                )
+                total_size -= evict_size
+                evicted += 1
+            logger.debug(f"Evicted {evicted} responses from the response cache")
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit and miss counters of the cache."""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_response_caches: Dict[str, ResponseCache] = {}
+_response_caches_lock = threading.Lock()
+
+
+def get_response_cache(
+    db_path: str, max_bytes: int, ttl_seconds: float
+) -> ResponseCache:
+    """Returns the process-wide response cache stored at `db_path`."""
+    with _response_caches_lock:
+        if db_path not in _response_caches:
+            _response_caches[db_path] = ResponseCache(db_path, max_bytes, ttl_seconds)
+        return _response_caches[db_path]
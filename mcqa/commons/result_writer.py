@@ -0,0 +1,183 @@
+import gzip
+import json
+import os
+import threading
+import zlib
+from typing import Iterator, List, Optional
+
+from mcqa.commons import logger
+
+logger = logger.setup_logger()
+
+READ_CHUNK_SIZE = 1 << 16
+GZIP_WBITS = zlib.MAX_WBITS | 16  # a gzip header and trailer around each member
+
+
+def _open(path: str, mode: str):
+    """Opens a JSONL file as text, gzip-compressed if its name ends with `.gz`."""
+    if path.endswith(".gz"):
+        return gzip.open(path, f"{mode}t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class ResultWriter:
+    """Append-only JSONL sink for the records of a batch run.
+
+    Records are buffered and appended to a single file once `flush_every` of
+    them are pending, `flush_interval` seconds after the oldest pending record
+    was written, on `flush()` and on `close()`, so that a killed run loses at
+    most that much. A `.gz` path is written as a sequence of gzip members, one
+    per flush, which readers decompress as one stream.
+    """
+
+    def __init__(self, path: str, flush_every: int = 100, flush_interval: float = 1.0):
+        """Initializes the ResultWriter.
+
+        Args:
+            path (str): The JSONL file to append to, compressed if it ends with `.gz`.
+            flush_every (int): The number of buffered records that triggers a flush.
+            flush_interval (float): The seconds a record stays buffered at most,
+                0 to only flush on count.
+        """
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        self._pending: List[str] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        """Buffers a record, flushing the buffer once it is full.
+
+        Args:
+            record (dict): A JSON-serializable record.
+        """
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        with self._lock:
+            self._pending.append(line)
+            if len(self._pending) >= self.flush_every:
+                self._flush()
+            elif self.flush_interval > 0 and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush(self):
+        """Appends the pending records to the file. Callers hold the lock."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        with _open(self.path, "a") as f:
+            f.write("\n".join(self._pending) + "\n")
+        self._pending = []
+
+    def flush(self):
+        """Appends the pending records to the file."""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """Flushes the pending records."""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _decompressed_chunks(path: str) -> Iterator[bytes]:
+    """Yields the content of a results file, decompressing it gzip member by member.
+
+    Raises:
+        EOFError: If the last gzip member was cut short.
+    """
+    with open(path, "rb") as f:
+        if not path.endswith(".gz"):
+            while chunk := f.read(READ_CHUNK_SIZE):
+                yield chunk
+            return
+        decompressor, in_member = zlib.decompressobj(GZIP_WBITS), False
+        while chunk := f.read(READ_CHUNK_SIZE):
+            while chunk:
+                yield decompressor.decompress(chunk)
+                chunk, in_member = b"", True
+                if decompressor.eof:
+                    chunk = decompressor.unused_data
+                    decompressor, in_member = zlib.decompressobj(GZIP_WBITS), False
+    if in_member:
+        raise EOFError("Compressed file ended before the end-of-stream marker")
+
+
+def _lines(path: str) -> Iterator[str]:
+    """Yields the lines of a results file, the last one without its newline if cut."""
+    pending = b""
+    for chunk in _decompressed_chunks(path):
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8") + "\n"
+    if pending:
+        yield pending.decode("utf-8")
+
+
+def read_results(path: str) -> Iterator[dict]:
+    """Yields the records of a JSONL results file, in write order.
+
+    A record or gzip member cut short by an interrupted write ends the stream
+    instead of raising, so the records written before it are still returned.
+
+    Args:
+        path (str): The JSONL file, compressed if it ends with `.gz`.
+
+    Yields:
+        dict: The decoded records.
+    """
+    if not os.path.exists(path):
+        return
+    try:
+        for line in _lines(path):
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping truncated record in {path}")
+    except (EOFError, zlib.error) as e:
+        logger.warning(f"Stopped reading truncated results {path}: {e}")
+
+
+def _intact(path: str) -> bool:
+    """Returns whether every record of a JSONL results file was fully written."""
+    try:
+        for line in _lines(path):
+            if not line.endswith("\n"):
+                return False
+            json.loads(line)
+    except (EOFError, zlib.error, json.JSONDecodeError):
+        return False
+    return True
+
+
+def repair_results(path: str):
+    """Rewrites a results file cut short by an interrupted write, keeping its records.
+
+    Records appended after a partly written line or gzip member would be
+    unreadable, so the file is rewritten with the records read before the
+    damage before a resumed run appends to it.
+
+    Args:
+        path (str): The JSONL file, compressed if it ends with `.gz`.
+    """
+    if not os.path.exists(path) or _intact(path):
+        return
+    records = list(read_results(path))
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, f".{os.getpid()}.{name}")  # keeps any .gz
+    with _open(temp_path, "w") as f:
+        f.writelines(
+            json.dumps(record, separators=(",", ":"), default=str) + "\n"
+            for record in records
+        )
+    os.replace(temp_path, path)
+    logger.warning(f"Repaired {path}, keeping its {len(records)} complete records")
@@ -0,0 +1,42 @@
+import re
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of tokens in a text without a provider tokenizer.
+
+    Words count as one token per four characters (rounded up) and every
+    punctuation mark as one token, which tracks BPE tokenizers closely enough
+    for budgeting.
+
+    Args:
+        text (str): The text to be measured.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    if not text:
+        return 0
+    return sum(
+        -(-len(piece) // CHARS_PER_TOKEN) for piece in TOKEN_PATTERN.findall(text)
+    )
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts a text to its longest prefix estimated to fit in `max_tokens` tokens.
+
+    Args:
+        text (str): The text to be cut.
+        max_tokens (int): The maximum number of tokens to keep.
+
+    Returns:
+        str: The prefix of the text.
+    """
+    tokens = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        tokens += -(-len(match.group()) // CHARS_PER_TOKEN)
+        if tokens > max_tokens:
+            return text[: match.start()]
+    return text
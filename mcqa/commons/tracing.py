@@ -0,0 +1,187 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar(
+    "mcqa_tracer", default=None
+)
+_track: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "mcqa_trace_track", default=None
+)
+_args: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar(
+    "mcqa_trace_args", default={}
+)
+
+
+class Tracer:
+    """Collects the spans of a run as Chrome trace events.
+
+    Spans are grouped in tracks, shown as the threads of the trace: each batch
+    row or sub-question runs on a track of its own, so overlapping questions
+    appear side by side and their nested spans stack up. The trace opens in
+    chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    def __init__(self):
+        """Initializes the Tracer."""
+        self._events: List[Dict[str, Any]] = []
+        self._tracks: Dict[str, int] = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _track_id(self, track: str) -> int:
+        """Returns the trace thread ID of a track, naming it on first use."""
+        if track not in self._tracks:
+            self._tracks[track] = len(self._tracks) + 1
+            self._events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "tid": self._tracks[track],
+                    "args": {"name": track},
+                }
+            )
+        return self._tracks[track]
+
+    def add(
+        self, name: str, track: str, started: float, ended: float, args: Dict[str, Any]
+    ):
+        """Records a finished span.
+
+        Args:
+            name (str): The name of the span.
+            track (str): The track the span ran on.
+            started (float): The `time.perf_counter` at which the span started.
+            ended (float): The `time.perf_counter` at which the span ended.
+            args (Dict[str, Any]): The arguments shown with the span.
+        """
+        with self._lock:
+            self._events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (started - self._started) * 1e6,
+                    "dur": (ended - started) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": self._track_id(track),
+                    "args": args,
+                }
+            )
+
+    def write(self, path: str) -> str:
+        """Writes the trace as Chrome trace event JSON.
+
+        Args:
+            path (str): The path of the trace file.
+
+        Returns:
+            str: The path of the trace file.
+        """
+        with self._lock:
+            trace = {"traceEvents": list(self._events), "displayTimeUnit": "ms"}
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(trace, file, default=str)
+        os.replace(temp_path, path)
+        return path
+
+
+def current_track() -> str:
+    """Returns the track of the current thread or task."""
+    return _track.get() or f"thread {threading.current_thread().name}"
+
+
+@contextmanager
+def start_run(enabled: bool = True) -> Iterator[Optional[Tracer]]:
+    """Traces the spans of the current thread or task, and of those it starts.
+
+    Args:
+        enabled (bool): Whether to trace, yielding None otherwise.
+
+    Yields:
+        Optional[Tracer]: The tracer of the run.
+    """
+    if not enabled:
+        yield None
+        return
+    tracer = Tracer()
+    token = _tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _tracer.reset(token)
+
+
+@contextmanager
+def span(name: str, **args: Any) -> Iterator[None]:
+    """Records the duration of a block as a span of the current track.
+
+    Args:
+        name (str): The name of the span.
+        **args (Any): The arguments shown with the span, on top of those of the track.
+    """
+    tracer = _tracer.get()
+    if tracer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracer.add(
+            name, current_track(), started, time.perf_counter(), {**_args.get(), **args}
+        )
+
+
+@contextmanager
+def track(name: str, **args: Any) -> Iterator[None]:
+    """Runs a block on a track of its own, recorded as one span.
+
+    Args:
+        name (str): The name of the track.
+        **args (Any): The arguments shown with every span of the track, such as
+            the row number or the document.
+    """
+    if _tracer.get() is None:
+        yield
+        return
+    track_token = _track.set(name)
+    args_token = _args.set({**_args.get(), **args})
+    try:
+        with span(name):
+            yield
+    finally:
+        _args.reset(args_token)
+        _track.reset(track_token)
+
+
+def bind(fn: Callable, track_name: str = None, **args: Any) -> Callable:
+    """Returns `fn` running in the context of the caller.
+
+    Threads of an executor do not inherit the context variables of the thread
+    that submits work to them, such as the tracer and track or the response
+    recorder of the run, so they are carried over explicitly.
+
+    Args:
+        fn (Callable): The function to run.
+        track_name (str, optional): The track to run `fn` on. Defaults to the
+            track of the caller.
+        **args (Any): The arguments of the track.
+
+    Returns:
+        Callable: The function, taking the arguments of `fn`.
+    """
+    context = contextvars.copy_context()
+
+    def call(*fn_args, **fn_kwargs):
+        if track_name is None:
+            return fn(*fn_args, **fn_kwargs)
+        with track(track_name, **args):
+            return fn(*fn_args, **fn_kwargs)
+
+    return lambda *fn_args, **fn_kwargs: context.run(call, *fn_args, **fn_kwargs)
@@ -1,5 +1,53 @@
+import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+@dataclass
+class RateLimitConfig:
+    """Requests-per-minute and tokens-per-minute budgets, 0 meaning unlimited."""
+
+    requests_per_minute: int
+    tokens_per_minute: int
+
+
+def _rate_limits_from_env() -> Dict[str, RateLimitConfig]:
+    """Reads the per-provider rate limits.
+
+    `<PROVIDER>_RPM` and `<PROVIDER>_TPM` set the budgets of a provider, while
+    RATE_LIMITS takes a JSON object of `"provider"` or `"provider:model"` keys
+    mapped to `[rpm, tpm]` pairs for per-model overrides.
+    """
+    rate_limits = {
+        "gemini": RateLimitConfig(
+            int(os.environ.get("GEMINI_RPM", 360)),
+            int(os.environ.get("GEMINI_TPM", 4_000_000)),
+        ),
+        "openai": RateLimitConfig(
+            int(os.environ.get("OPENAI_RPM", 500)),
+            int(os.environ.get("OPENAI_TPM", 30_000)),
+        ),
+        "llama": RateLimitConfig(
+            int(os.environ.get("LLAMA_RPM", 0)),
+            int(os.environ.get("LLAMA_TPM", 0)),
+        ),
+    }
+    for key, (rpm, tpm) in json.loads(os.environ.get("RATE_LIMITS", "{}")).items():
+        rate_limits[key] = RateLimitConfig(int(rpm), int(tpm))
+    return rate_limits
+
+
+def _input_token_budgets_from_env() -> Dict[str, int]:
+    """Reads the per-model prompt input budgets in estimated tokens, 0 being unlimited.
+
+    INPUT_TOKEN_BUDGETS takes a JSON object of `"provider"` or `"provider:model"`
+    keys mapped to budgets, overriding the context windows of the providers.
+    """
+    input_token_budgets = {"gemini": 1_000_000, "openai": 128_000, "llama": 128_000}
+    for key, budget in json.loads(os.environ.get("INPUT_TOKEN_BUDGETS", "{}")).items():
+        input_token_budgets[key] = int(budget)
+    return input_token_budgets
 
 
 @dataclass
@@ -8,3 +56,84 @@ class McqaConfig:
 
     text_model: str = os.environ.get("TEXT_MODEL", "gemini")
     multimodal_model: str = os.environ.get("MULTIMODAL_MODEL", "gemini")
+    max_concurrency: int = int(os.environ.get("MAX_CONCURRENCY", 1))
+    max_in_flight_per_worker: int = int(os.environ.get("MAX_IN_FLIGHT_PER_WORKER", 2))
+    max_jobs: int = int(os.environ.get("MAX_JOBS", 2))
+    job_ttl: float = float(os.environ.get("JOB_TTL", 24 * 60 * 60))
+    max_retained_jobs: int = int(os.environ.get("MAX_RETAINED_JOBS", 100))
+    rate_limits: Dict[str, RateLimitConfig] = field(
+        default_factory=_rate_limits_from_env
+    )
+    rate_limit_max_retries: int = int(os.environ.get("RATE_LIMIT_MAX_RETRIES", 5))
+    http_pool_size: int = int(os.environ.get("HTTP_POOL_SIZE", 32))
+    http_timeout: float = float(os.environ.get("HTTP_TIMEOUT", 600))
+    cache_dir: str = os.environ.get("MCQA_CACHE_DIR", ".mcqa_cache")
+    pdf_cache_max_items: int = int(os.environ.get("PDF_CACHE_MAX_ITEMS", 64))
+    gemini_upload_expiry_margin: float = float(
+        os.environ.get("GEMINI_UPLOAD_EXPIRY_MARGIN", 60 * 60)
+    )
+    response_cache_enabled: bool = os.environ.get(
+        "RESPONSE_CACHE_ENABLED", "true"
+    ).lower() in ("1", "true", "yes")
+    response_cache_sampled: bool = os.environ.get(
+        "RESPONSE_CACHE_SAMPLED", "false"
+    ).lower() in ("1", "true", "yes")
+    response_cache_max_mb: int = int(os.environ.get("RESPONSE_CACHE_MAX_MB", 1024))
+    response_cache_ttl: float = float(
+        os.environ.get("RESPONSE_CACHE_TTL", 30 * 24 * 60 * 60)
+    )
+    results_compress: bool = os.environ.get("RESULTS_COMPRESS", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    results_flush_every: int = int(os.environ.get("RESULTS_FLUSH_EVERY", 1))
+    results_flush_interval: float = float(os.environ.get("RESULTS_FLUSH_INTERVAL", 1.0))
+    csv_chunksize: int = int(os.environ.get("CSV_CHUNKSIZE", 1000))
+    max_prepared_documents: int = int(os.environ.get("MAX_PREPARED_DOCUMENTS", 8))
+    pack_questions: int = int(os.environ.get("PACK_QUESTIONS", 1))
+    sub_question_concurrency: int = int(os.environ.get("SUB_QUESTION_CONCURRENCY", 5))
+    trace_enabled: bool = os.environ.get("TRACE_ENABLED", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    record_responses: bool = os.environ.get("RECORD_RESPONSES", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    replay_from: str = os.environ.get("REPLAY_FROM", None)
+    replay_strict: bool = os.environ.get("REPLAY_STRICT", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    input_token_budgets: Dict[str, int] = field(
+        default_factory=_input_token_budgets_from_env
+    )
+    prompt_overflow_policy: str = os.environ.get("PROMPT_OVERFLOW_POLICY", "select")
+    context_top_k: int = int(os.environ.get("CONTEXT_TOP_K", 0))
+    context_chunk_words: int = int(os.environ.get("CONTEXT_CHUNK_WORDS", 200))
+    context_chunk_overlap: int = int(os.environ.get("CONTEXT_CHUNK_OVERLAP", 40))
+    gemini_context_cache_enabled: bool = os.environ.get(
+        "GEMINI_CONTEXT_CACHE_ENABLED", "false"
+    ).lower() in ("1", "true", "yes")
+    gemini_context_cache_ttl: float = float(
+        os.environ.get("GEMINI_CONTEXT_CACHE_TTL", 60 * 60)
+    )
+    gemini_context_cache_min_tokens: int = int(
+        os.environ.get("GEMINI_CONTEXT_CACHE_MIN_TOKENS", 32_768)
+    )
+
+    def rate_limit(self, provider: str, model: str) -> RateLimitConfig:
+        """Returns the rate limit of a provider model, unlimited if none is set."""
+        return self.rate_limits.get(
+            f"{provider}:{model}", self.rate_limits.get(provider, RateLimitConfig(0, 0))
+        )
+
+    def input_token_budget(self, provider: str, model: str) -> int:
+        """Returns the prompt input budget of a provider model, 0 if unlimited."""
+        return self.input_token_budgets.get(
+            f"{provider}:{model}", self.input_token_budgets.get(provider, 0)
+        )
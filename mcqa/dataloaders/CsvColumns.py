@@ -6,6 +6,7 @@ class CsvColumns:
     SOURCE_PATH = "source_path"
     QUERY = "Question"
     OPTIONS = "options"
+    ALL_ANSWERS = "All Answers"
     ANSWER = "Correct Answer"
     SHORT_CONTEXT = "Short_Context?"
     SOURCE_TYPE = "source_type"
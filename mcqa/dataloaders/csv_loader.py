@@ -1,8 +1,8 @@
 import ast
-import re
+from itertools import chain
+from typing import Iterator, List
 
 import pandas as pd
-from tqdm import tqdm
 
 from mcqa.commons import logger
 from mcqa.dataloaders.CsvColumns import CsvColumns
@@ -25,43 +25,80 @@ class CsvLoader(InputParser):
                 logger.debug(e)
         return cell
 
-    def handle_csv(self, file_path: str):
-        csv_with_sources_df = pd.read_csv(file_path)
-
-        requests = []
-        for _, row in tqdm(csv_with_sources_df.iterrows()):
-
-            if pd.isna(row[CsvColumns.SOURCE_PATH]):
-                continue
-            question = row[CsvColumns.QUERY]
-            option = re.findall(
-                Patterns.question_options_pattern,
-                row[CsvColumns.OPTIONS]
-                .replace("\u200b", "")
-                .replace("'", "")
-                .replace("]", "")
-                .replace(",", ""),
-            )
-            answer = (
-                row[CsvColumns.ANSWER].replace("\u200b", "").replace("'", "").strip()
-            )
-            if not pd.isna(row[CsvColumns.SHORT_CONTEXT]):
-                short_context = row[CsvColumns.SHORT_CONTEXT]
-                # short_context = None
-            else:
-                short_context = None
-
-            full_context_path = row[CsvColumns.SOURCE_PATH]
-
-            requests.append(
-                [
-                    question,
-                    option,
-                    answer,
-                    full_context_path,
-                    short_context,
-                    self.options_randomizer,
-                ]
+    def _chunk_requests(self, chunk: pd.DataFrame) -> List[list]:
+        """Extracts the requests of a chunk of rows with vectorized string operations.
+
+        Rows without a source path are skipped. The options column may also be
+        named `All Answers`, and the short context column may be missing.
+
+        Args:
+            chunk (pd.DataFrame): The rows of the question bank.
+
+        Returns:
+            List[list]: The question, options, answer, source path, short context
+                and options randomizer of each row.
+        """
+        chunk = chunk[chunk[CsvColumns.SOURCE_PATH].notna()]
+        options_column = (
+            CsvColumns.OPTIONS
+            if CsvColumns.OPTIONS in chunk.columns
+            else CsvColumns.ALL_ANSWERS
+        )
+
+        options = (
+            chunk[options_column]
+            .fillna("")
+            .astype(str)
+            .str.replace("[\u200b',\\]]", "", regex=True)
+            .str.findall(Patterns.question_options_pattern)
+        )
+        answers = (
+            chunk[CsvColumns.ANSWER]
+            .astype(str)
+            .str.replace("[\u200b']", "", regex=True)
+            .str.strip()
+        )
+        if CsvColumns.SHORT_CONTEXT in chunk.columns:
+            short_contexts = chunk[CsvColumns.SHORT_CONTEXT].astype(object)
+            short_contexts = short_contexts.where(short_contexts.notna(), None)
+        else:
+            short_contexts = [None] * len(chunk)
+
+        return [
+            [
+                question,
+                option,
+                answer,
+                full_context_path,
+                short_context,
+                self.options_randomizer,
+            ]
+            for question, option, answer, full_context_path, short_context in zip(
+                chunk[CsvColumns.QUERY],
+                options,
+                answers,
+                chunk[CsvColumns.SOURCE_PATH],
+                short_contexts,
             )
+        ]
+
+    def iter_csv(self, file_path: str, chunksize: int = 1000) -> Iterator[List[list]]:
+        """Streams the requests of a question bank, `chunksize` rows at a time.
+
+        Only one chunk of the file is held in memory, so the first requests are
+        available before the rest of the file is parsed.
 
-        return requests
+        Args:
+            file_path (str): The path to the CSV file.
+            chunksize (int): The number of rows parsed at once.
+
+        Yields:
+            List[list]: The requests of each chunk, as returned by `handle_csv`.
+        """
+        with pd.read_csv(file_path, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield self._chunk_requests(chunk)
+
+    def handle_csv(self, file_path: str):
+        """Loads all the requests of a question bank."""
+        return list(chain.from_iterable(self.iter_csv(file_path)))
@@ -1,4 +1,6 @@
-from typing import Protocol
+from typing import Protocol, Sequence
+
+import numpy as np
 
 
 class Evaluation(Protocol):
@@ -15,3 +17,17 @@ class Evaluation(Protocol):
             float: The evaluation score.
         """
         raise NotImplementedError("evaluate() is not implemented")
+
+    def evaluate_batch(
+        self, generated_answers: Sequence[str], actual_answers: Sequence[str]
+    ) -> np.ndarray:
+        """Evaluates pairs of generated and actual answers at once.
+
+        Args:
+            generated_answers (Sequence[str]): The answers generated by the model.
+            actual_answers (Sequence[str]): The correct answers, in the same order.
+
+        Returns:
+            np.ndarray: The evaluation score of each pair.
+        """
+        raise NotImplementedError("evaluate_batch() is not implemented")
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class JobProgress(BaseModel):
+    """A class used to define the progress of a batch evaluation job."""
+
+    rows_total: int = 0
+    rows_done: int = 0
+    rows_failed: int = 0
+    accuracy: Optional[float] = None
+    throughput: Optional[float] = None  # rows per second
+    elapsed_seconds: float = 0.0
+
+
+class JobStatus(BaseModel):
+    """A class used to define the structure of a batch evaluation job status."""
+
+    job_id: str
+    status: str  # queued, running, cancelling, succeeded, failed, cancelled
+    file_path: str
+    question_format: str
+    progress: JobProgress
+    error: Optional[str] = None
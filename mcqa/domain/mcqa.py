@@ -17,3 +17,11 @@ class McqaInterface(Protocol):
             NotImplementedError: If the method is not implemented.
         """
         raise NotImplementedError("generate_query_response method not implemented")
+
+    async def agenerate_query_response(self):
+        """Generates a response for a given query without blocking the event loop.
+
+        Raises:
+            NotImplementedError: If the method is not implemented.
+        """
+        raise NotImplementedError("agenerate_query_response method not implemented")
@@ -35,3 +35,28 @@ class MultimodalResponseGenerator:
             NotImplementedError: If the function is not implemented in a subclass.
         """
         raise NotImplementedError("generate_multimodal_response is not implemented")
+
+
+@dataclass
+class AsyncMultimodalResponseGenerator:
+    """Class responsible for generating multimodal responses without blocking the event loop.
+
+    This class should be subclassed and the method `agenerate_multimodal_response`
+    should be implemented in the subclass.
+    """
+
+    async def agenerate_multimodal_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_object: Any,
+        url: str = None,
+    ):
+        """Generates a multimodal response asynchronously.
+
+        This function should be overridden in a subclass. It is expected to generate a multimodal response.
+
+        Raises:
+            NotImplementedError: If the function is not implemented in a subclass.
+        """
+        raise NotImplementedError("agenerate_multimodal_response is not implemented")
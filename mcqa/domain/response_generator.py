@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class RequestMetadata(BaseModel):
@@ -12,10 +12,30 @@ class RequestMetadata(BaseModel):
     max_tokens: int
 
 
+class PromptSize(BaseModel):
+    """A class used to store the estimated token counts of a prompt."""
+
+    system_tokens: int
+    context_tokens: int  # the <Context> of the user prompt, 0 for attached files
+    question_tokens: int  # the question and its short context
+    options_tokens: int
+    total_tokens: int  # the system and user prompts
+    input_token_budget: Optional[int] = None
+    fitted: bool = False  # whether the context was cut to fit the budget
+
+
 class ResponseMetadata(BaseModel):
     """A class used to store response metadata."""
 
+    model_config = ConfigDict(protected_namespaces=())
+
     model: str
+    model_name: Optional[str] = None
+    latency: Optional[float] = None  # seconds, including cache lookups
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    cached: Optional[bool] = None
+    prompt_size: Optional[PromptSize] = None
 
 
 class Question(BaseModel):
@@ -53,6 +73,13 @@ class QuestionsFromSourcesRequest(BaseModel):
     output_path: str
     options_randomizer: Optional[bool] = None
     question_format: str  # rephrase, raw, synthetic
+    max_concurrency: Optional[int] = None
+    pack_questions: Optional[int] = None
+    resume: Optional[bool] = True
+    trace: Optional[bool] = None
+    record_responses: Optional[bool] = None
+    replay_from: Optional[str] = None
+    replay_strict: Optional[bool] = None
 
 
 class ResponsesFromSources(BaseModel):
@@ -73,9 +100,23 @@ class RequestResponseLog(BaseModel):
     """A class used to define the structure of a request response log."""
 
     request: Question
-    response: QuestionResponse
+    response: Union[QuestionResponse, ResponsesFromSources]
 
 
 class ExceptionLog(BaseModel):
     request: Any
     exception: Any
+
+
+class ResultRecord(BaseModel):
+    """A class used to define the structure of a batch run result record."""
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    row: int
+    status: str  # succeeded, failed
+    model: Optional[str] = None
+    model_name: Optional[str] = None
+    request: Question
+    response: Optional[Union[QuestionResponse, ResponsesFromSources]] = None
+    exception: Optional[str] = None
@@ -24,3 +24,18 @@ class TextResponseGenerator:
             NotImplementedError: If the function is not implemented in a subclass.
         """
         raise NotImplementedError("generate_text_response is not implemented")
+
+
+@dataclass
+class AsyncTextResponseGenerator:
+    """A class used to generate text responses without blocking the event loop."""
+
+    async def agenerate_response(self, system_prompt: str, user_prompt: str):
+        """Generates a text response asynchronously.
+
+        This function should be overridden in a subclass. It is expected to generate a text response.
+
+        Raises:
+            NotImplementedError: If the function is not implemented in a subclass.
+        """
+        raise NotImplementedError("agenerate_response is not implemented")
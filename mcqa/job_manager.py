@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from mcqa.commons import logger
+from mcqa.config import McqaConfig
+from mcqa.domain.jobs import JobProgress, JobStatus
+from mcqa.domain.response_generator import (QuestionResponse,
+                                            QuestionsFromSourcesRequest,
+                                            ResponsesFromSources)
+from mcqa.mcqa import Mcqa
+
+logger = logger.setup_logger()
+
+
+class JobCancelled(Exception):
+    """Raised from the progress callback of a cancelled job to stop its run."""
+
+
+class Job:
+    """A batch evaluation of a question file, run in the background."""
+
+    def __init__(self, request: QuestionsFromSourcesRequest):
+        """Initializes a queued Job for the request."""
+        self.job_id = uuid.uuid4().hex
+        self.request = request
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.result: Optional[ResponsesFromSources] = None
+        self.progress = JobProgress()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+        self._cancel_requested = threading.Event()
+        self._evaluation_sum = 0.0
+        self._evaluation_count = 0
+        self._lock = threading.Lock()
+
+    def record_row(
+        self,
+        rows_total: int,
+        response: QuestionResponse | ResponsesFromSources | None,
+    ):
+        """Updates the progress once a row has finished, successfully or not.
+
+        Raises:
+            JobCancelled: If the job was cancelled, to stop the batch run.
+        """
+        if self._cancel_requested.is_set():
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+        with self._lock:
+            self.progress.rows_total = rows_total
+            self.progress.rows_done += 1
+            if response is None:
+                self.progress.rows_failed += 1
+            else:
+                responses = getattr(response, "list_of_responses", [response])
+                self._evaluation_sum += sum(r.evaluation for r in responses)
+                self._evaluation_count += len(responses)
+
+            if self._evaluation_count:
+                self.progress.accuracy = self._evaluation_sum / self._evaluation_count
+
+    def run(self):
+        """Runs the batch evaluation and stores its result or error."""
+        if self._cancel_requested.is_set():
+            return
+        self.status = "running"
+        self.started_at = time.monotonic()
+        try:
+            self.result = Mcqa(request=self.request).generate_response_from_files(
+                file_path=self.request.file_path,
+                file_type=self.request.file_type,
+                options_randomizer=self.request.options_randomizer,
+                question_format=self.request.question_format,
+                output_path=self.request.output_path,
+                max_concurrency=self.request.max_concurrency,
+                pack_questions=self.request.pack_questions,
+                resume=self.request.resume,
+                trace=self.request.trace,
+                record_responses=self.request.record_responses,
+                replay_from=self.request.replay_from,
+                replay_strict=self.request.replay_strict,
+                progress_callback=self.record_row,
+            )
+            self.status = "succeeded"
+        except JobCancelled:
+            logger.info(f"Job {self.job_id} cancelled")
+            self.status = "cancelled"
+        except Exception as e:
+            logger.error(f"Job {self.job_id} failed: {e}")
+            self.error = str(e)
+            self.status = "failed"
+        finally:
+            self.finished_at = time.monotonic()
+
+    def cancel(self) -> bool:
+        """Cancels the job if it has not finished.
+
+        A queued job never starts. A running job stops once its rows in flight
+        finish; they stay checkpointed, so resubmitting the file resumes it.
+
+        Returns:
+            bool: Whether the job was queued or running.
+        """
+        if self.finished_at is not None or self._cancel_requested.is_set():
+            return False
+        self._cancel_requested.set()
+        if self.future is not None and self.future.cancel():
+            self.status = "cancelled"
+            self.finished_at = time.monotonic()
+        else:
+            self.status = "cancelling"
+        return True
+
+    def describe(self) -> JobStatus:
+        """Returns a snapshot of the job status and progress."""
+        with self._lock:
+            progress = self.progress.model_copy()
+        if self.started_at is not None:
+            progress.elapsed_seconds = (
+                self.finished_at or time.monotonic()
+            ) - self.started_at
+            if progress.elapsed_seconds:
+                progress.throughput = progress.rows_done / progress.elapsed_seconds
+        return JobStatus(
+            job_id=self.job_id,
+            status=self.status,
+            file_path=self.request.file_path,
+            question_format=self.request.question_format,
+            progress=progress,
+            error=self.error,
+        )
+
+
+class JobManager:
+    """Runs batch evaluation jobs on an in-process worker pool.
+
+    Up to `McqaConfig.max_jobs` jobs run side by side; later submissions wait
+    in the queue. Finished jobs, and their results, are kept for
+    `McqaConfig.job_ttl` seconds, and at most `McqaConfig.max_retained_jobs`
+    of them are kept, dropping the oldest first.
+    """
+
+    def __init__(self, max_jobs: int = None):
+        """Initializes the JobManager.
+
+        Args:
+            max_jobs (int, optional): The number of jobs run at once.
+                Defaults to `McqaConfig.max_jobs`.
+        """
+        mcqa_config = McqaConfig()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_jobs or mcqa_config.max_jobs,
+            thread_name_prefix="mcqa-job",
+        )
+        self.job_ttl = mcqa_config.job_ttl
+        self.max_retained_jobs = mcqa_config.max_retained_jobs
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _evict(self):
+        """Forgets the finished jobs past their TTL or beyond the retained count."""
+        now = time.monotonic()
+        with self._lock:
+            finished = sorted(
+                (job for job in self.jobs.values() if job.finished_at is not None),
+                key=lambda job: job.finished_at,
+            )
+            expired = [
+                job
+                for k, job in enumerate(finished)
+                if now - job.finished_at > self.job_ttl
+                or len(finished) - k > self.max_retained_jobs
+            ]
+            for job in expired:
+                del self.jobs[job.job_id]
+        if expired:
+            logger.debug(f"Evicted {len(expired)} finished jobs")
+
+    def submit(self, request: QuestionsFromSourcesRequest) -> JobStatus:
+        """Queues a batch evaluation and returns its status."""
+        self._evict()
+        job = Job(request)
+        with self._lock:
+            self.jobs[job.job_id] = job
+        job.future = self.executor.submit(job.run)
+        logger.info(f"Submitted job {job.job_id} for {request.file_path}")
+        return job.describe()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Returns the job with the given ID, if any."""
+        self._evict()
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[JobStatus]:
+        """Returns the status of every submitted job."""
+        self._evict()
+        with self._lock:
+            jobs = list(self.jobs.values())
+        return [job.describe() for job in jobs]
+
+    def delete(self, job_id: str) -> Optional[Job]:
+        """Cancels a queued or running job, or forgets a finished job and its result.
+
+        Returns:
+            Optional[Job]: The job, or None if there is no job with that ID.
+        """
+        job = self.get(job_id)
+        if job is None or job.cancel() or job.finished_at is None:
+            return job
+        with self._lock:
+            self.jobs.pop(job_id, None)
+        logger.info(f"Deleted job {job_id}")
+        return job
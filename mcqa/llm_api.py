@@ -1,13 +1,20 @@
+from typing import List
+
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
 
+from mcqa.commons import metrics
+from mcqa.domain.jobs import JobStatus
 from mcqa.domain.response_generator import (Question,
-                                            QuestionsFromSourcesRequest)
+                                            QuestionsFromSourcesRequest,
+                                            ResponsesFromSources)
+from mcqa.job_manager import Job, JobManager
 from mcqa.mcqa import Mcqa
 
 app = FastAPI()
+job_manager = JobManager()
 
 origins = ["*"]
 
@@ -27,7 +34,7 @@ class ErrorResponse(BaseModel):
 
 
 @app.post("/evaluate_query")
-def generate_response(user_query: Question):
+async def generate_response(user_query: Question):
     """Endpoint to generate a response for a given user query.
 
     Args:
@@ -37,27 +44,96 @@ def generate_response(user_query: Question):
         QueryResponse: The response generated by the MCQA system.
     """
     mcqa = Mcqa(request=user_query)
-    return mcqa.generate_query_response()
+    return await mcqa.agenerate_query_response()
 
 
-@app.post("/evaluate_from_files")
-def generate_responses(user_query: QuestionsFromSourcesRequest):
-    """Endpoint to generate responses for an imported csv file full of queries, options.
+@app.post("/evaluate_from_files", status_code=202)
+async def generate_responses(user_query: QuestionsFromSourcesRequest) -> JobStatus:
+    """Endpoint to submit a background job evaluating an imported csv file full of queries, options.
 
     Args:
-        user_query (ResponsesGeneratorRequest): The request containing the user query.
+        user_query (QuestionsFromSourcesRequest): The request containing the user query.
 
     Returns:
-        ResponsesGeneratorResponse: The response generated by the MCQA system.
+        JobStatus: The status of the submitted job, including its ID.
     """
-    mcqa = Mcqa(request=user_query)
-    return mcqa.generate_response_from_files(
-        file_path=user_query.file_path,
-        file_type=user_query.file_type,
-        options_randomizer=user_query.options_randomizer,
-        question_format=user_query.question_format,
-        output_path=user_query.output_path,
-    )
+    return job_manager.submit(user_query)
+
+
+@app.get("/jobs")
+async def list_jobs() -> List[JobStatus]:
+    """Endpoint to list the status of every submitted job.
+
+    Returns:
+        List[JobStatus]: The status and progress of each job.
+    """
+    return job_manager.list_jobs()
+
+
+def _get_job(job_id: str) -> Job:
+    """Returns the job with the given ID, raising a 404 if it does not exist."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> JobStatus:
+    """Endpoint to report the status and progress of a job.
+
+    Args:
+        job_id (str): The ID returned when the job was submitted.
+
+    Returns:
+        JobStatus: The status and progress of the job.
+    """
+    return _get_job(job_id).describe()
+
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str) -> JobStatus:
+    """Endpoint to cancel an unfinished job, or delete a finished job and its result.
+
+    Args:
+        job_id (str): The ID returned when the job was submitted.
+
+    Returns:
+        JobStatus: The status of the job once cancelled or deleted.
+    """
+    job = job_manager.delete(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.describe()
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str) -> ResponsesFromSources:
+    """Endpoint to fetch the responses of a finished job.
+
+    Args:
+        job_id (str): The ID returned when the job was submitted.
+
+    Returns:
+        ResponsesFromSources: The responses generated by the MCQA system.
+    """
+    job = _get_job(job_id)
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}")
+    return job.result
+
+
+@app.get("/metrics")
+async def get_metrics() -> Response:
+    """Endpoint exposing the stage latency histograms and LLM counters to Prometheus.
+
+    Returns:
+        Response: The metrics in the Prometheus text format.
+    """
+    content, content_type = metrics.render()
+    return Response(content=content, media_type=content_type)
 
 
 @app.exception_handler(HTTPException)
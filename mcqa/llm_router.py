@@ -1,15 +1,17 @@
-from typing import Any
+import asyncio
+import os
+import time
+from typing import Any, List, Optional, Tuple
 
-from mcqa.models.multimodal.gemini_multimodal_response_generator import \
-    GeminiMultimodalResponseGenerator
-from mcqa.models.multimodal.llama_multimodal_response_generator import \
-    LlamaMultimodalResponseGenerator
-from mcqa.models.multimodal.openai_multimodal_response_generator import \
-    OpenaiMultimodalResponseGenerator
-from mcqa.models.text.gemini_text_response_generator import \
-    GeminiTextResponseGenerator
-from mcqa.models.text.openai_text_response_generator import \
-    OpenAITextResponseGenerator
+from mcqa.commons import logger, metrics, replay, tracing
+from mcqa.commons.hashing import file_sha256, text_sha256
+from mcqa.commons.rate_limiter import get_rate_limiter, retry_after
+from mcqa.commons.response_cache import ResponseCache, get_response_cache
+from mcqa.commons.tokens import estimate_tokens
+from mcqa.config import McqaConfig
+from mcqa.models import registry
+
+logger = logger.setup_logger()
 
 
 class LLMRouter:
@@ -24,56 +26,389 @@ class LLMRouter:
         """
         self.text_model = text_model
         self.multimodal_model = multimodal_model
+        self.mcqa_config = McqaConfig()
+        self.last_call: dict = {}
         self._select_llm_model()
 
+        provider = self.text_model or self.multimodal_model
+        rate_limit = self.mcqa_config.rate_limit(provider, self.llm_model.model_name)
+        self.rate_limiter = get_rate_limiter(
+            provider,
+            self.llm_model.model_name,
+            rate_limit.requests_per_minute,
+            rate_limit.tokens_per_minute,
+        )
+        self.response_cache = (
+            get_response_cache(
+                os.path.join(self.mcqa_config.cache_dir, "responses.sqlite"),
+                self.mcqa_config.response_cache_max_mb * 1024 * 1024,
+                self.mcqa_config.response_cache_ttl,
+            )
+            if self.mcqa_config.response_cache_enabled
+            else None
+        )
+
     def _select_llm_model(self):
         """Selects the appropriate LLM model based on the text model specified.
 
+        Providers are looked up by name in `mcqa.models.registry`, which only
+        imports the module (and SDK) of the selected provider.
+
         Returns:
             object: An instance of the selected LLM model.
         """
         if self.text_model:
-            if self.text_model == "gemini":
-                self.llm_model = GeminiTextResponseGenerator()
-
-            elif self.text_model == "openai":
-                self.llm_model = OpenAITextResponseGenerator()
-            else:
-                raise ValueError(f"Unsupported text model: {self.text_model}")
+            self.llm_model = registry.create_provider(registry.TEXT, self.text_model)
 
         if self.multimodal_model:
-            if self.multimodal_model == "gemini":
-                self.llm_model = GeminiMultimodalResponseGenerator()
-            elif self.multimodal_model == "openai":
-                self.llm_model = OpenaiMultimodalResponseGenerator()
-            elif self.multimodal_model == "llama":
-                self.llm_model = LlamaMultimodalResponseGenerator("llama3.1")
-            else:
-                raise ValueError(
-                    f"Unsupported multimodal model: {self.multimodal_model}"
-                )
+            self.llm_model = registry.create_provider(
+                registry.MULTIMODAL, self.multimodal_model
+            )
 
     def start_model(self):
         """Starts the selected language model."""
         self.llm_model.start_llm()
 
-    def generate_llm_response(
+    def _span_name(self) -> str:
+        """Returns the name of the trace span of a request to the language model."""
+        return f"{self.text_model or self.multimodal_model}:{self.llm_model.model_name}"
+
+    def _call_llm(
+        self, system_prompt: str, user_prompt: str, multimodal_object: Any = None
+    ) -> Any:
+        """Sends one request to the selected language model."""
+        with tracing.span(self._span_name()):
+            if self.multimodal_model:
+                return self.llm_model.generate_multimodal_response(
+                    system_prompt, user_prompt, multimodal_object
+                )
+
+            if self.text_model:
+                return self.llm_model.generate_response(system_prompt, user_prompt)
+
+    async def _acall_llm(
+        self, system_prompt: str, user_prompt: str, multimodal_object: Any = None
+    ) -> Any:
+        """Sends one request to the async API of the selected language model."""
+        with tracing.span(self._span_name()):
+            if self.multimodal_model:
+                return await self.llm_model.agenerate_multimodal_response(
+                    system_prompt, user_prompt, multimodal_object
+                )
+
+            if self.text_model:
+                return await self.llm_model.agenerate_response(
+                    system_prompt, user_prompt
+                )
+
+    def _usage(self, estimated_tokens: int, response: str) -> Tuple[int, int]:
+        """Returns the input and output tokens reported by the provider for the last request.
+
+        Falls back to the prompt estimate and an estimate of the response when
+        the provider does not report usage.
+        """
+        usage = self.llm_model.last_usage or {}
+        input_tokens = usage.get("input_tokens") or estimated_tokens
+        output_tokens = usage.get("output_tokens") or estimate_tokens(response)
+        return input_tokens, output_tokens
+
+    def _used_tokens(self, estimated_tokens: int, response: str) -> int:
+        """Returns the total tokens reported by the provider for the last request."""
+        return sum(self._usage(estimated_tokens, response))
+
+    def _record_call(
+        self,
+        started: float,
+        system_prompt: str,
+        user_prompt: str,
+        response: Any,
+        cached: bool,
+    ):
+        """Records the latency and token counts of the last request in `last_call`."""
+        input_tokens, output_tokens = (
+            (0, 0)
+            if cached
+            else self._usage(
+                estimate_tokens(system_prompt) + estimate_tokens(user_prompt),
+                response if isinstance(response, str) else "",
+            )
+        )
+        self.last_call = {
+            "latency": time.perf_counter() - started,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cached": cached,
+        }
+        metrics.record_llm_call(self.last_call)
+
+    def _attachment_hashes(
+        self, multimodal_object: Any, attachments: List[str] = None
+    ) -> List[str]:
+        """Returns the content hashes of the attachments sent with a request.
+
+        Attachment paths are hashed by file content. Without paths, the parsed
+        multimodal objects are hashed directly, using the sha256 reported by the
+        Gemini File API for uploaded files.
+        """
+        if attachments:
+            return [file_sha256(path) for path in attachments]
+        if multimodal_object is None or callable(multimodal_object):
+            return []
+
+        hashes = []
+        for item in multimodal_object:
+            if isinstance(item, (str, bytes)):
+                hashes.append(text_sha256(item))
+            else:
+                sha256_hash = getattr(item, "sha256_hash", None)
+                hashes.append(
+                    sha256_hash.hex()
+                    if isinstance(sha256_hash, bytes)
+                    else str(sha256_hash or getattr(item, "name", repr(item)))
+                )
+        return hashes
+
+    def _backoff(self, exception: Exception, attempt: int) -> float:
+        """Returns how long to pause after a failed request, re-raising non rate-limit errors.
+
+        Rate-limit errors pause the limiter for the Retry-After period and are
+        retried up to `McqaConfig.rate_limit_max_retries` times.
+        """
+        max_retries = self.mcqa_config.rate_limit_max_retries
+        backoff = retry_after(exception, default=min(2**attempt, 60))
+        if backoff is None or attempt == max_retries:
+            raise exception
+        logger.warning(
+            f"Rate limited by {self.llm_model.model_name}, "
+            f"retrying in {backoff:.1f}s ({attempt + 1}/{max_retries})"
+        )
+        self.rate_limiter.block(backoff)
+        return backoff
+
+    def _generate_rate_limited_response(
         self, system_prompt: str, user_prompt: str, multimodal_object: Any = None
+    ) -> Any:
+        """Sends a request through the rate limiter of the provider model."""
+        estimated_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+
+        for attempt in range(self.mcqa_config.rate_limit_max_retries + 1):
+            with tracing.span("rate_limit_wait", attempt=attempt):
+                self.rate_limiter.acquire(estimated_tokens)
+            try:
+                response = self._call_llm(system_prompt, user_prompt, multimodal_object)
+            except Exception as e:
+                self._backoff(e, attempt)
+                continue
+
+            self.rate_limiter.settle(
+                estimated_tokens, self._used_tokens(estimated_tokens, response)
+            )
+            return response
+
+    async def _agenerate_rate_limited_response(
+        self, system_prompt: str, user_prompt: str, multimodal_object: Any = None
+    ) -> Any:
+        """Sends a request through the rate limiter without blocking the event loop."""
+        estimated_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+
+        for attempt in range(self.mcqa_config.rate_limit_max_retries + 1):
+            with tracing.span("rate_limit_wait", attempt=attempt):
+                await self.rate_limiter.acquire_async(estimated_tokens)
+            try:
+                response = await self._acall_llm(
+                    system_prompt, user_prompt, multimodal_object
+                )
+            except Exception as e:
+                self._backoff(e, attempt)
+                continue
+
+            self.rate_limiter.settle(
+                estimated_tokens, self._used_tokens(estimated_tokens, response)
+            )
+            return response
+
+    def _cache_key(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_object: Any,
+        attachments: List[str],
+        use_cache: bool,
+    ) -> Optional[str]:
+        """Returns the response cache key of a request, or None if it is not cached.
+
+        Only greedy requests (temperature 0) are cached unless
+        `McqaConfig.response_cache_sampled` is set, since repeated runs at a
+        provider's default or a nonzero temperature are meant to sample anew.
+        """
+        if not use_cache or self.response_cache is None:
+            return None
+        sampled = self.llm_model.temperature != 0
+        if sampled and not self.mcqa_config.response_cache_sampled:
+            return None
+        return ResponseCache.make_key(
+            self.text_model or self.multimodal_model,
+            self.llm_model.model_name,
+            self.llm_model.temperature,
+            system_prompt,
+            user_prompt,
+            self._attachment_hashes(multimodal_object, attachments),
+        )
+
+    def _fingerprint(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_object: Any,
+        attachments: List[str],
+    ) -> Optional[str]:
+        """Returns the fingerprint of a request when the run records or replays."""
+        if not replay.active():
+            return None
+        return replay.prompt_fingerprint(
+            system_prompt,
+            user_prompt,
+            self._attachment_hashes(multimodal_object, attachments),
+        )
+
+    def _record_response(self, fingerprint: Optional[str], response: Any):
+        """Records the raw response of a request when the run records responses."""
+        replay.record(
+            fingerprint,
+            self.text_model or self.multimodal_model,
+            self.llm_model.model_name,
+            response,
+        )
+
+    def _cached_response(self, cache_key: Optional[str]) -> Optional[str]:
+        """Returns the cached response of a request, or None on a miss."""
+        if cache_key is None:
+            return None
+        response = self.response_cache.get(cache_key)
+        if response is not None:
+            logger.debug(f"Response cache hit: {self.response_cache.stats()}")
+        return response
+
+    def _cache_response(self, cache_key: Optional[str], response: Any):
+        """Stores a generated response in the response cache."""
+        if cache_key is not None and isinstance(response, str):
+            self.response_cache.put(cache_key, response)
+
+    @metrics.timed("llm_call")
+    def generate_llm_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_object: Any = None,
+        attachments: List[str] = None,
+        use_cache: bool = True,
     ) -> Any:
         """Generates a response using the selected language model.
 
+        Greedy responses are served from the persistent response cache when an
+        identical request (provider, model, temperature sent, prompts and
+        attachment content) was answered before; otherwise the request is paced by the provider's rate
+        limiter and the response is cached. The latency and token counts of the
+        request are kept in `last_call`.
+
+        When the run replays a recording (see `mcqa.commons.replay`), recorded
+        responses are served first, and when it records, the raw text of every
+        response is appended to its recording.
+
         Args:
             system_prompt (str): The system prompt to be used by the model.
             user_prompt (str): The user prompt to be used by the model.
-            multimodal_object (Any): The multimodal object to be used by the model. Defaults to None.
+            multimodal_object (Any): The multimodal object to be used by the model, or a
+                callable returning it, which is only invoked on a cache miss. Defaults to None.
+            attachments (List[str], optional): The paths of the files behind the
+                multimodal object, used to key the cache by file content. Defaults to None.
+            use_cache (bool): Whether to read from and write to the response cache.
+                Defaults to True.
 
         Returns:
             str: The generated response from the language model.
         """
-        if self.multimodal_model:
-            return self.llm_model.generate_multimodal_response(
-                system_prompt, user_prompt, multimodal_object
+        started = time.perf_counter()
+        fingerprint = self._fingerprint(
+            system_prompt, user_prompt, multimodal_object, attachments
+        )
+        response = replay.replayed(fingerprint)
+        if response is not None:
+            self._record_call(started, system_prompt, user_prompt, response, True)
+            return response
+
+        cache_key = self._cache_key(
+            system_prompt, user_prompt, multimodal_object, attachments, use_cache
+        )
+        response = self._cached_response(cache_key)
+        if response is not None:
+            self._record_response(fingerprint, response)
+            self._record_call(started, system_prompt, user_prompt, response, True)
+            return response
+
+        if callable(multimodal_object):
+            with tracing.span("prepare_attachments"):
+                multimodal_object = multimodal_object()
+        response = self._generate_rate_limited_response(
+            system_prompt, user_prompt, multimodal_object
+        )
+        self._cache_response(cache_key, response)
+        self._record_response(fingerprint, response)
+        self._record_call(started, system_prompt, user_prompt, response, False)
+        return response
+
+    async def agenerate_llm_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_object: Any = None,
+        attachments: List[str] = None,
+        use_cache: bool = True,
+    ) -> Any:
+        """Generates a response using the async API of the selected language model.
+
+        Behaves like `generate_llm_response`; a callable multimodal object is
+        resolved in a worker thread, since parsing and uploading files block.
+
+        Args:
+            system_prompt (str): The system prompt to be used by the model.
+            user_prompt (str): The user prompt to be used by the model.
+            multimodal_object (Any): The multimodal object to be used by the model, or a
+                callable returning it, which is only invoked on a cache miss. Defaults to None.
+            attachments (List[str], optional): The paths of the files behind the
+                multimodal object, used to key the cache by file content. Defaults to None.
+            use_cache (bool): Whether to read from and write to the response cache.
+                Defaults to True.
+
+        Returns:
+            str: The generated response from the language model.
+        """
+        with metrics.timed("llm_call"):
+            started = time.perf_counter()
+            fingerprint = self._fingerprint(
+                system_prompt, user_prompt, multimodal_object, attachments
             )
+            response = replay.replayed(fingerprint)
+            if response is not None:
+                self._record_call(started, system_prompt, user_prompt, response, True)
+                return response
 
-        if self.text_model:
-            return self.llm_model.generate_response(system_prompt, user_prompt)
+            cache_key = self._cache_key(
+                system_prompt, user_prompt, multimodal_object, attachments, use_cache
+            )
+            response = self._cached_response(cache_key)
+            if response is not None:
+                self._record_response(fingerprint, response)
+                self._record_call(started, system_prompt, user_prompt, response, True)
+                return response
+
+            if callable(multimodal_object):
+                with tracing.span("prepare_attachments"):
+                    multimodal_object = await asyncio.to_thread(multimodal_object)
+            response = await self._agenerate_rate_limited_response(
+                system_prompt, user_prompt, multimodal_object
+            )
+            self._cache_response(cache_key, response)
+            self._record_response(fingerprint, response)
+            self._record_call(started, system_prompt, user_prompt, response, False)
+            return response
@@ -1,232 +1,490 @@
 from __future__ import annotations
 
-import json
+import asyncio
 import os
-import re
-import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from itertools import chain
+from typing import Callable, Iterator, List, Optional, Tuple
 
 import tqdm
 
+from mcqa.base.checkpoint import BatchCheckpoint
+from mcqa.base.evaluation import QAEvaluation
 from mcqa.base.input_parser.parser import Parser
 from mcqa.base.postprocessor import PostProcessor
-from mcqa.base.prompt_crafter import PromptCrafter
-from mcqa.commons import logger
+from mcqa.base.prompt_crafter import (MULTIMODAL_EXTENSIONS, PromptCrafter,
+                                      context_extension)
+from mcqa.base.scheduler import DocumentScheduler, LazyResources
+from mcqa.commons import logger, metrics, replay, tracing
 from mcqa.commons.regex import extract_regex
 from mcqa.config import McqaConfig
-from mcqa.dataloaders.csv_loader import CsvLoader
 from mcqa.domain.mcqa import McqaInterface
 from mcqa.domain.patterns import Patterns
-from mcqa.domain.response_generator import (ExceptionLog, Question,
-                                            RequestResponseLog,
-                                            ResponsesFromSources)
+from mcqa.domain.response_generator import (Question, QuestionResponse,
+                                            ResponseMetadata,
+                                            ResponsesFromSources, ResultRecord)
 from mcqa.llm_router import LLMRouter
 
 logger = logger.setup_logger()
 from mcqa.base.question_formation import QuestionFormation
 
-OPENMODELS = ["llama", "phi"]
+OPENMODELS = ["llama", "phi", "fake"]
 
 
 class Mcqa(McqaInterface):
     """Class to handle MCQA (Multiple Choice Question Answering) operations."""
 
-    def __init__(self, request: Question | ResponsesFromSources):
-        """Initializes the Mcqa instance with the given request."""
+    def __init__(
+        self,
+        request: Question | ResponsesFromSources,
+        attachment_objects: Optional[list | LazyResources] = None,
+    ):
+        """Initializes the Mcqa instance with the given request.
+
+        Args:
+            request (Question | ResponsesFromSources): The request to answer.
+            attachment_objects (list | LazyResources, optional): The attachments of
+                the request, parsed once for the rows of a document, or parsed on
+                first use when lazy. Defaults to None.
+        """
         self.mcqa_config = McqaConfig()
         self.request = request
+        self.attachment_objects = attachment_objects
         self.postprocessor = PostProcessor()
-        self.question_formulator = QuestionFormation()
         self.prompt_crafter = PromptCrafter()
+        self.question_formulator = QuestionFormation(prompt_crafter=self.prompt_crafter)
         self.input_parser = Parser()
 
+    def _is_multimodal(self) -> bool:
+        """Returns whether the context is a file sent to a multimodal model."""
+        return (
+            context_extension(self.request.full_context_path) in MULTIMODAL_EXTENSIONS
+        )
+
     def _start_llm(self):
-        if ".txt" in self.request.full_context_path:
+        """Selects the model for the context type and starts a router on it.
+
+        Routers are cheap to build: provider clients and their connection pools
+        are shared process-wide through `mcqa.models.client_registry`. Prompts
+        are then crafted within the input token budget of the model, and the
+        stage metrics of the thread or task are labeled with the model. The model
+        is chosen by the extension of the context file, `.txt` going to the text
+        model.
+        """
+        if context_extension(self.request.full_context_path) == ".txt":
             self.model = self.mcqa_config.text_model
             self.llm_router = LLMRouter(text_model=self.model)
-        if self.request.full_context_path.endswith(("pdf", "png", "jpeg", "jpg")):
+        elif self._is_multimodal():
             self.model = self.mcqa_config.multimodal_model
             self.llm_router = LLMRouter(multimodal_model=self.model)
+        else:
+            raise ValueError(
+                f"Unsupported context type: {self.request.full_context_path}"
+            )
         self.llm_router.start_model()
+        self._label_metrics()
+        self.prompt_crafter.input_token_budget = self.mcqa_config.input_token_budget(
+            self.model, self.llm_router.llm_model.model_name
+        )
 
-    def generate_query_response(self):
-        """Generates a response for the given query based on the context type."""
-        question_format = self.request.question_format
+    def _label_metrics(self):
+        """Labels the stage metrics of the current thread or task with the model.
+
+        Labels set in a worker thread do not reach the task that started it, so
+        async requests label their task again once their router is started.
+        """
+        metrics.set_labels(
+            provider=self.model,
+            model=self.llm_router.llm_model.model_name,
+            question_format=self.request.question_format,
+        )
+
+    def _add_fallback_options(self):
+        """Adds the options for unanswerable questions to the request."""
         self.request.options.extend(
             ["Y. Not enough information to answer", "Z. Answer not listed"]
         )
 
+    def generate_query_response(self):
+        """Generates a response for the given query based on the context type."""
+        question_format = self.request.question_format
+        self._add_fallback_options()
+
         if question_format in ["raw", "naive"]:
             return self._generate_raw_response()
         elif question_format in ["synthetic", "rephrase"]:
             return self.generate_modified_query_response()
 
-    def generate_modified_query_response(self):
-        """Generates a modified query response based on the context type."""
-        if self.request.full_context_path.endswith(".txt"):
-            self.llm_router = LLMRouter(text_model=self.mcqa_config.text_model)
-            question_format = self.request.question_format
-            prompt_object, options_text, answer = self._get_prompts(question_format)
-
-            user_prompt, system_prompt = prompt_object
-            self._start_llm()
-            response = self.llm_router.generate_llm_response(
-                system_prompt=system_prompt, user_prompt=user_prompt
+    async def agenerate_query_response(self):
+        """Generates a response for the given query without blocking the event loop."""
+        question_format = self.request.question_format
+        self._add_fallback_options()
+
+        if question_format in ["raw", "naive"]:
+            return await self._agenerate_raw_response()
+        elif question_format in ["synthetic", "rephrase"]:
+            return await self.agenerate_modified_query_response()
+
+    def _prepare_modified_request(self) -> dict:
+        """Crafts the prompts that ask the LLM for rephrased or synthetic questions.
+
+        Returns:
+            dict: The keyword arguments of the LLM request.
+        """
+        self._start_llm()
+        prompt_object, options_text, answer = self._get_prompts(
+            self.request.question_format
+        )
+        user_prompt, system_prompt = prompt_object
+
+        llm_request = dict(system_prompt=system_prompt, user_prompt=user_prompt)
+        if self._is_multimodal():
+            self._attach_context()
+            llm_request.update(
+                multimodal_object=self._parse_attachments,
+                attachments=self.request.attachments,
             )
-            rephrased_questions = self._postprocess_response(response, question_format)
+        return llm_request
 
-            responses = []
-            for question, options, answer in tqdm.tqdm(rephrased_questions):
+    def _sub_questions(self, response: str) -> List[Question]:
+        """Builds raw questions from the rephrased or synthetic questions in a response."""
+        rephrased_questions = self._postprocess_response(
+            response, self.request.question_format
+        )
+        return [
+            Question(
+                question=question,
+                options=extract_regex(
+                    options, pattern=Patterns.question_options_pattern
+                ),
+                full_context_path=self.request.full_context_path,
+                options_randomizer=self.request.options_randomizer,
+                answer=answer,
+                question_format="raw",
+                question_context=self.request.question_context,
+            )
+            for question, options, answer in rephrased_questions
+        ]
+
+    def _aggregate_responses(
+        self, responses: List[QuestionResponse]
+    ) -> ResponsesFromSources:
+        """Averages the evaluations of the responses to the sub-questions."""
+        evaluation = QAEvaluation.accuracy(
+            [response.evaluation for response in responses]
+        )
+        return ResponsesFromSources(list_of_responses=responses, evaluation=evaluation)
+
+    def _sub_question_attachments(self) -> Optional[list | LazyResources]:
+        """Returns the parsed attachments the sub-questions can share with this request.
+
+        Sub-questions only carry the context file, so attachments are shared when
+        that is all the request sends and they have already been parsed.
+        """
+        if self.request.attachments == [self.request.full_context_path]:
+            return self.attachment_objects
+        return None
+
+    def _sub_question_track(self, sub_question_id: int) -> str:
+        """Returns the trace track of a sub-question, nested under the current one."""
+        return f"{tracing.current_track()} / sub-question {sub_question_id}"
+
+    def _generate_sub_question_response(
+        self, sub_question: Question, attachment_objects: Optional[list | LazyResources]
+    ) -> Optional[QuestionResponse]:
+        """Generates the response to a sub-question, or None if it raised an exception."""
+        try:
+            return Mcqa(
+                request=sub_question, attachment_objects=attachment_objects
+            ).generate_query_response()
+        except Exception as e:
+            logger.error(f"Exception at Generating Query Response: {e}")
+            return None
+
+    async def _agenerate_sub_question_response(
+        self,
+        sub_question: Question,
+        attachment_objects: Optional[list | LazyResources],
+        semaphore: asyncio.Semaphore,
+        sub_question_id: int = 0,
+    ) -> Optional[QuestionResponse]:
+        """Generates the response to a sub-question asynchronously, or None if it raised."""
+        async with semaphore:
+            with tracing.track(
+                self._sub_question_track(sub_question_id), sub_question=sub_question_id
+            ):
                 try:
-                    responses.append(
-                        Mcqa(
-                            request=Question(
-                                query=question,
-                                options=extract_regex(
-                                    options, pattern=Patterns.question_options_pattern
-                                ),
-                                long_context=self.request.full_context_path,
-                                options_randomizer=self.request.options_randomizer,
-                                answer=answer,
-                                question_format="raw",
-                                short_context=self.request.question_context,
-                            )
-                        ).generate_query_response()
-                    )
+                    return await Mcqa(
+                        request=sub_question, attachment_objects=attachment_objects
+                    ).agenerate_query_response()
                 except Exception as e:
-                    logger.error("Exception at Generating Query Response", e)
-                    continue
+                    logger.error(f"Exception at Generating Query Response: {e}")
+                    return None
 
-            evaluation = sum(response.evaluation for response in responses) / len(
-                responses
-            )
-            return ResponsesFromSources(
-                list_of_responses=responses, evaluation=evaluation
+    def generate_modified_query_response(self):
+        """Generates a modified query response based on the context type.
+
+        The sub-questions are answered concurrently, at most
+        `McqaConfig.sub_question_concurrency` at a time, and share the parsed
+        attachments of this request. A failing sub-question is left out.
+        When tracing, each sub-question runs on a track of its own.
+        """
+        llm_request = self._prepare_modified_request()
+        with tracing.span("generate_sub_questions"):
+            response = self.llm_router.generate_llm_response(**llm_request)
+
+        sub_questions = self._sub_questions(response)
+        attachment_objects = self._sub_question_attachments()
+        with tracing.span("sub_question_fanout", sub_questions=len(sub_questions)):
+            with ThreadPoolExecutor(
+                max_workers=max(
+                    1,
+                    min(self.mcqa_config.sub_question_concurrency, len(sub_questions)),
+                )
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        tracing.bind(
+                            self._generate_sub_question_response,
+                            self._sub_question_track(sub_question_id),
+                            sub_question=sub_question_id,
+                        ),
+                        sub_question,
+                        attachment_objects,
+                    )
+                    for sub_question_id, sub_question in enumerate(sub_questions)
+                ]
+                responses = [future.result() for future in tqdm.tqdm(futures)]
+
+        return self._aggregate_responses(
+            [response for response in responses if response is not None]
+        )
+
+    async def agenerate_modified_query_response(self):
+        """Generates a modified query response without blocking the event loop.
+
+        The sub-questions are answered concurrently, at most
+        `McqaConfig.sub_question_concurrency` at a time.
+        """
+        llm_request = await asyncio.to_thread(self._prepare_modified_request)
+        self._label_metrics()
+        with tracing.span("generate_sub_questions"):
+            response = await self.llm_router.agenerate_llm_response(**llm_request)
+
+        semaphore = asyncio.Semaphore(max(1, self.mcqa_config.sub_question_concurrency))
+        attachment_objects = self._sub_question_attachments()
+        sub_questions = self._sub_questions(response)
+        with tracing.span("sub_question_fanout", sub_questions=len(sub_questions)):
+            responses = await asyncio.gather(
+                *[
+                    self._agenerate_sub_question_response(
+                        sub_question, attachment_objects, semaphore, sub_question_id
+                    )
+                    for sub_question_id, sub_question in enumerate(sub_questions)
+                ]
             )
 
-        if self.request.full_context_path.endswith((".pdf", ".png", ".jpeg", ".jpg")):
-            self._start_llm()
-            question_format = self.request.question_format
-            prompt_object, options_text, answer = self._get_prompts(question_format)
-            user_prompt, system_prompt = prompt_object
+        return self._aggregate_responses(
+            [response for response in responses if response is not None]
+        )
 
+    def _attach_context(self):
+        """Adds the context file to the request attachments, at most once."""
+        if self.request.full_context_path not in self.request.attachments:
             self.request.attachments.append(self.request.full_context_path)
-            if self.model in OPENMODELS:
-                parsed_multimodal_objects = [
-                    self.input_parser.handle(file_path=path)
-                    for path in self.request.attachments
-                ]
-            else:
-                parsed_multimodal_objects = [
-                    self.input_parser.parse(file_path=path)
-                    for path in self.request.attachments
-                ]
 
-            response = self.llm_router.generate_llm_response(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                multimodal_object=parsed_multimodal_objects,
-            )
-            rephrased_questions = self._postprocess_response(response, question_format)
-
-            responses = [
-                Mcqa(
-                    request=Question(
-                        question=question,
-                        options=extract_regex(
-                            options, pattern=Patterns.question_options_pattern
-                        ),
-                        full_context_path=self.request.full_context_path,
-                        options_randomizer=self.request.options_randomizer,
-                        answer=answer,
-                        question_format="raw",
-                        question_context=self.request.question_context,
-                    )
-                ).generate_query_response()
-                for question, options, answer in tqdm.tqdm(rephrased_questions)
+    def _parse_attachments(self) -> list:
+        """Parses the request attachments for the selected multimodal model.
+
+        Open models receive the raw file content, while hosted models receive
+        uploaded or base64-encoded objects. Attachments prepared for the whole
+        document are reused as is, and parsed attachments are kept for reuse.
+        """
+        if isinstance(self.attachment_objects, LazyResources):
+            self.attachment_objects = self.attachment_objects()
+        if self.attachment_objects is not None:
+            return self.attachment_objects
+        if self.model in OPENMODELS:
+            self.attachment_objects = [
+                self.input_parser.handle(file_path=path)
+                for path in self.request.attachments
+            ]
+        else:
+            self.attachment_objects = [
+                self.input_parser.parse(file_path=path)
+                for path in self.request.attachments
             ]
+        return self.attachment_objects
+
+    def _prepare_raw_request(self) -> Tuple[dict, str, str]:
+        """Crafts the prompts of a raw or naive question and starts the router.
 
-            evaluation = sum(response.evaluation for response in responses) / len(
-                responses
+        Returns:
+            Tuple[dict, str, str]: The keyword arguments of the LLM request, the
+                options text and the (possibly re-lettered) answer.
+        """
+        self._start_llm()
+        prompt_object, options_text, answer = self.question_formulator.use_raw_question(
+            query=self.request.question,
+            options=self.request.options,
+            full_context_path=self.request.full_context_path,
+            options_randomizer=self.request.options_randomizer,
+            answer=self.request.answer,
+            question_format=self.request.question_format,
+            short_context=self.request.question_context,
+        )
+        (
+            user_prompt,
+            system_prompt,
+        ) = prompt_object
+
+        llm_request = dict(system_prompt=system_prompt, user_prompt=user_prompt)
+        if self._is_multimodal():
+            self._attach_context()
+            llm_request.update(
+                multimodal_object=self._parse_attachments,
+                attachments=self.request.attachments,
+            )
+        return llm_request, options_text, answer
+
+    def _finish_raw_response(
+        self, response: str, options_text: str, answer: str
+    ) -> QuestionResponse:
+        """Extracts and evaluates the answer in the response to a raw or naive question.
+
+        The response metadata records the model, the latency and token counts of
+        the request and the estimated size of its prompt.
+        """
+        if self._is_multimodal() and self.request.question_format in ["naive"]:
+            question_response = self.postprocessor.naive_postprocess(
+                generated_response=response,
+                actual_answer=answer,
+                question=self.request.question,
+                options=options_text,
+                model=self.model,
             )
-            return ResponsesFromSources(
-                list_of_responses=responses, evaluation=evaluation
+        else:
+            question_response = self.postprocessor.postprocess(
+                generated_response=response,
+                actual_answer=answer,
+                question=self.request.question,
+                options=options_text,
+                model=self.model,
             )
 
+        question_response.metadata = ResponseMetadata(
+            model=self.model,
+            model_name=self.llm_router.llm_model.model_name,
+            prompt_size=self.prompt_crafter.last_prompt_size,
+            **self.llm_router.last_call,
+        )
+        return question_response
+
     def _generate_raw_response(self):
         """Generates a raw response using the LLM router."""
-        if "txt" in self.request.full_context_path:
-            prompt_object, options_text, answer = (
-                self.question_formulator.use_raw_question(
-                    query=self.request.question,
-                    options=self.request.options,
-                    attachments=self.request.attachments,
-                    full_context_path=self.request.full_context_path,
-                    answer=self.request.answer,
-                    options_randomizer=self.request.options_randomizer,
-                    question_format=self.request.question_format,
-                    short_context=self.request.question_context,
-                )
+        llm_request, options_text, answer = self._prepare_raw_request()
+        response = self.llm_router.generate_llm_response(**llm_request)
+        return self._finish_raw_response(response, options_text, answer)
+
+    async def _agenerate_raw_response(self):
+        """Generates a raw response using the async API of the LLM router.
+
+        Prompt crafting parses the context file, so it runs in a worker thread.
+        """
+        llm_request, options_text, answer = await asyncio.to_thread(
+            self._prepare_raw_request
+        )
+        self._label_metrics()
+        response = await self.llm_router.agenerate_llm_response(**llm_request)
+        return self._finish_raw_response(response, options_text, answer)
+
+    def _prepare_packed_request(
+        self, members: List[Mcqa]
+    ) -> Tuple[dict, List[Tuple[str, str, str, str]]]:
+        """Crafts one prompt asking the raw questions of a pack and starts the router.
+
+        `self` is the first member of the pack, whose context every member shares.
+        Members are identified by their position in the pack.
+
+        Returns:
+            Tuple[dict, List[Tuple[str, str, str, str]]]: The keyword arguments of
+                the LLM request, and the ID, question, options text and (possibly
+                re-lettered) answer of each member.
+        """
+        self._start_llm()
+        cases = []
+        for case_id, member in enumerate(members, start=1):
+            options_text, answer = self.question_formulator.format_options(
+                member.request.options,
+                member.request.answer,
+                options_randomizer=member.request.options_randomizer,
             )
-            user_prompt, system_prompt = prompt_object
-            self._start_llm()
-            response = self.llm_router.generate_llm_response(
-                system_prompt=system_prompt, user_prompt=user_prompt
+            cases.append((str(case_id), member.request.question, options_text, answer))
+
+        user_prompt, system_prompt = self.prompt_crafter.craft_packed_prompt(
+            [
+                (case_id, question, options_text, member.request.question_context)
+                for (case_id, question, options_text, _), member in zip(cases, members)
+            ],
+            full_context_path=self.request.full_context_path,
+        )
+        llm_request = dict(system_prompt=system_prompt, user_prompt=user_prompt)
+        if self._is_multimodal():
+            self._attach_context()
+            llm_request.update(
+                multimodal_object=self._parse_attachments,
+                attachments=self.request.attachments,
             )
+        return llm_request, cases
 
-        if re.search(
-            "|".join(["pdf", "png", "jpeg", "jpg"]), self.request.full_context_path
-        ):
-            self._start_llm()
-            prompt_object, options_text, answer = (
-                self.question_formulator.use_raw_question(
-                    query=self.request.question,
-                    options=self.request.options,
-                    full_context_path=self.request.full_context_path,
-                    options_randomizer=self.request.options_randomizer,
-                    answer=self.request.answer,
-                    question_format=self.request.question_format,
-                    short_context=self.request.question_context,
-                )
+    def _finish_packed_response(
+        self,
+        response: str,
+        members: List[Mcqa],
+        cases: List[Tuple[str, str, str, str]],
+    ) -> List[Optional[QuestionResponse]]:
+        """Splits and evaluates the response to a pack into one response per member.
+
+        The members share the latency of the request, while its token counts are
+        split evenly between them.
+        """
+        responses = self.postprocessor.postprocess_packed(
+            generated_response=response, cases=cases, model=self.model
+        )
+        last_call = dict(self.llm_router.last_call)
+        for tokens in ["input_tokens", "output_tokens"]:
+            if last_call.get(tokens) is not None:
+                last_call[tokens] = round(last_call[tokens] / len(members))
+
+        for member, question_response in zip(members, responses):
+            if question_response is None:
+                continue
+            member.model, member.llm_router = self.model, self.llm_router
+            question_response.metadata = ResponseMetadata(
+                model=self.model,
+                model_name=self.llm_router.llm_model.model_name,
+                prompt_size=self.prompt_crafter.last_prompt_size,
+                **last_call,
             )
-            self.request.attachments.append(self.request.full_context_path)
+        return responses
 
-            if self.model in OPENMODELS:
-                parsed_multimodal_objects = [
-                    self.input_parser.handle(file_path=path)
-                    for path in self.request.attachments
-                ]
-            else:
-                parsed_multimodal_objects = [
-                    self.input_parser.parse(file_path=path)
-                    for path in self.request.attachments
-                ]
-            (
-                user_prompt,
-                system_prompt,
-            ) = prompt_object
-
-            response = self.llm_router.generate_llm_response(
-                system_prompt=system_prompt,
-                user_prompt=user_prompt,
-                multimodal_object=parsed_multimodal_objects,
-            )
-            if self.request.question_format in ["naive"]:
-                return self.postprocessor.naive_postprocess(
-                    generated_response=response,
-                    actual_answer=answer,
-                    question=self.request.question,
-                    options=options_text,
-                    model=self.model,
-                )
+    def generate_packed_response(
+        self, members: List[Mcqa]
+    ) -> List[Optional[QuestionResponse]]:
+        """Asks the raw questions of several members about one context in one LLM call.
 
-        return self.postprocessor.postprocess(
-            generated_response=response,
-            actual_answer=answer,
-            question=self.request.question,
-            options=options_text,
-            model=self.model,
-        )
+        Args:
+            members (List[Mcqa]): The members of the pack, starting with `self`.
+
+        Returns:
+            List[Optional[QuestionResponse]]: The response of each member, or None
+                for the members the response did not answer properly.
+        """
+        for member in members:
+            member._add_fallback_options()
+        llm_request, cases = self._prepare_packed_request(members)
+        response = self.llm_router.generate_llm_response(**llm_request)
+        return self._finish_packed_response(response, members, cases)
 
     def _get_prompts(self, question_format):
         """Returns the appropriate prompts based on the question format."""
@@ -258,41 +516,155 @@ class Mcqa(McqaInterface):
             logger.debug("Rephrased questions: %s", rephrased_questions)
             return rephrased_questions
 
-    def generate_response_from_files(
+    def _result_record(self, _n: int, request_obj: Mcqa, **fields) -> ResultRecord:
+        """Builds the result record of a batch row, tagged with the row's model."""
+        llm_router = getattr(request_obj, "llm_router", None)
+        return ResultRecord(
+            row=_n,
+            model=getattr(request_obj, "model", None),
+            model_name=llm_router.llm_model.model_name if llm_router else None,
+            request=request_obj.request,
+            **fields,
+        )
+
+    def _log_row_response(
         self,
-        file_path: str,
-        file_type: str,
-        question_format: str,
-        output_path: str,
-        options_randomizer: bool = False,
+        _n: int,
+        request_obj: Mcqa,
+        response: QuestionResponse | ResponsesFromSources,
+        checkpoint: BatchCheckpoint,
     ):
-        """Generates responses for queries from a file.
+        """Appends the request and response of a batch row to the run results."""
+        checkpoint.record(
+            self._result_record(_n, request_obj, status="succeeded", response=response)
+        )
+
+    def _log_row_exception(
+        self,
+        _n: int,
+        request_obj: Mcqa,
+        e: Exception,
+        checkpoint: BatchCheckpoint,
+    ):
+        """Appends the request and exception of a failed batch row to the run results."""
+        logger.error(f"Exception Occured: {e}")
+        checkpoint.record(
+            self._result_record(_n, request_obj, status="failed", exception=str(e))
+        )
+
+    def _generate_row_response(
+        self,
+        _n: int,
+        request_payload: Question,
+        checkpoint: BatchCheckpoint,
+        attachment_objects: Optional[LazyResources] = None,
+    ) -> QuestionResponse | ResponsesFromSources | None:
+        """Generates the response for a single row of a batch run and logs it.
 
         Args:
-            file_path (str): The path to the file containing the queries.
-            file_type (str): The type of the file (e.g., csv).
-            question_format (str): The format of the questions (e.g., raw, synthetic, rephrase).
+            _n (int): The row number of the request within the source file.
+            request_payload (Question): The request built from the row.
+            checkpoint (BatchCheckpoint): The checkpoint recording the row outcome.
+            attachment_objects (LazyResources, optional): The attachments shared by
+                the rows of the document. Defaults to None.
 
         Returns:
-            ResponsesFromSources: The response generated by the MCQA system.
+            QuestionResponse | ResponsesFromSources | None: The generated response,
+                or None if the row raised an exception.
         """
-        if file_type == "csv":
-            extracted_requests = CsvLoader(
-                options_randomizer=options_randomizer
-            ).handle_csv(file_path=file_path)
-
-            final_responses = []
-            for _n, (
-                query,
-                option,
-                answer,
-                context,
-                short_context,
-                options_randomizer,
-            ) in tqdm.tqdm(enumerate(extracted_requests)):
-                # if _n < 5:
-                #     continue
-                request_payload = Question(
+        request_obj = Mcqa(
+            request=request_payload, attachment_objects=attachment_objects
+        )
+        try:
+            response = request_obj.generate_query_response()
+            self._log_row_response(_n, request_obj, response, checkpoint)
+            return response
+
+        except Exception as e:
+            self._log_row_exception(_n, request_obj, e, checkpoint)
+            return None
+
+    def _packs(
+        self,
+        rows: List[Tuple[int, Question]],
+        question_format: str,
+        pack_questions: int,
+    ) -> List[List[Tuple[int, Question]]]:
+        """Splits the rows of a document into packs answered by a single LLM call.
+
+        Only raw questions are packed; every other row is a pack of its own.
+        """
+        size = max(1, pack_questions) if question_format == "raw" else 1
+        return [rows[k : k + size] for k in range(0, len(rows), size)]
+
+    def _pack_track(self, pack: List[Tuple[int, Question]]) -> Tuple[str, dict]:
+        """Returns the trace track of a pack of rows and the arguments of its spans."""
+        rows = [_n for _n, _ in pack]
+        name = f"row {rows[0]}" if len(rows) == 1 else f"rows {rows[0]}-{rows[-1]}"
+        return name, {"rows": rows, "document": pack[0][1].full_context_path}
+
+    def _generate_pack_responses(
+        self,
+        pack: List[Tuple[int, Question]],
+        checkpoint: BatchCheckpoint,
+        attachment_objects: Optional[LazyResources] = None,
+    ) -> List[QuestionResponse | ResponsesFromSources | None]:
+        """Generates the responses for a pack of rows sharing a document and logs them.
+
+        The questions of the pack are asked in one LLM call. Rows the packed
+        response leaves unanswered or malformed, or every row if the packed call
+        fails, are asked again one question at a time.
+
+        Args:
+            pack (List[Tuple[int, Question]]): The row numbers and requests of the pack.
+            checkpoint (BatchCheckpoint): The checkpoint recording the row outcomes.
+            attachment_objects (LazyResources, optional): The attachments shared by
+                the rows of the document. Defaults to None.
+
+        Returns:
+            List[QuestionResponse | ResponsesFromSources | None]: The response of
+                each row, or None for the rows that raised an exception.
+        """
+        if len(pack) == 1:
+            return [
+                self._generate_row_response(*pack[0], checkpoint, attachment_objects)
+            ]
+
+        members = [
+            Mcqa(request=request_payload, attachment_objects=attachment_objects)
+            for _, request_payload in pack
+        ]
+        try:
+            responses = members[0].generate_packed_response(members)
+        except Exception as e:
+            logger.warning(f"Packed request failed, asking one question at a time: {e}")
+            responses = [None] * len(members)
+
+        row_responses = []
+        for (_n, _), member, response in zip(pack, members, responses):
+            try:
+                if response is None:
+                    response = member._generate_raw_response()
+                self._log_row_response(_n, member, response, checkpoint)
+                row_responses.append(response)
+            except Exception as e:
+                self._log_row_exception(_n, member, e, checkpoint)
+                row_responses.append(None)
+        return row_responses
+
+    def _iter_row_requests(
+        self, file_path: str, question_format: str, options_randomizer: bool
+    ) -> Iterator[List[Question]]:
+        """Streams the questions of a CSV file as requests, one per row, in chunks."""
+        # pandas is only imported by batch runs, keeping it off the import path of
+        # the API and single-question requests.
+        from mcqa.dataloaders.csv_loader import CsvLoader
+
+        for extracted_requests in CsvLoader(
+            options_randomizer=options_randomizer
+        ).iter_csv(file_path=file_path, chunksize=self.mcqa_config.csv_chunksize):
+            yield [
+                Question(
                     question=query,
                     options=option,
                     answer=answer,
@@ -301,54 +673,298 @@ class Mcqa(McqaInterface):
                     full_context_path=context,
                     question_context=short_context,
                 )
-                try:
-                    request_obj = Mcqa(request=request_payload)
-                    time.sleep(5)
-                    response = request_obj.generate_query_response()
-                    final_responses.append(response)
+                for (
+                    query,
+                    option,
+                    answer,
+                    context,
+                    short_context,
+                    options_randomizer,
+                ) in extracted_requests
+            ]
 
-                    request_response_log = RequestResponseLog(
-                        request=request_obj.request, response=response
-                    )
+    def _prepare_document(self, request: Question) -> Optional[LazyResources]:
+        """Shares the attachments of a document between all of its rows.
 
-                    # Extracting the output
-                    os.makedirs(output_path, exist_ok=True)
-                    with open(
-                        f"{output_path}/request_responseLog_llama8b_{_n}.json", "w"
-                    ) as f:
-                        request_res_dict = request_response_log.dict()
-                        pretty_request_res_dict = json.dumps(request_res_dict, indent=4)
-                        f.write(pretty_request_res_dict)
+        The attachments are parsed by the first row that calls the provider, so
+        documents whose rows are all cached or replayed are never parsed or
+        uploaded.
 
-                except Exception as e:
-                    os.makedirs(output_path, exist_ok=True)
-                    logger.error(f"Exception Occured: {e}")
-                    pretty_request_dict = json.dumps(request_payload.dict(), indent=4)
-                    exception_log = ExceptionLog(
-                        request=pretty_request_dict, exception=str(e)
-                    )
-                    with open(
-                        f"{output_path}/exception_log_llama8b_{_n}.json", "w"
-                    ) as f:
-                        exception_dict = exception_log.dict()
-                        pretty_exception_dict = json.dumps(exception_dict, indent=4)
-                        f.write(pretty_exception_dict)
-                    continue
-
-            if question_format in ["synthetic", "rephrase"]:
-                final_responses = list(
-                    chain(
-                        *[response_.list_of_responses for response_ in final_responses]
-                    )
+        Returns:
+            Optional[LazyResources]: The attachments sent to the multimodal
+                model, parsed on first use, or None when the context is not a
+                multimodal file.
+        """
+        document = Mcqa(request=request.model_copy(deep=True))
+        if not document._is_multimodal():
+            return None
+        document.model = self.mcqa_config.multimodal_model
+        document._attach_context()
+        return LazyResources(document._parse_attachments)
+
+    def _start_scheduler(self, max_concurrency: int) -> DocumentScheduler:
+        """Returns a scheduler preparing the documents of a batch run."""
+        return DocumentScheduler(
+            self._prepare_document,
+            max_prepared=max(self.mcqa_config.max_prepared_documents, max_concurrency),
+        )
+
+    def _start_checkpoint(
+        self,
+        file_path: str,
+        question_format: str,
+        output_path: str,
+        resume: bool,
+    ) -> Tuple[BatchCheckpoint, dict]:
+        """Opens the checkpoint and results file of a batch run in `output_path`.
+
+        Returns:
+            Tuple[BatchCheckpoint, dict]: The checkpoint and, when resuming, the
+                stored responses of the rows that already succeeded by row number.
+        """
+        os.makedirs(output_path, exist_ok=True)
+        checkpoint = BatchCheckpoint(
+            output_path,
+            file_path,
+            question_format,
+            compress=self.mcqa_config.results_compress,
+            flush_every=self.mcqa_config.results_flush_every,
+            flush_interval=self.mcqa_config.results_flush_interval,
+        )
+        stored_responses = checkpoint.stored_responses() if resume else {}
+        return checkpoint, stored_responses
+
+    def _start_replay(
+        self,
+        output_path: str,
+        record_responses: Optional[bool],
+        replay_from: Optional[str],
+        replay_strict: Optional[bool],
+    ):
+        """Returns the context recording or replaying the responses of a batch run."""
+        return replay.start_run(
+            output_path,
+            record=(
+                self.mcqa_config.record_responses
+                if record_responses is None
+                else record_responses
+            ),
+            replay_from=replay_from or self.mcqa_config.replay_from,
+            strict=(
+                self.mcqa_config.replay_strict
+                if replay_strict is None
+                else replay_strict
+            ),
+            compress=self.mcqa_config.results_compress,
+        )
+
+    def _write_results_table(
+        self,
+        question_format: str,
+        source_paths: List[str],
+        row_responses: dict,
+        output_path: str,
+    ):
+        """Writes the results table of a batch run and its summaries to `output_path`."""
+        from mcqa.base.results_table import ResultsTable
+
+        ResultsTable.from_rows(question_format, source_paths, row_responses).write(
+            output_path
+        )
+
+    def _aggregate_rows(
+        self,
+        row_responses: List[QuestionResponse | ResponsesFromSources | None],
+        question_format: str,
+    ) -> ResponsesFromSources:
+        """Aggregates the responses of a batch run, in row order, skipping failed rows.
+
+        The questions of the run are scored again at once, so that rows resumed
+        from an earlier run are scored like the new ones.
+        """
+        rows = [response for response in row_responses if response is not None]
+        final_responses = rows
+
+        if question_format in ["synthetic", "rephrase"]:
+            final_responses = list(
+                chain(*[response_.list_of_responses for response_ in rows])
+            )
+
+        evaluation = QAEvaluation.accuracy(
+            QAEvaluation().score_responses(final_responses)
+        )
+        if question_format in ["synthetic", "rephrase"]:
+            for response_ in rows:
+                response_.evaluation = QAEvaluation.accuracy(
+                    [
+                        sub_response.evaluation
+                        for sub_response in response_.list_of_responses
+                    ]
                 )
 
-            evaluation = sum(
-                response_.evaluation for response_ in final_responses
-            ) / len(final_responses)
+        serialized_response = ResponsesFromSources(
+            list_of_responses=final_responses, evaluation=evaluation
+        )
 
-            serialized_response = ResponsesFromSources(
-                list_of_responses=final_responses, evaluation=evaluation
+        logger.debug("ResponsesGeneratorResponse: %s", serialized_response)
+        return serialized_response
+
+    def generate_response_from_files(
+        self,
+        file_path: str,
+        file_type: str,
+        question_format: str,
+        output_path: str,
+        options_randomizer: bool = False,
+        max_concurrency: int = None,
+        pack_questions: int = None,
+        progress_callback: Callable[
+            [int, QuestionResponse | ResponsesFromSources | None], None
+        ] = None,
+        resume: bool = True,
+        trace: bool = None,
+        record_responses: bool = None,
+        replay_from: str = None,
+        replay_strict: bool = None,
+    ):
+        """Generates responses for queries from a file.
+
+        The file is streamed in `McqaConfig.csv_chunksize` row chunks, and rows are
+        evaluated by a pool of `max_concurrency` workers as soon as they are loaded,
+        so that many questions can be in flight at once. Within a chunk, rows are
+        grouped by source document, whose attachments are parsed once and shared
+        by its rows. With `pack_questions` above 1, up to that many raw questions
+        on a document share one LLM call, which sends the document once.
+        At most `McqaConfig.max_in_flight_per_worker` packs per worker are
+        queued at once, so the file is only read as fast as rows finish, and
+        the requests of finished rows are released.
+        Results are collected back in row order.
+        Row outcomes are checkpointed in `output_path`, so an interrupted run
+        resumes where it stopped. Once done, the run's results table and its
+        summaries by model, format and document are written there as Parquet.
+        With `trace`, the timeline of the run is written there as `trace.json`,
+        a Chrome trace with a track per row and sub-question.
+        With `record_responses`, the raw provider responses are recorded there,
+        and `replay_from` re-runs a recorded run offline, for instance to score
+        it again after changing the post-processing or the evaluation.
+
+        Args:
+            file_path (str): The path to the file containing the queries.
+            file_type (str): The type of the file (e.g., csv).
+            question_format (str): The format of the questions (e.g., raw, synthetic, rephrase).
+            output_path (str): The directory where the run results and checkpoint are written.
+            options_randomizer (bool): Whether to shuffle the options of each question.
+            max_concurrency (int, optional): The number of questions in flight at once.
+                Defaults to `McqaConfig.max_concurrency`.
+            pack_questions (int, optional): The number of raw questions on the same
+                document asked in a single LLM call, 1 to ask them one at a time.
+                Defaults to `McqaConfig.pack_questions`.
+            progress_callback (Callable, optional): Called with the number of rows loaded
+                so far and the response (None if the row failed) each time a row finishes.
+            resume (bool): Whether to reuse the results of an earlier run stored in
+                `output_path`, only running the rows that failed or never ran.
+            trace (bool, optional): Whether to write the timeline of the run to
+                `output_path`. Defaults to `McqaConfig.trace_enabled`.
+            record_responses (bool, optional): Whether to record the raw provider
+                responses in `output_path` for later replays. Defaults to
+                `McqaConfig.record_responses`.
+            replay_from (str, optional): The recording, or output path of a
+                recorded run, whose responses are served instead of calling the
+                provider. Defaults to `McqaConfig.replay_from`.
+            replay_strict (bool, optional): Whether rows whose requests were not
+                recorded fail instead of calling the provider. Defaults to
+                `McqaConfig.replay_strict`.
+
+        Returns:
+            ResponsesFromSources: The response generated by the MCQA system.
+        """
+        if file_type == "csv":
+            max_concurrency = max_concurrency or self.mcqa_config.max_concurrency
+            pack_questions = pack_questions or self.mcqa_config.pack_questions
+            trace = self.mcqa_config.trace_enabled if trace is None else trace
+            replay_run = self._start_replay(
+                output_path, record_responses, replay_from, replay_strict
+            )
+            checkpoint, row_responses = self._start_checkpoint(
+                file_path, question_format, output_path, resume
             )
 
-            logger.debug("ResponsesGeneratorResponse: %s", serialized_response)
-            return serialized_response
+            max_in_flight = max_concurrency * self.mcqa_config.max_in_flight_per_worker
+            source_paths = []
+            progress = tqdm.tqdm(total=0)
+
+            def collect(futures: dict, return_when: str):
+                """Stores the responses of finished packs and forgets their requests."""
+                done, _ = wait(futures, return_when=return_when)
+                for future in done:
+                    for _n, response in zip(futures.pop(future), future.result()):
+                        row_responses[_n] = response
+                        progress.update()
+                        if progress_callback is not None:
+                            progress_callback(len(source_paths), response)
+
+            with tracing.start_run(trace) as tracer, tracing.track(
+                "batch", file_path=file_path, question_format=question_format
+            ), replay_run, checkpoint.writer, ThreadPoolExecutor(
+                max_workers=max_concurrency
+            ) as executor:
+                futures = {}
+                try:
+                    scheduler = self._start_scheduler(max_concurrency)
+                    for chunk in self._iter_row_requests(
+                        file_path, question_format, options_randomizer
+                    ):
+                        rows = []
+                        for request_payload in chunk:
+                            _n = len(source_paths)
+                            source_paths.append(request_payload.full_context_path)
+                            if _n not in row_responses:
+                                rows.append((_n, request_payload))
+                            elif progress_callback is not None:
+                                progress_callback(len(source_paths), row_responses[_n])
+
+                        for batch in scheduler.schedule(rows):
+                            scheduler.prepare(batch)
+                            for pack in self._packs(
+                                batch.rows, question_format, pack_questions
+                            ):
+                                while len(futures) >= max_in_flight:
+                                    collect(futures, FIRST_COMPLETED)
+                                track_name, track_args = self._pack_track(pack)
+                                future = executor.submit(
+                                    tracing.bind(
+                                        self._generate_pack_responses,
+                                        track_name,
+                                        **track_args,
+                                    ),
+                                    pack,
+                                    checkpoint,
+                                    batch.resources,
+                                )
+                                future.add_done_callback(
+                                    lambda _, batch=batch, rows=len(pack): (
+                                        scheduler.row_done(batch, rows)
+                                    )
+                                )
+                                futures[future] = [_n for _n, _ in pack]
+                                progress.total += len(pack)
+                                progress.refresh()
+                    while futures:
+                        collect(futures, FIRST_COMPLETED)
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+                finally:
+                    progress.close()
+
+            if tracer is not None:
+                tracer.write(os.path.join(output_path, "trace.json"))
+            responses = self._aggregate_rows(
+                [row_responses[_n] for _n in range(len(source_paths))],
+                question_format,
+            )
+            self._write_results_table(
+                question_format, source_paths, row_responses, output_path
+            )
+            return responses
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Hashable
+
+from mcqa.commons import logger
+from mcqa.commons.lru_cache import LRUCache
+from mcqa.config import McqaConfig
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
+    import httpx
+    import ollama
+    from openai import AsyncOpenAI, OpenAI
+
+logger = logger.setup_logger()
+
+# Provider SDKs are imported by the getters, so that a process only loads the
+# SDKs of the providers it uses.
+
+_clients: Dict[Hashable, Any] = {}
+_clients_lock = threading.Lock()
+_configured_google_api_keys = set()
+_async_clients = weakref.WeakKeyDictionary()
+# Gemini models kept per event loop, most of them on short-lived cached contents.
+LOOP_GEMINI_MODELS = 64
+
+
+def _http_limits(mcqa_config: McqaConfig) -> httpx.Limits:
+    """Returns the keep-alive connection pool limits shared by HTTP clients."""
+    import httpx
+
+    return httpx.Limits(
+        max_connections=mcqa_config.http_pool_size,
+        max_keepalive_connections=mcqa_config.http_pool_size,
+    )
+
+
+def get_openai_client(api_key: str) -> OpenAI:
+    """Returns the process-wide OpenAI client for an API key.
+
+    Args:
+        api_key (str): The OpenAI API key.
+
+    Returns:
+        OpenAI: The client, sharing one keep-alive connection pool.
+    """
+    import httpx
+    from openai import OpenAI
+
+    with _clients_lock:
+        key = ("openai", api_key)
+        if key not in _clients:
+            mcqa_config = McqaConfig()
+            logger.debug("Creating shared OpenAI client")
+            _clients[key] = OpenAI(
+                api_key=api_key,
+                timeout=mcqa_config.http_timeout,
+                http_client=httpx.Client(
+                    limits=_http_limits(mcqa_config),
+                    timeout=mcqa_config.http_timeout,
+                ),
+            )
+        return _clients[key]
+
+
+def _configure_genai(api_key: str = None):
+    """Configures genai with an API key once, under `_clients_lock`."""
+    import google.generativeai as genai
+
+    if api_key and api_key not in _configured_google_api_keys:
+        genai.configure(api_key=api_key)
+        _configured_google_api_keys.add(api_key)
+
+
+def get_gemini_model(model_name: str, api_key: str = None) -> genai.GenerativeModel:
+    """Returns the process-wide Gemini model, configuring genai once per API key.
+
+    Async requests go through `get_async_gemini_model`, which keeps a model per
+    event loop.
+
+    Args:
+        model_name (str): The Gemini model name.
+        api_key (str, optional): The Google API key. Defaults to the GOOGLE_API_KEY
+            environment variable read by genai.
+
+    Returns:
+        genai.GenerativeModel: The generative model.
+    """
+    import google.generativeai as genai
+
+    with _clients_lock:
+        _configure_genai(api_key)
+        key = ("gemini", model_name, api_key)
+        if key not in _clients:
+            logger.debug(f"Creating shared {model_name} Gemini model")
+            _clients[key] = genai.GenerativeModel(model_name)
+        return _clients[key]
+
+
+def get_ollama_client(host: str = None) -> ollama.Client:
+    """Returns the process-wide Ollama client for a host.
+
+    Args:
+        host (str, optional): The Ollama host. Defaults to OLLAMA_HOST or localhost.
+
+    Returns:
+        ollama.Client: The client, sharing one keep-alive connection pool.
+    """
+    import ollama
+
+    with _clients_lock:
+        key = ("ollama", host)
+        if key not in _clients:
+            mcqa_config = McqaConfig()
+            logger.debug("Creating shared Ollama client")
+            _clients[key] = ollama.Client(
+                host=host,
+                timeout=mcqa_config.http_timeout,
+                limits=_http_limits(mcqa_config),
+            )
+        return _clients[key]
+
+
+def _loop_clients() -> Dict[Hashable, Any]:
+    """Returns the async clients of the running event loop.
+
+    Async HTTP connection pools are bound to the loop that opened them, so
+    async clients are shared per event loop rather than per process.
+    """
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        return _async_clients.setdefault(loop, {})
+
+
+def get_async_gemini_model(
+    model_name: str, api_key: str = None, cached_content: Any = None
+) -> genai.GenerativeModel:
+    """Returns the Gemini model of the running event loop for async requests.
+
+    `GenerativeModel.generate_content_async` opens the async client of a model
+    on its first request, on the loop of that request, so async requests use a
+    model per event loop rather than the process-wide one. Each loop keeps its
+    `LOOP_GEMINI_MODELS` most recently used models.
+
+    Args:
+        model_name (str): The Gemini model name.
+        api_key (str, optional): The Google API key. Defaults to the GOOGLE_API_KEY
+            environment variable read by genai.
+        cached_content (caching.CachedContent, optional): The cached content the
+            model answers on top of. Defaults to None.
+
+    Returns:
+        genai.GenerativeModel: The generative model of the running event loop.
+    """
+    import google.generativeai as genai
+
+    clients = _loop_clients()
+    with _clients_lock:
+        _configure_genai(api_key)
+        models = clients.setdefault(("gemini",), LRUCache(LOOP_GEMINI_MODELS))
+    key = (model_name, api_key, getattr(cached_content, "name", None))
+    model = models.get(key)
+    if model is None:
+        logger.debug(f"Creating {model_name} Gemini model for the event loop")
+        model = (
+            genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+            if cached_content is not None
+            else genai.GenerativeModel(model_name)
+        )
+        models.put(key, model)
+    return model
+
+
+def get_async_openai_client(api_key: str) -> AsyncOpenAI:
+    """Returns the AsyncOpenAI client of the running event loop for an API key.
+
+    Args:
+        api_key (str): The OpenAI API key.
+
+    Returns:
+        AsyncOpenAI: The client, sharing one keep-alive connection pool.
+    """
+    import httpx
+    from openai import AsyncOpenAI
+
+    clients = _loop_clients()
+    key = ("openai", api_key)
+    if key not in clients:
+        mcqa_config = McqaConfig()
+        logger.debug("Creating shared AsyncOpenAI client")
+        clients[key] = AsyncOpenAI(
+            api_key=api_key,
+            timeout=mcqa_config.http_timeout,
+            http_client=httpx.AsyncClient(
+                limits=_http_limits(mcqa_config),
+                timeout=mcqa_config.http_timeout,
+            ),
+        )
+    return clients[key]
+
+
+def get_async_ollama_client(host: str = None) -> ollama.AsyncClient:
+    """Returns the Ollama AsyncClient of the running event loop for a host.
+
+    Args:
+        host (str, optional): The Ollama host. Defaults to OLLAMA_HOST or localhost.
+
+    Returns:
+        ollama.AsyncClient: The client, sharing one keep-alive connection pool.
+    """
+    import ollama
+
+    clients = _loop_clients()
+    key = ("ollama", host)
+    if key not in clients:
+        mcqa_config = McqaConfig()
+        logger.debug("Creating shared Ollama AsyncClient")
+        clients[key] = ollama.AsyncClient(
+            host=host,
+            timeout=mcqa_config.http_timeout,
+            limits=_http_limits(mcqa_config),
+        )
+    return clients[key]
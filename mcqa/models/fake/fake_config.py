@@ -0,0 +1,17 @@
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class FakeConfig:
+    generation_model: str = os.environ.get("FAKE_MODEL_NAME", "fake-1")
+    temperature: float = 0.0
+    latency_distribution: str = os.environ.get("FAKE_LATENCY_DISTRIBUTION", "constant")
+    latency_mean: float = float(os.environ.get("FAKE_LATENCY_MEAN", 0.0))
+    latency_spread: float = float(os.environ.get("FAKE_LATENCY_SPREAD", 0.0))
+    error_rate: float = float(os.environ.get("FAKE_ERROR_RATE", 0.0))
+    rate_limit_rate: float = float(os.environ.get("FAKE_RATE_LIMIT_RATE", 0.0))
+    retry_after: float = float(os.environ.get("FAKE_RETRY_AFTER", 0.1))
+    sub_questions: int = int(os.environ.get("FAKE_SUB_QUESTIONS", 5))
+    seed: int = int(os.environ.get("FAKE_SEED", 0))
+    max_tracked_prompts: int = int(os.environ.get("FAKE_MAX_TRACKED_PROMPTS", 10_000))
@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, List, Optional, Tuple
+
+from mcqa.commons import logger
+from mcqa.commons.lru_cache import LRUCache
+from mcqa.commons.rate_limiter import RATE_LIMIT_STATUS
+from mcqa.commons.tokens import estimate_tokens
+from mcqa.domain.multimodal_response_generator import (
+    AsyncMultimodalResponseGenerator, MultimodalResponseGenerator)
+from mcqa.domain.text_response_generator import (AsyncTextResponseGenerator,
+                                                 TextResponseGenerator)
+from mcqa.models.fake.fake_config import FakeConfig
+
+logger = logger.setup_logger()
+
+CASE_PATTERN = re.compile(r"<Case id=\"([^\"]+)\">(.*?)</Case>", re.DOTALL)
+QUESTION_PATTERN = re.compile(r"<Question>\s*(.*?)\s*</Question>", re.DOTALL)
+OPTIONS_PATTERN = re.compile(
+    r"<Option>\s*(.*?)\s*</Option>|^Option:\s*(.*?)\s*(?:^Short Context:|\Z)",
+    re.DOTALL | re.MULTILINE,
+)
+ANSWER_PATTERN = re.compile(r"<Answer>\s*(.*?)\s*</Answer>", re.DOTALL)
+N_QUESTIONS_PATTERN = re.compile(r"<NumberOfQuestions>\s*(\d+)")
+OPTION_LETTER_PATTERN = re.compile(r"(?:^|\s)([A-Z])\.\s")
+
+# Attempts by request, shared by every router so retries count across them.
+_attempts = LRUCache(FakeConfig().max_tracked_prompts)
+_attempts_lock = threading.Lock()
+
+
+class FakeProviderError(RuntimeError):
+    """A failure injected by the fake provider."""
+
+
+class FakeRateLimitError(FakeProviderError):
+    """A rate-limit error injected by the fake provider, retried by the router."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Fake provider rate limit")
+        self.status_code = RATE_LIMIT_STATUS
+        self.response = SimpleNamespace(
+            status_code=RATE_LIMIT_STATUS,
+            headers={"retry-after-ms": str(int(retry_after * 1000))},
+        )
+
+
+class FakeResponseGenerator(
+    TextResponseGenerator,
+    AsyncTextResponseGenerator,
+    MultimodalResponseGenerator,
+    AsyncMultimodalResponseGenerator,
+):
+    """Offline provider answering with well-formed responses, for tests and benchmarks.
+
+    Answers questions with an `<MCQResponse>` (one per case for packed
+    questions) and asks for rephrased or synthetic questions with
+    `<Question>`, `<Options>` and `<Answer>` blocks built from the question
+    asked. Responses, latencies and injected failures are drawn from a
+    generator seeded by the prompts, the attempt and `FakeConfig.seed`, so a
+    run is reproducible regardless of its concurrency.
+
+    Latencies follow `FakeConfig.latency_distribution`:
+        - constant: always `latency_mean`.
+        - uniform: `latency_mean` give or take `latency_spread`.
+        - exponential: averaging `latency_mean`.
+        - lognormal: a median of `latency_mean` and a sigma of `latency_spread`.
+    """
+
+    def __init__(self):
+        """Initializes the FakeResponseGenerator with a FakeConfig."""
+        self.fake_config = FakeConfig()
+        self.model_name = self.fake_config.generation_model
+        self.temperature = self.fake_config.temperature
+        self.last_usage = None
+
+    def start_llm(self):
+        """Starts the LLM model; the fake provider has no client."""
+        self.llm_model = None
+
+    def _rng(self, system_prompt: str, user_prompt: str) -> random.Random:
+        """Returns the random generator of a request, seeded by its prompts and attempt.
+
+        Attempts are counted per process, across routers, for the
+        `FakeConfig.max_tracked_prompts` most recent prompts, so a prompt retried
+        after that many others starts over.
+        """
+        key = hashlib.sha256(
+            f"{self.fake_config.seed}\0{system_prompt}\0{user_prompt}".encode()
+        ).hexdigest()
+        with _attempts_lock:
+            attempt = _attempts.get(key) or 0
+            _attempts.put(key, attempt + 1)
+        return random.Random(f"{key}:{attempt}")
+
+    def _latency(self, rng: random.Random) -> float:
+        """Draws the latency of a request from the configured distribution."""
+        mean = self.fake_config.latency_mean
+        spread = self.fake_config.latency_spread
+        distribution = self.fake_config.latency_distribution
+        if mean <= 0:
+            return 0.0
+        if distribution == "constant":
+            return mean
+        if distribution == "uniform":
+            return max(0.0, rng.uniform(mean - spread, mean + spread))
+        if distribution == "exponential":
+            return rng.expovariate(1 / mean)
+        if distribution == "lognormal":
+            return rng.lognormvariate(math.log(mean), spread)
+        raise ValueError(f"Unsupported latency distribution: {distribution}")
+
+    def _failure(self, rng: random.Random) -> Optional[FakeProviderError]:
+        """Draws the failure injected in a request, if any."""
+        draw = rng.random()
+        if draw < self.fake_config.rate_limit_rate:
+            return FakeRateLimitError(self.fake_config.retry_after)
+        if draw < self.fake_config.rate_limit_rate + self.fake_config.error_rate:
+            return FakeProviderError("Fake provider error")
+        return None
+
+    def _options(self, case: str) -> Tuple[str, List[str]]:
+        """Returns the options text of a case and the letters of its options."""
+        match = OPTIONS_PATTERN.search(case)
+        options = (match.group(1) or match.group(2)) if match else ""
+        options = " ".join(options.split())
+        return options, OPTION_LETTER_PATTERN.findall(f" {options}") or ["A"]
+
+    def _answer(self, rng: random.Random, case: str, detailed: bool) -> str:
+        """Builds the `<Answer>` of a question, with the other fields if `detailed`."""
+        question = QUESTION_PATTERN.search(case)
+        question = question.group(1) if question else ""
+        _, letters = self._options(case)
+        answer = f"<Answer>{rng.choice(letters)}</Answer>"
+        if not detailed:
+            return answer
+        return (
+            f"{answer}\n<RelevantExcerpts>\n- {question[:80]}\n</RelevantExcerpts>"
+            f"\n<Thinking>\n- Chose among {len(letters)} options.\n</Thinking>"
+            "\n<FoundationalKnowledge>\nNo\n</FoundationalKnowledge>\n"
+        )
+
+    def _questions(self, rng: random.Random, system_prompt: str, case: str) -> str:
+        """Builds the rephrased or synthetic questions asked for a case."""
+        question = QUESTION_PATTERN.search(case)
+        question = question.group(1) if question else "Question"
+        options, letters = self._options(case)
+        answer = ANSWER_PATTERN.search(case)
+        answer = answer.group(1) if answer else rng.choice(letters)
+        n_questions = N_QUESTIONS_PATTERN.search(case)
+        n_questions = (
+            int(n_questions.group(1)) if n_questions else self.fake_config.sub_questions
+        )
+        tag = "MCQSynthetic" if "<MCQSynthetic>" in system_prompt else "MCQRephrase"
+        questions = "".join(
+            f"\n<Question>{question} ({k + 1})</Question>"
+            f"\n<Options>{options}</Options>\n<Answer>{answer}</Answer>"
+            for k in range(n_questions)
+        )
+        return f"<{tag}>{questions}\n</{tag}>"
+
+    def _respond(self, rng: random.Random, system_prompt: str, user_prompt: str) -> str:
+        """Builds the response to a request from the format its prompts ask for."""
+        if "<MCQRephrase>" in system_prompt or "<MCQSynthetic>" in system_prompt:
+            return self._questions(rng, system_prompt, user_prompt)
+
+        detailed = "<Thinking>" in system_prompt
+        cases = CASE_PATTERN.findall(user_prompt)
+        if cases:
+            return "\n".join(
+                f'<MCQResponse id="{case_id}">\n'
+                f"{self._answer(rng, case, detailed)}</MCQResponse>"
+                for case_id, case in cases
+            )
+        answer = self._answer(rng, user_prompt, detailed)
+        return f"<MCQResponse>\n{answer}</MCQResponse>"
+
+    def _prepare(
+        self, system_prompt: str, user_prompt: str, multimodal_objects: Any = None
+    ) -> Tuple[float, Optional[FakeProviderError], str]:
+        """Draws the latency, failure and response of a request and records its usage."""
+        rng = self._rng(system_prompt, user_prompt)
+        latency, failure = self._latency(rng), self._failure(rng)
+        response = self._respond(rng, system_prompt, user_prompt)
+        self.last_usage = {
+            "input_tokens": estimate_tokens(system_prompt)
+            + estimate_tokens(user_prompt),
+            "output_tokens": estimate_tokens(response),
+        }
+        logger.debug(
+            f"Fake response in {latency:.3f}s for "
+            f"{len(multimodal_objects or [])} multimodal objects"
+        )
+        return latency, failure, response
+
+    def generate_response(self, system_prompt: str, user_prompt: str) -> str:
+        """Generates a response text.
+
+        Args:
+            system_prompt (str): The system prompt.
+            user_prompt (str): The user prompt.
+
+        Returns:
+            str: The generated response text.
+        """
+        latency, failure, response = self._prepare(system_prompt, user_prompt)
+        time.sleep(latency)
+        if failure is not None:
+            raise failure
+        return response
+
+    async def agenerate_response(self, system_prompt: str, user_prompt: str) -> str:
+        """Generates a response text without blocking the event loop.
+
+        Args:
+            system_prompt (str): The system prompt.
+            user_prompt (str): The user prompt.
+
+        Returns:
+            str: The generated response text.
+        """
+        latency, failure, response = self._prepare(system_prompt, user_prompt)
+        await asyncio.sleep(latency)
+        if failure is not None:
+            raise failure
+        return response
+
+    def generate_multimodal_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_objects: List[Any],
+        url: str = None,
+    ) -> str:
+        """Generates a multimodal response, ignoring the content of the objects.
+
+        Args:
+            system_prompt (str): The system prompt.
+            user_prompt (str): The user prompt.
+            multimodal_objects (List[Any]): The multimodal objects.
+            url (str): The URL of the multimodal object
+
+        Returns:
+            str: The generated response text.
+        """
+        latency, failure, response = self._prepare(
+            system_prompt, user_prompt, multimodal_objects
+        )
+        time.sleep(latency)
+        if failure is not None:
+            raise failure
+        return response
+
+    async def agenerate_multimodal_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_objects: List[Any],
+        url: str = None,
+    ) -> str:
+        """Generates a multimodal response without blocking the event loop.
+
+        Args:
+            system_prompt (str): The system prompt.
+            user_prompt (str): The user prompt.
+            multimodal_objects (List[Any]): The multimodal objects.
+            url (str): The URL of the multimodal object
+
+        Returns:
+            str: The generated response text.
+        """
+        latency, failure, response = self._prepare(
+            system_prompt, user_prompt, multimodal_objects
+        )
+        await asyncio.sleep(latency)
+        if failure is not None:
+            raise failure
+        return response
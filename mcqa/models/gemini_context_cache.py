@@ -0,0 +1,251 @@
+import atexit
+import datetime
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import google.generativeai as genai
+from google.generativeai import caching
+
+from mcqa.commons import logger
+from mcqa.commons.hashing import text_sha256
+from mcqa.commons.tokens import estimate_tokens
+from mcqa.config import McqaConfig
+
+logger = logger.setup_logger()
+
+# HTTP statuses of cached content creation failures that recur for a context,
+# such as a context below the provider's minimum or a model without caching.
+PERMANENT_ERROR_CODES = (400, 403, 404)
+
+
+@dataclass
+class CachedContext:
+    """A Gemini cached content and the model answering on top of it."""
+
+    key: str
+    cached_content: Any
+    model: genai.GenerativeModel
+    expire_time: float
+    refs: int = 0
+
+
+class GeminiContextCache:
+    """Registry of Gemini cached contents, one per model, system prompt and document.
+
+    The system prompt and document of a request are cached on the provider
+    once, so that later requests on the same document only send the question.
+    Cached contents live for `ttl` seconds and have their TTL extended while
+    they are in use. Each request holds a reference on its cached content
+    until its response arrives, and `cleanup` only deletes contents no
+    request is using. Contexts too short for provider-side caching, or that
+    the provider refused to cache, are answered without a cache; after a
+    transient failure, such as a rate limit or a server error, the context is
+    answered without a cache for `retry_delay` seconds, then caching is retried.
+    """
+
+    def __init__(self, ttl: float, min_tokens: int, retry_delay: float = 60.0):
+        """Initializes the GeminiContextCache.
+
+        Args:
+            ttl (float): The seconds a cached content lives after its last extension.
+            min_tokens (int): The estimated tokens below which a context is not cached.
+            retry_delay (float): The seconds before caching a context is retried
+                after a transient failure.
+        """
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.retry_delay = retry_delay
+        self._entries: Dict[str, CachedContext] = {}
+        self._uncacheable: Dict[str, float] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        """Returns the lock serializing the creation of one cached content."""
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def content_key(item: Any) -> Optional[str]:
+        """Returns the identity of a cached content item, or None if it cannot be keyed.
+
+        Texts are keyed by content and Gemini File API uploads by their sha256
+        or name; other objects are not cached.
+        """
+        if isinstance(item, (str, bytes)):
+            return text_sha256(item)
+        sha256_hash = getattr(item, "sha256_hash", None)
+        if sha256_hash:
+            return sha256_hash.hex() if isinstance(sha256_hash, bytes) else sha256_hash
+        return getattr(item, "name", None)
+
+    def _too_short(self, system_prompt: str, contents: List[Any]) -> bool:
+        """Returns whether a text context is below the provider's caching minimum.
+
+        Uploaded files are not measured; the provider rejects them if too short.
+        """
+        if not all(isinstance(item, str) for item in contents):
+            return False
+        return sum(map(estimate_tokens, [system_prompt, *contents])) < self.min_tokens
+
+    @staticmethod
+    def _permanent(exception: Exception) -> bool:
+        """Returns whether a cached content creation failure recurs for the context.
+
+        Rejections of the request by the provider, and invalid contents caught
+        by the client, recur; rate limits, server and network errors do not.
+        """
+        if isinstance(exception, (ValueError, TypeError)):
+            return True
+        return getattr(exception, "code", None) in PERMANENT_ERROR_CODES
+
+    def _create(
+        self, key: str, model_name: str, system_prompt: str, contents: List[Any]
+    ) -> CachedContext:
+        """Creates the cached content of a context on the provider."""
+        cached_content = caching.CachedContent.create(
+            model=model_name if "/" in model_name else f"models/{model_name}",
+            system_instruction=system_prompt,
+            contents=contents,
+            ttl=datetime.timedelta(seconds=self.ttl),
+        )
+        logger.debug(f"Created Gemini cached content {cached_content.name}")
+        return CachedContext(
+            key=key,
+            cached_content=cached_content,
+            model=genai.GenerativeModel.from_cached_content(
+                cached_content=cached_content
+            ),
+            expire_time=time.time() + self.ttl,
+        )
+
+    def _extend(self, entry: CachedContext):
+        """Extends the TTL of a cached content past half of its lifetime."""
+        if entry.expire_time - time.time() > self.ttl / 2:
+            return
+        try:
+            entry.cached_content.update(ttl=datetime.timedelta(seconds=self.ttl))
+            entry.expire_time = time.time() + self.ttl
+        except Exception as e:
+            logger.debug(f"Could not extend {entry.cached_content.name}: {e}")
+
+    def acquire(
+        self, model_name: str, system_prompt: str, contents: List[Any]
+    ) -> Optional[CachedContext]:
+        """Returns the cached content of a context, creating it when needed.
+
+        Every context returned holds a reference until it is passed to `release`.
+
+        Args:
+            model_name (str): The Gemini model name.
+            system_prompt (str): The system prompt of the requests.
+            contents (List[Any]): The document texts or File API uploads to cache.
+
+        Returns:
+            Optional[CachedContext]: The cached context, or None if the context is
+                not cached.
+        """
+        self.cleanup()
+        content_keys = [self.content_key(item) for item in contents]
+        if not contents or None in content_keys:
+            return None
+        key = text_sha256("\n".join([model_name, system_prompt, *content_keys]))
+
+        with self._key_lock(key):
+            with self._lock:
+                if self._uncacheable.get(key, 0) > time.time():
+                    return None
+                entry = self._entries.get(key)
+            if entry is None or entry.expire_time < time.time():
+                if self._too_short(system_prompt, contents):
+                    with self._lock:
+                        self._uncacheable[key] = float("inf")
+                    return None
+                try:
+                    entry = self._create(key, model_name, system_prompt, contents)
+                except Exception as e:
+                    if self._permanent(e):
+                        logger.warning(
+                            f"Could not cache the context on {model_name}: {e}"
+                        )
+                        retry_at = float("inf")
+                    else:
+                        logger.warning(
+                            f"Could not cache the context on {model_name}, "
+                            f"retrying in {self.retry_delay:.0f}s: {e}"
+                        )
+                        retry_at = time.time() + self.retry_delay
+                    with self._lock:
+                        self._uncacheable[key] = retry_at
+                    return None
+            else:
+                self._extend(entry)
+
+            with self._lock:
+                self._entries[key] = entry
+                entry.refs += 1
+            return entry
+
+    def release(self, entry: Optional[CachedContext]):
+        """Releases a reference taken by `acquire`.
+
+        Args:
+            entry (Optional[CachedContext]): The cached context, None being ignored.
+        """
+        if entry is None:
+            return
+        with self._lock:
+            entry.refs -= 1
+
+    def cleanup(self, expired_only: bool = True):
+        """Deletes the cached contents no request is using.
+
+        Args:
+            expired_only (bool): Whether to only forget the contents past their
+                TTL, which the provider already deleted, rather than deleting
+                every unused content.
+        """
+        now = time.time()
+        with self._lock:
+            unused = [
+                entry
+                for entry in self._entries.values()
+                if not entry.refs and (not expired_only or entry.expire_time < now)
+            ]
+            for entry in unused:
+                del self._entries[entry.key]
+
+        for entry in unused:
+            if entry.expire_time < now:
+                continue
+            try:
+                entry.cached_content.delete()
+                logger.debug(f"Deleted cached content {entry.cached_content.name}")
+            except Exception as e:
+                logger.debug(f"Could not delete {entry.cached_content.name}: {e}")
+
+
+_context_cache: Optional[GeminiContextCache] = None
+_context_cache_lock = threading.Lock()
+
+
+def get_context_cache() -> Optional[GeminiContextCache]:
+    """Returns the process-wide context cache, or None if context caching is off.
+
+    Unused cached contents are deleted when the process exits.
+    """
+    global _context_cache
+    mcqa_config = McqaConfig()
+    if not mcqa_config.gemini_context_cache_enabled:
+        return None
+
+    with _context_cache_lock:
+        if _context_cache is None:
+            _context_cache = GeminiContextCache(
+                mcqa_config.gemini_context_cache_ttl,
+                mcqa_config.gemini_context_cache_min_tokens,
+            )
+            atexit.register(_context_cache.cleanup, expired_only=False)
+        return _context_cache
@@ -1,3 +1,4 @@
+import os
 from dataclasses import dataclass
 
 
@@ -5,3 +6,4 @@ from dataclasses import dataclass
 class LlamaMultimodalConfig:
     multimodal_generation_model: str = "llama3.1"
     temperature: float = 0.01
+    host: str = os.environ.get("OLLAMA_HOST", None)
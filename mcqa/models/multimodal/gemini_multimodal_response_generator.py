@@ -1,12 +1,15 @@
+import asyncio
 from dataclasses import dataclass
 from itertools import chain
-from typing import Any, List
-
-import google.generativeai as genai
+from typing import Any, List, Optional, Tuple
 
 from mcqa.commons import logger
-from mcqa.domain.multimodal_response_generator import \
-    MultimodalResponseGenerator
+from mcqa.config import McqaConfig
+from mcqa.domain.multimodal_response_generator import (
+    AsyncMultimodalResponseGenerator, MultimodalResponseGenerator)
+from mcqa.models.client_registry import (get_async_gemini_model,
+                                         get_gemini_model)
+from mcqa.models.gemini_context_cache import CachedContext, get_context_cache
 from mcqa.models.multimodal.config.gemini_multimodal_config import \
     GeminiMultimodalConfig
 
@@ -14,15 +17,26 @@ logger = logger.setup_logger()
 
 
 @dataclass
-class GeminiMultimodalResponseGenerator(MultimodalResponseGenerator):
+class GeminiMultimodalResponseGenerator(
+    MultimodalResponseGenerator, AsyncMultimodalResponseGenerator
+):
     """Class responsible for generating multimodal responses using the Gemini LLM model.
 
-    This class inherits from the MultimodalResponseGenerator and implements its abstract methods.
+    This class inherits from the MultimodalResponseGenerator and AsyncMultimodalResponseGenerator
+    and implements their abstract methods. With context caching enabled, the system
+    prompt and multimodal objects are cached on the provider once per document, and
+    requests only send the user prompt.
     """
 
     def __init__(self):
         self.llm_model = None
         self.gemini_config = GeminiMultimodalConfig()
+        self.model_name = self.gemini_config.multimodal_generation_model
+        # Requests use the provider's default temperature.
+        self.temperature = None
+        self.http_timeout = McqaConfig().http_timeout
+        self.last_usage = None
+        self.context_cache = get_context_cache()
 
     def start_llm(self):
         """Starts the LLM (Language Learning Model) client.
@@ -32,10 +46,58 @@ class GeminiMultimodalResponseGenerator(MultimodalResponseGenerator):
         logger.debug(
             f"Initiating {self.gemini_config.multimodal_generation_model} Multimodal model"
         )
-        self.llm_model = genai.GenerativeModel(
-            self.gemini_config.multimodal_generation_model
+        self.llm_model = get_gemini_model(
+            self.gemini_config.multimodal_generation_model,
+            self.gemini_config.google_api_key,
         )
 
+    def _request_object(
+        self, system_prompt: str, user_prompt: str, multimodal_objects: List[Any]
+    ) -> List[Any]:
+        """Flattens the prompts and multimodal objects into one request."""
+        return list(
+            chain.from_iterable(
+                item if isinstance(item, list) else [item]
+                for item in [system_prompt, user_prompt, multimodal_objects[::-1]]
+            )
+        )
+
+    def _acquire_context(
+        self, system_prompt: str, multimodal_objects: List[Any]
+    ) -> Optional[CachedContext]:
+        """Returns the cached system prompt and multimodal objects, if cached."""
+        if self.context_cache is None or not multimodal_objects:
+            return None
+        return self.context_cache.acquire(
+            self.model_name, system_prompt, multimodal_objects[::-1]
+        )
+
+    def _release_context(self, context: Optional[CachedContext]):
+        """Releases a cached context once its request is answered."""
+        if self.context_cache is not None:
+            self.context_cache.release(context)
+
+    def _model_request(
+        self,
+        context: Optional[CachedContext],
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_objects: List[Any],
+    ) -> Tuple[Any, List[Any]]:
+        """Returns the model to send a request to and the contents of the request."""
+        if context is None:
+            return self.llm_model, self._request_object(
+                system_prompt, user_prompt, multimodal_objects
+            )
+        return context.model, [user_prompt]
+
+    def _record_usage(self, response: Any):
+        """Records the token usage reported with a response."""
+        self.last_usage = {
+            "input_tokens": response.usage_metadata.prompt_token_count,
+            "output_tokens": response.usage_metadata.candidates_token_count,
+        }
+
     def generate_multimodal_response(
         self,
         system_prompt: str,
@@ -56,14 +118,53 @@ class GeminiMultimodalResponseGenerator(MultimodalResponseGenerator):
         Returns:
             str: The generated response text.
         """
-        request_object = list(
-            chain.from_iterable(
-                item if isinstance(item, list) else [item]
-                for item in [system_prompt, user_prompt, multimodal_objects[::-1]]
+        context = self._acquire_context(system_prompt, multimodal_objects)
+        try:
+            model, request = self._model_request(
+                context, system_prompt, user_prompt, multimodal_objects
             )
-        )
+            response = model.generate_content(
+                request, request_options={"timeout": self.http_timeout}
+            )
+        finally:
+            self._release_context(context)
+        self._record_usage(response)
+        return response.text
 
-        response = self.llm_model.generate_content(
-            (request_object),
+    async def agenerate_multimodal_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_objects: List[Any],
+        url: str = None,
+    ) -> str:
+        """Generates a multimodal response without blocking the event loop.
+
+        Args:
+            system_prompt (str): The system prompt.
+            user_prompt (str): The user prompt.
+            multimodal_objects (Any): The multimodal object.
+            url (str): The URL of the multimodal object.
+
+        Returns:
+            str: The generated response text.
+        """
+        context = await asyncio.to_thread(
+            self._acquire_context, system_prompt, multimodal_objects
         )
+        try:
+            model, request = self._model_request(
+                context, system_prompt, user_prompt, multimodal_objects
+            )
+            model = get_async_gemini_model(
+                self.model_name,
+                self.gemini_config.google_api_key,
+                context.cached_content if context else None,
+            )
+            response = await model.generate_content_async(
+                request, request_options={"timeout": self.http_timeout}
+            )
+        finally:
+            self._release_context(context)
+        self._record_usage(response)
         return response.text
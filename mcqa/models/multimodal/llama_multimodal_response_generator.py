@@ -1,11 +1,11 @@
 from dataclasses import dataclass
 from typing import Any, List
 
-import ollama
-
 from mcqa.commons import logger
-from mcqa.domain.multimodal_response_generator import \
-    MultimodalResponseGenerator
+from mcqa.domain.multimodal_response_generator import (
+    AsyncMultimodalResponseGenerator, MultimodalResponseGenerator)
+from mcqa.models.client_registry import (get_async_ollama_client,
+                                         get_ollama_client)
 from mcqa.models.multimodal.config.llama_multimodal_config import \
     LlamaMultimodalConfig
 
@@ -13,15 +13,22 @@ logger = logger.setup_logger()
 
 
 @dataclass
-class LlamaMultimodalResponseGenerator(MultimodalResponseGenerator):
+class LlamaMultimodalResponseGenerator(
+    MultimodalResponseGenerator, AsyncMultimodalResponseGenerator
+):
     """Class responsible for generating multimodal responses using the Gemini LLM model.
 
-    This class inherits from the MultimodalResponseGenerator and implements its abstract methods.
+    This class inherits from the MultimodalResponseGenerator and AsyncMultimodalResponseGenerator
+    and implements their abstract methods.
     """
 
     def __init__(self, model_name="llama3.1"):
-        self.llm_model = model_name
+        self.llm_model = None
         self.llama_config = LlamaMultimodalConfig()
+        self.model_name = self.llama_config.multimodal_generation_model
+        # Requests use the provider's default temperature.
+        self.temperature = None
+        self.last_usage = None
 
     def start_llm(self):
         """Starts the LLM (Language Learning Model) client.
@@ -29,6 +36,15 @@ class LlamaMultimodalResponseGenerator(MultimodalResponseGenerator):
         This function initializes the LLM client with the custom model specified in config.
         """
         logger.info(f"Using {self.llama_config.multimodal_generation_model} model")
+        self.llm_model = get_ollama_client(self.llama_config.host)
+
+    def _record_usage(self, response: Any):
+        """Records the token usage reported with a response."""
+        logger.debug(f"Generated multimodal response: {response['response']}")
+        self.last_usage = {
+            "input_tokens": response.get("prompt_eval_count"),
+            "output_tokens": response.get("eval_count"),
+        }
 
     def generate_multimodal_response(
         self,
@@ -52,10 +68,37 @@ class LlamaMultimodalResponseGenerator(MultimodalResponseGenerator):
         """
 
         prompt = system_prompt + user_prompt
-        response = ollama.generate(
+        response = self.llm_model.generate(
             self.llama_config.multimodal_generation_model,
             prompt,
             images=multimodal_objects,
         )
-        logger.debug(f"Generated multimodal response: {response['response']}")
+        self._record_usage(response)
+        return response["response"]
+
+    async def agenerate_multimodal_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_objects: List[Any],
+        url: str = None,
+    ) -> str:
+        """Generates a multimodal response without blocking the event loop.
+
+        Args:
+            system_prompt (str): The system prompt.
+            user_prompt (str): The user prompt.
+            multimodal_objects (Any): The multimodal object.
+            url (str): The URL of the multimodal object.
+
+        Returns:
+            str: The generated response text.
+        """
+        llm_model = get_async_ollama_client(self.llama_config.host)
+        response = await llm_model.generate(
+            self.llama_config.multimodal_generation_model,
+            system_prompt + user_prompt,
+            images=multimodal_objects,
+        )
+        self._record_usage(response)
         return response["response"]
@@ -1,11 +1,11 @@
 from dataclasses import dataclass
 from typing import Any, List
 
-from openai import OpenAI
-
 from mcqa.commons import logger
-from mcqa.domain.multimodal_response_generator import \
-    MultimodalResponseGenerator
+from mcqa.domain.multimodal_response_generator import (
+    AsyncMultimodalResponseGenerator, MultimodalResponseGenerator)
+from mcqa.models.client_registry import (get_async_openai_client,
+                                         get_openai_client)
 from mcqa.models.multimodal.config.openai_multimodal_config import \
     OpenaiMultimodalConfig
 
@@ -13,44 +13,36 @@ logger = logger.setup_logger()
 
 
 @dataclass
-class OpenaiMultimodalResponseGenerator(MultimodalResponseGenerator):
+class OpenaiMultimodalResponseGenerator(
+    MultimodalResponseGenerator, AsyncMultimodalResponseGenerator
+):
     """Class responsible for generating multimodal responses using the Gemini LLM model.
 
-    This class inherits from the MultimodalResponseGenerator and implements its abstract methods.
+    This class inherits from the MultimodalResponseGenerator and AsyncMultimodalResponseGenerator
+    and implements their abstract methods.
     """
 
     def __init__(self):
         self.llm_model = None
         self.openai_config = OpenaiMultimodalConfig()
+        self.model_name = self.openai_config.multimodal_generation_model
+        self.temperature = self.openai_config.temperature
+        self.last_usage = None
 
     def start_llm(self):
         """Starts the LLM (Language Learning Model) client.
 
         This function initializes the LLM client with the custom model specified in config.
         """
-        logger.debug(f"Initiating {self.openai_config.openai_api_key} Multimodal model")
-        self.llm_model = OpenAI(api_key=self.openai_config.openai_api_key)
-
-    def generate_multimodal_response(
-        self,
-        system_prompt: str,
-        user_prompt: str,
-        multimodal_objects: List[Any],
-        url: str = None,
-    ) -> str:
-        """Generates a multimodal response.
-
-        This function generates a multimodal response using the system prompt, user prompt, and a multimodal object.
-
-        Args:
-            system_prompt (str): The system prompt.
-            user_prompt (str): The user prompt.
-            multimodal_objects (Any): The multimodal object.
-            url (str): The URL of the multimodal object
+        logger.debug(
+            f"Initiating {self.openai_config.multimodal_generation_model} Multimodal model"
+        )
+        self.llm_model = get_openai_client(self.openai_config.openai_api_key)
 
-        Returns:
-            str: The generated response text.
-        """
+    def _messages(
+        self, system_prompt: str, user_prompt: str, multimodal_objects: List[Any]
+    ) -> List[dict]:
+        """Builds the chat messages of a request."""
         logger.debug(f"Multimodal object: {multimodal_objects}")
 
         messages = [
@@ -72,11 +64,67 @@ class OpenaiMultimodalResponseGenerator(MultimodalResponseGenerator):
                 for object in multimodal_objects
             ]
         )
+        return messages
+
+    def _record_usage(self, response: Any):
+        """Records the token usage reported with a response."""
+        logger.debug(f"Generated response: {response.choices[0].message.content}")
+        self.last_usage = {
+            "input_tokens": response.usage.prompt_tokens,
+            "output_tokens": response.usage.completion_tokens,
+        }
+
+    def generate_multimodal_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_objects: List[Any],
+        url: str = None,
+    ) -> str:
+        """Generates a multimodal response.
 
+        This function generates a multimodal response using the system prompt, user prompt, and a multimodal object.
+
+        Args:
+            system_prompt (str): The system prompt.
+            user_prompt (str): The user prompt.
+            multimodal_objects (Any): The multimodal object.
+            url (str): The URL of the multimodal object
+
+        Returns:
+            str: The generated response text.
+        """
         response = self.llm_model.chat.completions.create(
             model=self.openai_config.multimodal_generation_model,
-            messages=messages,
+            messages=self._messages(system_prompt, user_prompt, multimodal_objects),
+            temperature=self.openai_config.temperature,
+        )
+        self._record_usage(response)
+        return response.choices[0].message.content
+
+    async def agenerate_multimodal_response(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        multimodal_objects: List[Any],
+        url: str = None,
+    ) -> str:
+        """Generates a multimodal response without blocking the event loop.
+
+        Args:
+            system_prompt (str): The system prompt.
+            user_prompt (str): The user prompt.
+            multimodal_objects (Any): The multimodal object.
+            url (str): The URL of the multimodal object
+
+        Returns:
+            str: The generated response text.
+        """
+        llm_model = get_async_openai_client(self.openai_config.openai_api_key)
+        response = await llm_model.chat.completions.create(
+            model=self.openai_config.multimodal_generation_model,
+            messages=self._messages(system_prompt, user_prompt, multimodal_objects),
             temperature=self.openai_config.temperature,
         )
-        logger.debug(f"Generated response: {response.text}")
+        self._record_usage(response)
         return response.choices[0].message.content
@@ -0,0 +1,160 @@
+"""Registry of the LLM providers the router can select by name.
+
+Providers are registered as `"module:attribute"` paths to their response
+generator class, and the module is only imported when the provider is first
+selected, so a process only pays for the SDK of the providers it uses.
+
+Third-party packages add providers through the `mcqa.text_providers` and
+`mcqa.multimodal_providers` entry point groups, e.g. in their pyproject.toml:
+
+    [tool.poetry.plugins."mcqa.text_providers"]
+    mistral = "mcqa_mistral.generator:MistralTextResponseGenerator"
+
+The target is called without arguments to build the generator, which
+implements the text or multimodal response generator interfaces of
+`mcqa.domain`.
+"""
+
+import importlib
+import threading
+from importlib import metadata
+from typing import Any, Callable, Dict, List, Union
+
+from mcqa.commons import logger
+
+logger = logger.setup_logger()
+
+TEXT = "text"
+MULTIMODAL = "multimodal"
+ENTRY_POINT_GROUPS = {
+    TEXT: "mcqa.text_providers",
+    MULTIMODAL: "mcqa.multimodal_providers",
+}
+
+ProviderTarget = Union[str, Callable[[], Any], metadata.EntryPoint]
+
+_providers: Dict[str, Dict[str, ProviderTarget]] = {TEXT: {}, MULTIMODAL: {}}
+_providers_lock = threading.Lock()
+_discovered = False
+
+
+def register_provider(kind: str, name: str, target: Union[str, Callable[[], Any]]):
+    """Registers a provider, replacing any provider of the same kind and name.
+
+    Args:
+        kind (str): The kind of model the provider serves, text or multimodal.
+        name (str): The name the provider is selected by, e.g. in TEXT_MODEL.
+        target (Union[str, Callable[[], Any]]): The `"module:attribute"` path of
+            the generator class, imported on first use, or a callable building
+            the generator.
+    """
+    if kind not in _providers:
+        raise ValueError(f"Unsupported provider kind: {kind}")
+    with _providers_lock:
+        _providers[kind][name] = target
+
+
+def _entry_points(group: str) -> List[metadata.EntryPoint]:
+    """Returns the installed entry points of a group."""
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return list(entry_points.select(group=group))
+    return list(entry_points.get(group, []))
+
+
+def _discover():
+    """Adds the providers of installed packages, once per process.
+
+    Providers registered in code keep precedence over entry points of the
+    same name.
+    """
+    global _discovered
+    with _providers_lock:
+        if _discovered:
+            return
+        for kind, group in ENTRY_POINT_GROUPS.items():
+            for entry_point in _entry_points(group):
+                _providers[kind].setdefault(entry_point.name, entry_point)
+        _discovered = True
+
+
+def _resolve(target: ProviderTarget) -> Callable[[], Any]:
+    """Imports the generator class or factory of a provider."""
+    if isinstance(target, metadata.EntryPoint):
+        return target.load()
+    if isinstance(target, str):
+        module_name, attribute = target.split(":")
+        return getattr(importlib.import_module(module_name), attribute)
+    return target
+
+
+def provider_names(kind: str) -> List[str]:
+    """Returns the names of the registered and installed providers of a kind."""
+    _discover()
+    with _providers_lock:
+        return sorted(_providers[kind])
+
+
+def create_provider(kind: str, name: str) -> Any:
+    """Builds the response generator of a provider, importing it on first use.
+
+    Args:
+        kind (str): The kind of model the provider serves, text or multimodal.
+        name (str): The name of the provider.
+
+    Returns:
+        Any: The response generator.
+
+    Raises:
+        ValueError: If no provider of that kind and name is registered.
+    """
+    _discover()
+    with _providers_lock:
+        target = _providers[kind].get(name)
+    if target is None:
+        raise ValueError(f"Unsupported {kind} model: {name}")
+
+    factory = _resolve(target)
+    if isinstance(target, metadata.EntryPoint):
+        logger.debug(f"Loaded {kind} provider {name} from {target.value}")
+    with _providers_lock:
+        _providers[kind][name] = factory
+    return factory()
+
+
+register_provider(
+    TEXT,
+    "gemini",
+    "mcqa.models.text.gemini_text_response_generator:GeminiTextResponseGenerator",
+)
+register_provider(
+    TEXT,
+    "openai",
+    "mcqa.models.text.openai_text_response_generator:OpenAITextResponseGenerator",
+)
+register_provider(
+    TEXT, "fake", "mcqa.models.fake.fake_response_generator:FakeResponseGenerator"
+)
+register_provider(
+    MULTIMODAL,
+    "gemini",
+    "mcqa.models.multimodal.gemini_multimodal_response_generator:"
+    "GeminiMultimodalResponseGenerator",
+)
+register_provider(
+    MULTIMODAL,
+    "openai",
+    "mcqa.models.multimodal.openai_multimodal_response_generator:"
+    "OpenaiMultimodalResponseGenerator",
+)
+register_provider(
+    MULTIMODAL,
+    "llama",
+    "mcqa.models.multimodal.llama_multimodal_response_generator:"
+    "LlamaMultimodalResponseGenerator",
+)
+register_provider(
+    MULTIMODAL,
+    "fake",
+    "mcqa.models.fake.fake_response_generator:FakeResponseGenerator",
+)
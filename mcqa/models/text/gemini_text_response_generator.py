@@ -1,12 +1,25 @@
-import google.generativeai as genai
+import asyncio
+import re
+from typing import Any, List, Optional, Tuple
 
-from mcqa.domain.text_response_generator import TextResponseGenerator
+from mcqa.config import McqaConfig
+from mcqa.domain.text_response_generator import (AsyncTextResponseGenerator,
+                                                 TextResponseGenerator)
+from mcqa.models.client_registry import (get_async_gemini_model,
+                                         get_gemini_model)
+from mcqa.models.gemini_context_cache import CachedContext, get_context_cache
 from mcqa.models.text.config.gemini_text_config import GeminiTextConfig
 
+CONTEXT_PATTERN = re.compile(r"<Context>.*?</Context>", re.DOTALL)
 
-class GeminiTextResponseGenerator(TextResponseGenerator):
+
+class GeminiTextResponseGenerator(TextResponseGenerator, AsyncTextResponseGenerator):
     """A class used to generate text responses using the GeminiTextConfig.
 
+    With context caching enabled, the system prompt and the `<Context>` of the
+    user prompt are cached on the provider once per document, and requests only
+    send the rest of the user prompt.
+
     Attributes:
         gemini_config (GeminiTextConfig): Configuration for the Gemini text generator.
         llm_model (genai.GenerativeModel): The generative model used for text generation.
@@ -15,14 +28,67 @@ class GeminiTextResponseGenerator(TextResponseGenerator):
     def __init__(self):
         """Initializes GeminiTextResponseGenerator with a GeminiTextConfig."""
         self.gemini_config = GeminiTextConfig()
+        self.model_name = self.gemini_config.text_generation_model
+        # Requests use the provider's default temperature.
+        self.temperature = None
+        self.http_timeout = McqaConfig().http_timeout
+        self.last_usage = None
+        self.context_cache = get_context_cache()
 
     def start_llm(self):
         """Starts the LLM model.
 
-        Configures genai with the Google API key from gemini_config and initializes the generative model.
+        Uses the shared generative model, configured with the Google API key from gemini_config.
+        """
+        self.llm_model = get_gemini_model(
+            self.gemini_config.text_generation_model, self.gemini_config.google_api_key
+        )
+
+    def _split_context(self, user_prompt: str) -> Tuple[Optional[str], str]:
+        """Splits the `<Context>` out of a user prompt.
+
+        Returns:
+            Tuple[Optional[str], str]: The context, or None if the prompt has
+                none, and the rest of the user prompt.
         """
-        genai.configure(api_key=self.gemini_config.google_api_key)
-        self.llm_model = genai.GenerativeModel(self.gemini_config.text_generation_model)
+        match = CONTEXT_PATTERN.search(user_prompt)
+        if match is None:
+            return None, user_prompt
+        return match.group(0), user_prompt[: match.start()] + user_prompt[match.end() :]
+
+    def _acquire_context(
+        self, system_prompt: str, user_prompt: str
+    ) -> Tuple[Optional[CachedContext], str]:
+        """Returns the cached context of a request, if cached, and the prompt to send."""
+        if self.context_cache is None:
+            return None, user_prompt
+        context_text, question_prompt = self._split_context(user_prompt)
+        if context_text is None:
+            return None, user_prompt
+        context = self.context_cache.acquire(
+            self.model_name, system_prompt, [context_text]
+        )
+        return (context, question_prompt) if context else (None, user_prompt)
+
+    def _release_context(self, context: Optional[CachedContext]):
+        """Releases a cached context once its request is answered."""
+        if self.context_cache is not None:
+            self.context_cache.release(context)
+
+    def _model_request(
+        self, context: Optional[CachedContext], system_prompt: str, user_prompt: str
+    ) -> Tuple[Any, List[str]]:
+        """Returns the model to send a request to and the contents of the request."""
+        if context is None:
+            return self.llm_model, [system_prompt, user_prompt]
+        return context.model, [user_prompt]
+
+    def _record_usage(self, response):
+        """Records the token usage reported with a response."""
+        self.last_usage = {
+            "input_tokens": response.usage_metadata.prompt_token_count,
+            "output_tokens": response.usage_metadata.candidates_token_count,
+        }
 
     def generate_response(self, system_prompt, user_prompt):
         """Generates a response text.
@@ -34,5 +100,41 @@ class GeminiTextResponseGenerator(TextResponseGenerator):
         Returns:
             str: The generated response text.
         """
-        response = self.llm_model.generate_content([system_prompt, user_prompt])
+        context, user_prompt = self._acquire_context(system_prompt, user_prompt)
+        try:
+            model, request = self._model_request(context, system_prompt, user_prompt)
+            response = model.generate_content(
+                request, request_options={"timeout": self.http_timeout}
+            )
+        finally:
+            self._release_context(context)
+        self._record_usage(response)
+        return response.text
+
+    async def agenerate_response(self, system_prompt, user_prompt):
+        """Generates a response text without blocking the event loop.
+
+        Args:
+            system_prompt (str): The system prompt.
+            user_prompt (str): The user prompt.
+
+        Returns:
+            str: The generated response text.
+        """
+        context, user_prompt = await asyncio.to_thread(
+            self._acquire_context, system_prompt, user_prompt
+        )
+        try:
+            model, request = self._model_request(context, system_prompt, user_prompt)
+            model = get_async_gemini_model(
+                self.model_name,
+                self.gemini_config.google_api_key,
+                context.cached_content if context else None,
+            )
+            response = await model.generate_content_async(
+                request, request_options={"timeout": self.http_timeout}
+            )
+        finally:
+            self._release_context(context)
+        self._record_usage(response)
         return response.text
@@ -1,27 +1,47 @@
-from openai import OpenAI
-
-from mcqa.domain.text_response_generator import TextResponseGenerator
+from mcqa.domain.text_response_generator import (AsyncTextResponseGenerator,
+                                                 TextResponseGenerator)
+from mcqa.models.client_registry import (get_async_openai_client,
+                                         get_openai_client)
 from mcqa.models.text.config.openai_text_config import OpenAITextConfig
 
 
-class OpenAITextResponseGenerator(TextResponseGenerator):
+class OpenAITextResponseGenerator(TextResponseGenerator, AsyncTextResponseGenerator):
     """A class used to generate text responses using the OpenAITextConfig.
 
     Attributes:
         openai_config (OpenAITextConfig): Configuration for the OpenAI text generator.
-        llm_model (OpenAI): The OpenAI model used for text generation.
+        llm_model (OpenAI): The OpenAI model used for text generation; async requests
+            use the AsyncOpenAI client of the running event loop.
     """
 
     def __init__(self):
         """Initializes OpenAITextResponseGenerator with an OpenAITextConfig."""
         self.openai_config = OpenAITextConfig()
+        self.model_name = self.openai_config.text_generation_model
+        # Requests use the provider's default temperature.
+        self.temperature = None
+        self.last_usage = None
 
     def start_llm(self):
         """Starts the LLM model.
 
-        Configures the OpenAI model with the OpenAI API key and temperature from openai_config.
+        Uses the shared OpenAI client for the OpenAI API key from openai_config.
         """
-        self.llm_model = OpenAI(api_key=self.openai_config.openai_api_key)
+        self.llm_model = get_openai_client(self.openai_config.openai_api_key)
+
+    def _messages(self, system_prompt, user_prompt):
+        """Builds the chat messages of a request."""
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _record_usage(self, response):
+        """Records the token usage reported with a response."""
+        self.last_usage = {
+            "input_tokens": response.usage.prompt_tokens,
+            "output_tokens": response.usage.completion_tokens,
+        }
 
     def generate_response(self, system_prompt, user_prompt):
         """Generates a response text.
@@ -35,9 +55,25 @@ class OpenAITextResponseGenerator(TextResponseGenerator):
         """
         response = self.llm_model.chat.completions.create(
             model=self.openai_config.text_generation_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
+            messages=self._messages(system_prompt, user_prompt),
+        )
+        self._record_usage(response)
+        return response.choices[0].message.content
+
+    async def agenerate_response(self, system_prompt, user_prompt):
+        """Generates a response text without blocking the event loop.
+
+        Args:
+            system_prompt (str): The system prompt.
+            user_prompt (str): The user prompt.
+
+        Returns:
+            str: The generated response text.
+        """
+        llm_model = get_async_openai_client(self.openai_config.openai_api_key)
+        response = await llm_model.chat.completions.create(
+            model=self.openai_config.text_generation_model,
+            messages=self._messages(system_prompt, user_prompt),
         )
+        self._record_usage(response)
         return response.choices[0].message.content
@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+import pandas as pd
+import pytest
+
+# McqaConfig reads the environment when mcqa is imported, so the app is
+# pointed at the offline fake provider before any test imports it.
+os.environ.update(
+    {
+        "TEXT_MODEL": "fake",
+        "MULTIMODAL_MODEL": "fake",
+        "RESPONSE_CACHE_ENABLED": "false",
+        "MCQA_CACHE_DIR": tempfile.mkdtemp(prefix="mcqa_test_cache_"),
+    }
+)
+
+
+@pytest.fixture
+def question_bank(tmp_path):
+    """Returns a function writing a question bank whose rows cycle over documents."""
+
+    def write(rows: int = 6, documents: int = 2, suffix: str = ".txt") -> str:
+        document_paths = []
+        for k in range(documents):
+            document_path = tmp_path / f"document_{k}{suffix}"
+            document_path.write_bytes(
+                f"Document {k} reports gated blood pool imaging.".encode()
+            )
+            document_paths.append(str(document_path))
+        pd.DataFrame(
+            {
+                "Question": [f"Which tracer did study {_n} use?" for _n in range(rows)],
+                "All Answers": ["A. Thallium-201 B. 99mTc-albumin C. 18F-FDG"] * rows,
+                "Correct Answer": ["B. 99mTc-albumin"] * rows,
+                "source_path": [document_paths[_n % documents] for _n in range(rows)],
+                "source_type": [suffix.lstrip(".")] * rows,
+            }
+        ).to_csv(tmp_path / "questions.csv", index=False)
+        return str(tmp_path / "questions.csv")
+
+    return write
@@ -0,0 +1,115 @@
+import gzip
+import json
+import shutil
+
+import pytest
+
+from mcqa.base.checkpoint import MANIFEST_NAME, RESULTS_NAME
+from mcqa.commons.result_writer import ResultWriter, read_results, repair_results
+from mcqa.domain.response_generator import QuestionsFromSourcesRequest
+from mcqa.mcqa import Mcqa
+
+
+def run_batch(file_path: str, output_path: str, resume: bool = True):
+    request = QuestionsFromSourcesRequest(
+        file_type="csv",
+        file_path=file_path,
+        output_path=output_path,
+        question_format="raw",
+    )
+    return Mcqa(request=request).generate_response_from_files(
+        file_path=file_path,
+        file_type="csv",
+        question_format="raw",
+        output_path=output_path,
+        max_concurrency=3,
+        resume=resume,
+    )
+
+
+def interrupted_copy(output_path, interrupted_path, records: int, cut: bool) -> list:
+    """Copies a finished run as if it was killed after writing `records` records.
+
+    With `cut`, the next record is left half written.
+    """
+    interrupted_path.mkdir()
+    shutil.copy(output_path / MANIFEST_NAME, interrupted_path / MANIFEST_NAME)
+    lines = (output_path / RESULTS_NAME).read_text().splitlines(keepends=True)
+    kept = lines[:records]
+    (interrupted_path / RESULTS_NAME).write_text(
+        "".join(kept) + (lines[records][: len(lines[records]) // 2] if cut else "")
+    )
+    return [json.loads(line)["row"] for line in kept]
+
+
+def record_rows(output_path) -> list:
+    return [record["row"] for record in read_results(str(output_path / RESULTS_NAME))]
+
+
+def test_resume_runs_each_remaining_row_once(question_bank, tmp_path):
+    file_path = question_bank(rows=10, documents=3)
+    finished = run_batch(file_path, str(tmp_path / "finished"), resume=False)
+    stored_rows = interrupted_copy(
+        tmp_path / "finished", tmp_path / "interrupted", records=4, cut=True
+    )
+
+    resumed = run_batch(file_path, str(tmp_path / "interrupted"))
+
+    rows = record_rows(tmp_path / "interrupted")
+    assert rows[: len(stored_rows)] == stored_rows
+    assert sorted(rows) == list(range(10))
+    assert [r.question for r in resumed.list_of_responses] == [
+        r.question for r in finished.list_of_responses
+    ]
+
+
+def test_resume_retries_failed_rows(question_bank, tmp_path):
+    file_path = question_bank(rows=6, documents=2)
+    run_batch(file_path, str(tmp_path / "finished"), resume=False)
+    results_path = tmp_path / "finished" / RESULTS_NAME
+    records = [json.loads(line) for line in results_path.read_text().splitlines()]
+    failed_row = records[1]["row"]
+    records[1].update(status="failed", response=None, exception="provider error")
+    results_path.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+    resumed = run_batch(file_path, str(tmp_path / "finished"))
+
+    rows = record_rows(tmp_path / "finished")
+    assert rows[:6] == [record["row"] for record in records]
+    assert rows[6:] == [failed_row]
+    assert len(resumed.list_of_responses) == 6
+
+
+def test_resume_of_a_finished_run_runs_nothing(question_bank, tmp_path):
+    file_path = question_bank(rows=6, documents=2)
+    finished = run_batch(file_path, str(tmp_path / "finished"), resume=False)
+
+    resumed = run_batch(file_path, str(tmp_path / "finished"))
+
+    assert sorted(record_rows(tmp_path / "finished")) == list(range(6))
+    assert resumed.list_of_responses == finished.list_of_responses
+
+
+def test_checkpoint_of_another_question_bank_is_discarded(question_bank, tmp_path):
+    run_batch(question_bank(rows=6, documents=2), str(tmp_path / "run"), resume=False)
+
+    run_batch(question_bank(rows=4, documents=1), str(tmp_path / "run"))
+
+    assert sorted(record_rows(tmp_path / "run")) == list(range(4))
+
+
+@pytest.mark.parametrize("name", ["results.jsonl", "results.jsonl.gz"])
+def test_records_appended_after_a_cut_record_stay_readable(tmp_path, name):
+    path = str(tmp_path / name)
+    with ResultWriter(path, flush_every=1) as writer:
+        for row in range(2):
+            writer.write({"row": row})
+    record = b'{"row":2}\n'
+    with open(path, "ab") as f:
+        f.write(gzip.compress(record)[:15] if name.endswith(".gz") else record[:5])
+
+    repair_results(path)
+    with ResultWriter(path, flush_every=1) as writer:
+        writer.write({"row": 2})
+
+    assert [record["row"] for record in read_results(path)] == [0, 1, 2]
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mcqa.base.evaluation import QAEvaluation
+
+ANSWER_PAIRS = [
+    ("B", "B. 99mTc-labeled albumin"),
+    ("b", "B. 99mTc-labeled albumin"),
+    ("B. 99mTc-labeled albumin", "B. 99mTc-labeled albumin"),
+    (" C ", "B. 99mTc-labeled albumin"),
+    ("The answer is B", "B. 99mTc-labeled albumin"),
+    ("Answer", "D"),
+    ("", "A. Thallium-201"),
+    (" A", "A. Thallium-201"),
+    ("4", "4"),
+    ("5", "4"),
+]
+
+
+def test_evaluate_batch_matches_evaluate():
+    evaluation = QAEvaluation()
+    generated, actual = zip(*ANSWER_PAIRS)
+
+    assert evaluation.evaluate_batch(generated, actual).tolist() == [
+        evaluation.evaluate(g, a) for g, a in ANSWER_PAIRS
+    ]
+
+
+def test_an_empty_batch_scores_nothing():
+    evaluation = QAEvaluation()
+
+    assert evaluation.evaluate_batch([], []).size == 0
+    assert evaluation.score_responses([]).size == 0
+    assert evaluation.accuracy([]) == 0.0
+    assert evaluation.bootstrap_interval([]) == (0.0, 0.0)
+    summary = evaluation.grouped_accuracy(
+        pd.DataFrame({"model": [], "evaluation": []}), ["model"]
+    )
+    assert summary.empty
+    assert list(summary.columns) == [
+        "model",
+        "questions",
+        "accuracy",
+        "accuracy_ci_low",
+        "accuracy_ci_high",
+    ]
+
+
+def test_bootstrap_interval_is_reproducible_with_a_seeded_rng():
+    evaluation = QAEvaluation()
+    scores = [100.0] * 30 + [0.0] * 20
+
+    first = evaluation.bootstrap_interval(scores, rng=np.random.default_rng(7))
+    second = evaluation.bootstrap_interval(scores, rng=np.random.default_rng(7))
+
+    assert first == second
+    assert first[0] < evaluation.accuracy(scores) == 60.0 < first[1]
+
+
+@pytest.mark.parametrize("score", [0.0, 100.0])
+def test_bootstrap_interval_of_a_constant_run_is_a_point(score):
+    interval = QAEvaluation().bootstrap_interval([score] * 25)
+
+    assert interval == (score, score)
+
+
+def test_bootstrap_interval_of_graded_scores_resamples_the_scores():
+    scores = np.array([0.0, 25.0, 50.0, 100.0, 100.0, 75.0])
+
+    interval = QAEvaluation().bootstrap_interval(
+        scores, n_resamples=500, confidence=0.9, rng=np.random.default_rng(3)
+    )
+
+    indices = np.random.default_rng(3).integers(0, scores.size, (500, scores.size))
+    expected = np.quantile(scores[indices].mean(axis=1), [0.05, 0.95])
+    assert interval == pytest.approx(tuple(expected))
+
+
+def test_binomial_draws_match_resampling_the_scores():
+    scores = np.array([100.0] * 70 + [0.0] * 30)
+
+    low, high = QAEvaluation().bootstrap_interval(
+        scores, n_resamples=20000, rng=np.random.default_rng(11)
+    )
+
+    indices = np.random.default_rng(11).integers(0, scores.size, (20000, scores.size))
+    expected = np.quantile(scores[indices].mean(axis=1), [0.025, 0.975])
+    assert (low, high) == pytest.approx(tuple(expected), abs=1.0)
+
+
+def test_grouped_accuracy_is_seeded():
+    frame = pd.DataFrame(
+        {
+            "model": ["a"] * 40 + ["b"] * 10,
+            "evaluation": [100.0, 0.0] * 20 + [100.0] * 10,
+        }
+    )
+    evaluation = QAEvaluation()
+
+    summary = evaluation.grouped_accuracy(frame, ["model"], seed=5)
+
+    pd.testing.assert_frame_equal(
+        summary, evaluation.grouped_accuracy(frame, ["model"], seed=5)
+    )
+    assert summary["questions"].tolist() == [40, 10]
+    assert summary["accuracy"].tolist() == [50.0, 100.0]
+    assert summary.loc[1, ["accuracy_ci_low", "accuracy_ci_high"]].tolist() == [
+        100.0,
+        100.0,
+    ]
+    rng = np.random.default_rng(5)
+    assert (
+        summary.loc[0, "accuracy_ci_low"],
+        summary.loc[0, "accuracy_ci_high"],
+    ) == evaluation.bootstrap_interval(frame["evaluation"][:40], rng=rng)
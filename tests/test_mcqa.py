@@ -0,0 +1,84 @@
+import pytest
+
+from mcqa.domain.response_generator import Question, QuestionsFromSourcesRequest
+from mcqa.mcqa import Mcqa
+from mcqa.models.fake.fake_response_generator import CASE_PATTERN, FakeResponseGenerator
+
+
+def question(full_context_path: str, question_format: str = "raw") -> Question:
+    return Question(
+        question="Which radionuclide was first used to assess wall motion?",
+        options=["A. Thallium-201", "B. 99mTc-labeled human serum albumin"],
+        answer="B. 99mTc-labeled human serum albumin",
+        question_format=question_format,
+        full_context_path=full_context_path,
+    )
+
+
+@pytest.mark.parametrize(
+    "full_context_path, multimodal",
+    [
+        ("contexts/notes.txt", False),
+        ("pdf_texts/notes.txt", False),
+        ("png/scan.pdf.txt", False),
+        ("papers/study.PDF", True),
+        ("figures/scan.jpg", True),
+    ],
+)
+def test_context_type_follows_the_file_extension(full_context_path, multimodal):
+    mcqa = Mcqa(request=question(full_context_path))
+    mcqa._start_llm()
+
+    assert mcqa._is_multimodal() == multimodal
+    assert (mcqa.llm_router.multimodal_model is not None) == multimodal
+
+
+def test_unsupported_context_type_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported context type"):
+        Mcqa(request=question("contexts/notes.docx"))._start_llm()
+
+
+def test_cases_missing_from_a_packed_response_are_asked_again(
+    question_bank, tmp_path, monkeypatch
+):
+    prompts = []
+
+    def respond(self, rng, system_prompt, user_prompt):
+        cases = CASE_PATTERN.findall(user_prompt)
+        prompts.append(len(cases))
+        if not cases:
+            return "<MCQResponse>\n<Answer>C</Answer></MCQResponse>"
+        # Cases 3 and 1, in reverse order, and nothing for case 2
+        return (
+            '<MCQResponse id="3">\n<Answer>A</Answer></MCQResponse>\n'
+            '<MCQResponse id="1">\n<Answer>B</Answer></MCQResponse>'
+        )
+
+    monkeypatch.setattr(FakeResponseGenerator, "_respond", respond)
+    file_path = question_bank(rows=3, documents=1)
+    output_path = str(tmp_path / "run")
+    request = QuestionsFromSourcesRequest(
+        file_type="csv",
+        file_path=file_path,
+        output_path=output_path,
+        question_format="raw",
+    )
+
+    result = Mcqa(request=request).generate_response_from_files(
+        file_path=file_path,
+        file_type="csv",
+        question_format="raw",
+        output_path=output_path,
+        pack_questions=3,
+    )
+
+    answers = {
+        response.question: response.generated_answer
+        for response in result.list_of_responses
+    }
+    assert answers == {
+        "Which tracer did study 0 use?": "B",
+        "Which tracer did study 1 use?": "C",
+        "Which tracer did study 2 use?": "A",
+    }
+    assert sorted(prompts) == [0, 3]
@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+from mcqa.llm_api import app
+
+
+def test_async_query_metrics_are_labeled_with_the_model(tmp_path):
+    context_path = tmp_path / "text_context.txt"
+    context_path.write_text("Gated blood pool imaging used 99mTc-labeled albumin.")
+    client = TestClient(app)
+
+    response = client.post(
+        "/evaluate_query",
+        json={
+            "question": "Which radionuclide was first used to assess wall motion?",
+            "options": ["A. Thallium-201", "B. 99mTc-labeled human serum albumin"],
+            "answer": "B. 99mTc-labeled human serum albumin",
+            "question_format": "raw",
+            "full_context_path": str(context_path),
+        },
+    )
+    assert response.status_code == 200
+
+    samples = [
+        sample
+        for family in text_string_to_metric_families(client.get("/metrics").text)
+        for sample in family.samples
+    ]
+    labels = {"provider": "fake", "model": "fake-1", "question_format": "raw"}
+    stage_labels = [
+        sample.labels
+        for sample in samples
+        if sample.name == "mcqa_stage_duration_seconds_count"
+    ]
+    for stage in ["llm_call", "postprocess", "evaluate"]:
+        assert {"stage": stage, **labels} in stage_labels
+    assert any(
+        sample.name == "mcqa_llm_tokens_total"
+        and sample.labels == {"kind": "input", **labels}
+        for sample in samples
+    )
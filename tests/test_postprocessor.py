@@ -0,0 +1,112 @@
+import pytest
+
+from mcqa.base.postprocessor import PostProcessor
+from mcqa.benchmarks.postprocessor_benchmark import (
+    legacy_postprocess,
+    legacy_questions,
+    single_pass_postprocess,
+    single_pass_questions,
+)
+
+DEFAULTS = {
+    "Answer": "Answer",
+    "RelevantExcerpts": "RelevantExcerpts",
+    "Thinking": "Thinking",
+    "FoundationalKnowledge": "FoundationalKnowledge",
+}
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        "<Answer>D</Answer><RelevantExcerpts>albumin</RelevantExcerpts>"
+        "<Thinking>first method</Thinking>"
+        "<FoundationalKnowledge>No</FoundationalKnowledge>",
+        "<Answer>B</Answer><Answer>C</Answer>",
+        "<Answer>B <b>bold</b></Answer>",
+        "no tags at all",
+        "",
+    ],
+)
+def test_well_formed_and_untagged_responses_match_the_legacy_scans(response):
+    assert single_pass_postprocess(response) == legacy_postprocess(response)
+
+
+@pytest.mark.parametrize(
+    "response, legacy, single_pass",
+    [
+        # Truncated inside a field: the legacy scan fell back to the tag name
+        (
+            "<Answer>D</Answer><Thinking>first method",
+            {"Answer": "D", "Thinking": "Thinking"},
+            {"Answer": "D", "Thinking": "first method"},
+        ),
+        # A missing closing tag: the legacy scan ran on to the next closing tag
+        (
+            "<Answer>D<Thinking>first method</Thinking></Answer>",
+            {
+                "Answer": "D<Thinking>first method</Thinking>",
+                "Thinking": "first method",
+            },
+            {"Answer": "D", "Thinking": "first method"},
+        ),
+        (
+            "<Answer>D<Thinking>first method</Thinking>",
+            {"Answer": "Answer", "Thinking": "first method"},
+            {"Answer": "D", "Thinking": "first method"},
+        ),
+        # A stray closing tag of another field stays in the open field
+        (
+            "<Answer>D</Thinking></Answer>",
+            {"Answer": "D</Thinking>", "Thinking": "Thinking"},
+            {"Answer": "D</Thinking>", "Thinking": "Thinking"},
+        ),
+        # A closing tag without an opening one is ignored
+        (
+            "</Answer>D",
+            {"Answer": "Answer", "Thinking": "Thinking"},
+            {"Answer": "Answer", "Thinking": "Thinking"},
+        ),
+    ],
+)
+def test_malformed_responses(response, legacy, single_pass):
+    assert {
+        tag: value
+        for tag, value in legacy_postprocess(response).items()
+        if tag in legacy
+    } == legacy
+    assert {
+        tag: value
+        for tag, value in single_pass_postprocess(response).items()
+        if tag in single_pass
+    } == single_pass
+
+
+def test_postprocess_keeps_the_fields_of_a_truncated_response():
+    response = PostProcessor().postprocess(
+        generated_response="<Answer>B. beta</Answer><Thinking>beta is",
+        actual_answer="B. beta",
+        question="Which?",
+        options="A. alpha B. beta",
+        model="fake-1",
+    )
+
+    assert response.generated_answer == "B. beta"
+    assert response.thinking == "beta is"
+    assert response.excerpts == DEFAULTS["RelevantExcerpts"]
+
+
+def test_questions_of_a_truncated_response():
+    complete = (
+        "<Question> Which? </Question><Options>A. alpha B. beta</Options>"
+        "<Answer>B. beta</Answer>"
+    )
+    response = complete * 2 + "<Question>Cut?</Question><Options>A. a"
+
+    assert single_pass_questions(complete * 2) == legacy_questions(complete * 2)
+    assert legacy_questions(response) == [
+        ("Which?", "A. alpha B. beta", "B. beta"),
+        ("Which?", "A. alpha B. beta", "B. beta"),
+    ]
+    # The cut question has no answer, so zip still drops it
+    assert single_pass_questions(response) == legacy_questions(response)
@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+from mcqa.base.input_parser.parser import Parser
+from mcqa.base.scheduler import LazyResources
+from mcqa.domain.response_generator import QuestionsFromSourcesRequest
+from mcqa.mcqa import Mcqa
+
+
+def test_lazy_resources_are_built_once_for_concurrent_rows():
+    builds = []
+    resources = LazyResources(lambda: builds.append(1) or ["parsed"])
+
+    threads = [threading.Thread(target=resources) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert resources() == ["parsed"]
+    assert len(builds) == 1
+
+
+def test_lazy_resources_retry_a_failed_build():
+    attempts = []
+
+    def build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("upload failed")
+        return ["parsed"]
+
+    resources = LazyResources(build)
+    with pytest.raises(OSError):
+        resources()
+    assert resources() == ["parsed"]
+
+
+def run_batch(file_path: str, output_path: str, **options):
+    request = QuestionsFromSourcesRequest(
+        file_type="csv",
+        file_path=file_path,
+        output_path=output_path,
+        question_format="raw",
+    )
+    return Mcqa(request=request).generate_response_from_files(
+        file_path=file_path,
+        file_type="csv",
+        question_format="raw",
+        output_path=output_path,
+        resume=False,
+        **options,
+    )
+
+
+def test_replayed_batch_never_parses_its_documents(
+    question_bank, tmp_path, monkeypatch
+):
+    parsed = []
+    handle = Parser.handle
+    monkeypatch.setattr(
+        Parser,
+        "handle",
+        lambda parser, file_path: parsed.append(file_path) or handle(parser, file_path),
+    )
+    file_path = question_bank(rows=6, documents=2, suffix=".png")
+
+    recorded = run_batch(
+        file_path, str(tmp_path / "recorded"), max_concurrency=3, record_responses=True
+    )
+    assert len(recorded.list_of_responses) == 6
+    assert len(parsed) == len(set(parsed)) == 2
+
+    parsed.clear()
+    replayed = run_batch(
+        file_path,
+        str(tmp_path / "replayed"),
+        replay_from=str(tmp_path / "recorded"),
+        replay_strict=True,
+    )
+    assert parsed == []
+    assert [r.generated_answer for r in replayed.list_of_responses] == [
+        r.generated_answer for r in recorded.list_of_responses
+    ]